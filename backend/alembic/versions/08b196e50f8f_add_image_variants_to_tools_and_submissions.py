@@ -0,0 +1,29 @@
+"""add image variants to tools and submissions
+
+Revision ID: 08b196e50f8f
+Revises: 0f53bb6d0775
+Create Date: 2026-10-17 14:05:37.218640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '08b196e50f8f'
+down_revision: Union[str, None] = '0f53bb6d0775'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled for existing images by `python -m app.cli generate-variants`
+    op.add_column('tools', sa.Column('image_variants', sa.JSON(), nullable=True))
+    op.add_column('tool_submissions', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tool_submissions', 'image_variants')
+    op.drop_column('tools', 'image_variants')
@@ -0,0 +1,31 @@
+"""add image blobs table
+
+Revision ID: 0f53bb6d0775
+Revises: 5e27c23d365c
+Create Date: 2026-10-17 13:22:08.411953
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f53bb6d0775'
+down_revision: Union[str, None] = '5e27c23d365c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing uploads keep their UUID names outside the blob store and are not counted
+    op.create_table('image_blobs',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('image_blobs')
@@ -0,0 +1,45 @@
+"""add library counters table
+
+Revision ID: 482e4155e658
+Revises: 95e1425e2891
+Create Date: 2026-10-17 11:24:05.318872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '482e4155e658'
+down_revision: Union[str, None] = '95e1425e2891'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Initial values of the counters, counted from the existing rows
+INITIAL_COUNTS = [
+    "SELECT 'tools_total', 0, COUNT(*) FROM tools",
+    "SELECT 'tools_available', 0, COUNT(*) FROM tools WHERE is_available",
+    "SELECT 'reservations_active', 0, COUNT(*) FROM reservations WHERE is_active",
+    "SELECT 'submissions_pending', 0, COUNT(*) FROM tool_submissions WHERE status = 'pending'",
+    "SELECT 'users_total', 0, COUNT(*) FROM users",
+    "SELECT 'user_reservations', user_id, COUNT(*) FROM reservations GROUP BY user_id",
+]
+
+
+def upgrade() -> None:
+    op.create_table('library_counters',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'subject_id')
+    )
+    op.create_index('ix_library_counters_name_value', 'library_counters', ['name', 'value'], unique=False)
+    for select in INITIAL_COUNTS:
+        op.execute(f"INSERT INTO library_counters (name, subject_id, value) {select}")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_library_counters_name_value', table_name='library_counters')
+    op.drop_table('library_counters')
@@ -0,0 +1,36 @@
+"""add tools full-text search index
+
+Revision ID: 4d58dfb079dc
+Revises: c430e87f20c4
+Create Date: 2026-10-17 09:12:41.218304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search_index import CREATE_STATEMENTS, DROP_STATEMENTS, REBUILD_STATEMENT
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d58dfb079dc'
+down_revision: Union[str, None] = 'c430e87f20c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite-only; other databases keep the ILIKE search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in CREATE_STATEMENTS:
+        op.execute(statement)
+    op.execute(REBUILD_STATEMENT)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
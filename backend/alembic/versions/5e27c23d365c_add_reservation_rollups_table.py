@@ -0,0 +1,56 @@
+"""add reservation rollups table
+
+Revision ID: 5e27c23d365c
+Revises: 482e4155e658
+Create Date: 2026-10-17 12:41:52.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e27c23d365c'
+down_revision: Union[str, None] = '482e4155e658'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every reservation counted on its reservation date and, once returned, on its return date,
+# for the whole library, its tool's category and its tool
+EVENTS = " UNION ALL ".join(
+    f"SELECT {dimension} AS dimension, {key} AS key, r.{column} AS day, {counts} "
+    f"FROM reservations r JOIN tools t ON t.id = r.tool_id WHERE r.{column} IS NOT NULL"
+    for column, counts in (
+        ("reservation_date", "1 AS reservations, 0 AS returns"),
+        ("return_date", "0 AS reservations, 1 AS returns"),
+    )
+    for dimension, key in (
+        ("'all'", "''"),
+        ("'category'", "COALESCE(t.category, '')"),
+        ("'tool'", "CAST(r.tool_id AS VARCHAR)"),
+    )
+)
+
+
+def upgrade() -> None:
+    op.create_table('reservation_rollups',
+    sa.Column('dimension', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('reservations', sa.Integer(), nullable=False),
+    sa.Column('returns', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key', 'day')
+    )
+    op.create_index('ix_reservation_rollups_dimension_day', 'reservation_rollups', ['dimension', 'day'], unique=False)
+    op.execute(
+        "INSERT INTO reservation_rollups (dimension, key, day, reservations, returns) "
+        f"SELECT dimension, key, day, SUM(reservations), SUM(returns) FROM ({EVENTS}) AS events "
+        "GROUP BY dimension, key, day"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_rollups_dimension_day', table_name='reservation_rollups')
+    op.drop_table('reservation_rollups')
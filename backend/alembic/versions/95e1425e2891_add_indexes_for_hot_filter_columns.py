@@ -0,0 +1,45 @@
+"""add indexes for hot filter columns
+
+Revision ID: 95e1425e2891
+Revises: 4d58dfb079dc
+Create Date: 2026-10-17 10:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '95e1425e2891'
+down_revision: Union[str, None] = '4d58dfb079dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("status = 'pending'")
+
+
+def upgrade() -> None:
+    op.create_index('ix_tools_name', 'tools', ['name'], unique=False)
+    op.create_index('ix_tools_available_created', 'tools', ['is_available', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tools_category_created', 'tools', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_reservations_user_id', 'reservations', ['user_id'], unique=False)
+    op.create_index('ix_reservations_reservation_date', 'reservations', ['reservation_date'], unique=False)
+    op.create_index('ix_reservations_is_active', 'reservations', ['is_active'], unique=False)
+    op.create_index('ix_reservations_tool_user_active', 'reservations', ['tool_id', 'user_id', 'is_active'], unique=False)
+    op.create_index('ix_tool_submissions_user_id', 'tool_submissions', ['user_id'], unique=False)
+    op.create_index('ix_tool_submissions_pending', 'tool_submissions', ['submitted_at'], unique=False,
+                    sqlite_where=PENDING, postgresql_where=PENDING)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tool_submissions_pending', table_name='tool_submissions')
+    op.drop_index('ix_tool_submissions_user_id', table_name='tool_submissions')
+    op.drop_index('ix_reservations_tool_user_active', table_name='reservations')
+    op.drop_index('ix_reservations_is_active', table_name='reservations')
+    op.drop_index('ix_reservations_reservation_date', table_name='reservations')
+    op.drop_index('ix_reservations_user_id', table_name='reservations')
+    op.drop_index('ix_tools_category_created', table_name='tools')
+    op.drop_index('ix_tools_available_created', table_name='tools')
+    op.drop_index('ix_tools_name', table_name='tools')
@@ -0,0 +1,52 @@
+"""require tools created_at
+
+Revision ID: b5d2e7a91c4f
+Revises: 08b196e50f8f
+Create Date: 2026-10-17 16:20:11.482307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search_index import CREATE_STATEMENTS, FTS_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e7a91c4f'
+down_revision: Union[str, None] = '08b196e50f8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def restore_search_triggers() -> None:
+    # SQLite rebuilds `tools` to change a column, which drops the triggers feeding the
+    # search index; the index itself keeps its rows, since the tool ids are copied
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite' and FTS_TABLE in sa.inspect(bind).get_table_names():
+        for statement in CREATE_STATEMENTS:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    # `(created_at, id)` is the keyset of the tool lists, which skips NULLs; tools from
+    # before the column had a default are ordered first. Every NULL is backfilled before
+    # the constraint is added, so upgrading a database with such tools cannot fail.
+    bind = op.get_bind()
+    earliest = bind.execute(sa.text("SELECT MIN(created_at) FROM tools")).scalar()
+    if earliest is not None:
+        bind.execute(
+            sa.text("UPDATE tools SET created_at = :earliest WHERE created_at IS NULL"),
+            {"earliest": earliest},
+        )
+    op.execute("UPDATE tools SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('tools') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    restore_search_triggers()
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tools') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    restore_search_triggers()
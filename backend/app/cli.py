@@ -0,0 +1,157 @@
+"""
+Maintenance commands for the application database.
+
+Run from the backend directory, e.g. `python -m app.cli rebuild-search-index`.
+
+Commands:
+- `rebuild-search-index`: Recomputes the full-text search index of the tool catalog.
+- `reconcile-counters`: Recounts the `library_counters` totals from the source tables and
+  reports (and, unless `--dry-run` is given, repairs) every counter that drifted.
+- `backfill-rollups`: Rebuilds the daily reservation rollups, optionally only between
+  `--since` and `--until`.
+- `gc-blobs`: Recounts the references to stored images and deletes the images no tool,
+  tool submission or user profile references (only reports them with `--dry-run`).
+- `generate-variants`: Writes the missing resized variants of every stored image and records
+  them on the tools and submissions showing it.
+"""
+
+import argparse
+import sys
+from datetime import date
+from app.database import SessionLocal, create_tables
+from app.models import (  # noqa: F401 (registers all mappers)
+    image_blob, library_counter, reservation, reservation_rollup, tool, tool_submission, user
+)
+from app.services.blob_service import BlobService
+from app.services.counter_service import CounterService
+from app.services.file_service import BLOB_NAME, FileService
+from app.services.image_pipeline import generate_variants, image_pipeline
+from app.services.rollup_service import RollupService
+from app.services.search_index import ToolSearchIndex
+
+
+def rebuild_search_index(args) -> int:
+    """Recompute the full-text search index from the `tools` table."""
+    db = SessionLocal()
+    try:
+        indexed = ToolSearchIndex.rebuild(db)
+    except RuntimeError as e:
+        print(f"Cannot rebuild the search index: {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"Search index rebuilt: {indexed} tools indexed")
+    return 0
+
+
+def reconcile_counters(args) -> int:
+    """Recount the running totals and report the counters that differed."""
+    db = SessionLocal()
+    try:
+        drift = CounterService.reconcile(db, repair=not args.dry_run)
+    finally:
+        db.close()
+    for counter in drift:
+        subject = f"[{counter.subject_id}]" if counter.subject_id else ""
+        print(f"{counter.name}{subject}: stored {counter.stored}, actual {counter.actual} "
+              f"({counter.actual - counter.stored:+d})")
+    if not drift:
+        print("Counters are consistent")
+    elif args.dry_run:
+        print(f"{len(drift)} counters drifted; run without --dry-run to repair them")
+    else:
+        print(f"{len(drift)} counters repaired")
+    return 0
+
+
+def backfill_rollups(args) -> int:
+    """Rebuild the reservation rollups of the requested date range."""
+    if args.since and args.until and args.since > args.until:
+        print("--since must not be after --until")
+        return 1
+    db = SessionLocal()
+    try:
+        written = RollupService.backfill(db, since=args.since, until=args.until)
+    finally:
+        db.close()
+    print(f"Reservation rollups rebuilt: {written} rows written")
+    return 0
+
+
+def gc_blobs(args) -> int:
+    """Delete the stored images nothing references any more."""
+    db = SessionLocal()
+    try:
+        report = BlobService.collect_garbage(db, dry_run=args.dry_run, grace=args.grace)
+    finally:
+        db.close()
+    verb = "would be" if args.dry_run else "were"
+    print(f"{report.removed} unreferenced files {verb} removed ({report.freed_bytes} bytes), "
+          f"{report.kept} kept")
+    print(f"{report.repaired} reference counts {verb} repaired")
+    return 0
+
+
+def generate_image_variants(args) -> int:
+    """Write the missing variants of the stored images and record them on their rows."""
+    if not image_pipeline.enabled:
+        print("Image variants are disabled or Pillow is not installed")
+        return 1
+    written = failed = 0
+    for path in FileService.iter_blob_files():
+        if not BLOB_NAME.match(path.name):
+            continue
+        try:
+            written += len(generate_variants(path))
+        except Exception as e:
+            failed += 1
+            print(f"{path.name}: {e}")
+    db = SessionLocal()
+    try:
+        updated = BlobService.record_variants(db)
+    finally:
+        db.close()
+    print(f"{written} variant files written, {failed} images failed, {updated} rows updated")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "rebuild-search-index", help="recompute the full-text search index of the tool catalog"
+    ).set_defaults(handler=rebuild_search_index)
+
+    reconcile = commands.add_parser(
+        "reconcile-counters", help="recount the dashboard counters and repair any drift"
+    )
+    reconcile.add_argument("--dry-run", action="store_true", help="only report the drift")
+    reconcile.set_defaults(handler=reconcile_counters)
+
+    backfill = commands.add_parser(
+        "backfill-rollups", help="rebuild the daily reservation rollups from the reservations"
+    )
+    backfill.add_argument("--since", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    backfill.add_argument("--until", type=date.fromisoformat, help="last day to rebuild (YYYY-MM-DD)")
+    backfill.set_defaults(handler=backfill_rollups)
+
+    gc = commands.add_parser(
+        "gc-blobs", help="delete stored images that no tool, submission or profile references"
+    )
+    gc.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    gc.add_argument("--grace", type=float, help="keep files uploaded in the last GRACE seconds "
+                                                "(default: BLOB_GC_GRACE)")
+    gc.set_defaults(handler=gc_blobs)
+
+    commands.add_parser(
+        "generate-variants", help="write the missing resized variants of every stored image"
+    ).set_defaults(handler=generate_image_variants)
+
+    args = parser.parse_args(argv)
+    create_tables()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
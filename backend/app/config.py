@@ -13,12 +13,37 @@ Settings include:
 - `ACCESS_TOKEN_EXPIRE_MINUTES`: The expiration time for access tokens, in minutes.
 - `VALID_ROLES`: The list of valid user roles in the application.
 - `PROJECT_NAME`: The name of the project.
+- `DB_POOL_CLASS`: Connection pool implementation (`auto`, `queue`, `null`, `static` or `singleton`).
+- `DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT`: Sizing and checkout timeout of a queue pool.
+- `DB_POOL_RECYCLE`, `DB_POOL_PRE_PING`: Connection recycling and liveness checks on checkout.
+- `SQLITE_PRAGMAS_ENABLED`: Whether the SQLite PRAGMA profile is applied to every new connection.
+- `SQLITE_JOURNAL_MODE`, `SQLITE_SYNCHRONOUS`, `SQLITE_MMAP_SIZE`, `SQLITE_CACHE_SIZE`,
+  `SQLITE_TEMP_STORE`, `SQLITE_BUSY_TIMEOUT`: Values of the SQLite PRAGMA profile.
+- `USE_ASYNC_DB`: Whether async handlers use the `AsyncSession` path instead of the sync session.
+- `ASYNC_DATABASE_URL`: Async driver URL; derived from `DATABASE_URL` (aiosqlite, asyncpg) when unset.
+- `AUTH_CACHE_SIZE`, `AUTH_CACHE_TTL`: Size and lifetime of the cache of authenticated users per token.
+- `BCRYPT_ROUNDS`: bcrypt cost of new password hashes; older hashes are upgraded at login.
+- `PASSWORD_HASH_WORKERS`, `PASSWORD_HASH_MAX_QUEUE`, `PASSWORD_HASH_RETRY_AFTER`: Size and back-pressure
+  of the thread pool running bcrypt.
+- `ADMIN_STATS_CACHE_TTL`: Seconds the admin dashboard statistics are cached between writes.
+- `MAX_UPLOAD_SIZE`, `UPLOAD_CHUNK_SIZE`: Largest accepted image upload and the chunk size it is copied in.
+- `UPLOAD_FORM_OVERHEAD`: Bytes a multipart upload request may carry besides the file.
+- `BLOB_GC_GRACE`: Seconds an unreferenced image blob is kept before garbage collection may remove it.
+- `IMAGE_VARIANTS_ENABLED`, `IMAGE_PIPELINE_WORKERS`, `IMAGE_VARIANT_QUALITY`: Generation of the resized
+  WebP/JPEG variants of uploaded images.
+- `UPLOAD_CACHE_MAX_AGE`: Browser cache lifetime of uploaded files not named after their content.
+- `RESPONSE_CACHE_BACKEND`, `RESPONSE_CACHE_SIZE`, `RESPONSE_CACHE_TTL`: Backend, size and entry lifetime
+  of the cache of rendered tool catalog responses.
+- `COMPRESSION_ENABLED`, `COMPRESSION_MINIMUM_SIZE`, `COMPRESSION_GZIP_LEVEL`, `COMPRESSION_BROTLI_QUALITY`:
+  gzip/brotli compression of responses, the smallest body compressed and the compression levels.
+- `COMPRESSION_CACHE_SIZE`: Compressed bodies of cacheable responses kept for reuse.
+- `BATCH_MAX_IDS`: Most IDs a multi-get of tools or users accepts.
 
 The `Config` class within `Settings` specifies the location of the environment file.
 """
 
 from pydantic import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """
@@ -34,6 +59,65 @@ class Settings(BaseSettings):
     VALID_ROLES: List[str] = ["user", "admin"]  # List of valid user roles
     PROJECT_NAME: str = "Tool Lending Library"  # Name of the project
 
+    # Database connection pool
+    DB_POOL_CLASS: str = "auto"  # "auto" picks StaticPool for in-memory SQLite and QueuePool otherwise
+    DB_POOL_SIZE: int = 5  # Connections kept open in a queue pool
+    DB_MAX_OVERFLOW: int = 10  # Extra connections a queue pool may open under load
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Seconds after which a connection is replaced (-1 disables)
+    DB_POOL_PRE_PING: bool = True  # Test connections for liveness on checkout
+
+    # SQLite PRAGMA profile applied on every new connection
+    SQLITE_PRAGMAS_ENABLED: bool = True  # Disable to keep SQLite's built-in defaults
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers proceed while a writer commits
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # NORMAL is durable in WAL mode and avoids an fsync per commit
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of the database file to memory-map (256 MB)
+    SQLITE_CACHE_SIZE: int = -64000  # Page cache size; negative values are in KiB (64 MB)
+    SQLITE_TEMP_STORE: str = "MEMORY"  # Keep temporary tables and indices in memory
+    SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds to wait on a locked database before failing
+
+    # Async database access
+    USE_ASYNC_DB: bool = False  # Serve async handlers through the async engine
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with an async driver
+
+    # Cache of authenticated users, keyed by access token
+    AUTH_CACHE_SIZE: int = 1024  # Maximum number of cached tokens (0 disables the cache)
+    AUTH_CACHE_TTL: float = 60  # Seconds a token stays cached; never longer than the token is valid
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost factor (each step doubles the work)
+    PASSWORD_HASH_WORKERS: int = 4  # Threads running bcrypt concurrently
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Jobs allowed to wait for a thread before answering 503
+    PASSWORD_HASH_RETRY_AFTER: int = 1  # Seconds suggested in the Retry-After header of a 503
+
+    # Admin dashboard
+    ADMIN_STATS_CACHE_TTL: float = 30  # Upper bound; writes to the counted tables drop the cache sooner
+
+    # Image uploads
+    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # Bytes; larger uploads are rejected with 413 (10 MB)
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024  # Bytes read and written at a time while storing an upload
+    UPLOAD_FORM_OVERHEAD: int = 64 * 1024  # Boundaries and other form fields; larger requests get 413 unread
+    BLOB_GC_GRACE: float = 3600  # Protects blobs uploaded but not yet referenced by a committed row
+    IMAGE_VARIANTS_ENABLED: bool = True  # Generate resized variants of uploads (needs Pillow)
+    IMAGE_PIPELINE_WORKERS: int = 2  # Threads encoding image variants in the background
+    IMAGE_VARIANT_QUALITY: int = 80  # WebP and JPEG quality of the variants (1-100)
+    UPLOAD_CACHE_MAX_AGE: int = 86400  # Seconds; content-named files are cached for a year instead
+
+    # Cache of rendered tool catalog responses
+    RESPONSE_CACHE_BACKEND: str = "local"  # "local" (per-process LRU), "shared" or "none"
+    RESPONSE_CACHE_SIZE: int = 512  # Responses kept by the local backend
+    RESPONSE_CACHE_TTL: float = 60  # Seconds; writes invalidate sooner, other workers' local caches only then
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True  # Compress responses with brotli (when installed) or gzip
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes; smaller bodies gain little and are sent as they are
+    COMPRESSION_GZIP_LEVEL: int = 6  # gzip level (1-9)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # brotli quality (0-11); above ~5 the CPU cost grows steeply
+    COMPRESSION_CACHE_SIZE: int = 256  # Compressed catalog bodies kept; they live as long as cached responses
+
+    # Multi-get endpoints
+    BATCH_MAX_IDS: int = 100  # IDs resolved by one IN query; more are rejected with a 400
+
     class Config:
         """
         Configuration for loading environment variables.
@@ -1,16 +1,22 @@
 """
-This module provides security utilities for password hashing, verification, and JWT token generation.
+This module provides JWT token generation and resolution of the current user. Password
+hashing and verification live in `app.core.security`.
 
 Components:
-- `pwd_context`: Configures `passlib` to use bcrypt for password hashing.
-- `hash_password`: Hashes passwords.
-- `verify_password`: Compares plain text passwords with hashed ones.
-- `create_access_token`: Generates JWT tokens with embedded user roles.
+- `create_access_token`: Generates JWT tokens with embedded user IDs and roles.
 - `get_current_user_role`: Extracts the user's role from the JWT token.
-- `get_current_user`: Retrieves the current user based on the JWT token.
+- `get_current_user`: Retrieves the current user based on the JWT token. It is the only
+  authentication dependency; `app.core.deps` re-exports it.
+- `invalidate_user`: Drops the cached authentication of a user after their record changed.
+
+Resolved tokens are kept in `auth_cache`, a TTL+LRU cache holding the decoded payload and a
+`UserSnapshot` per token, so repeated requests with the same token skip the signature check
+and the `users` lookup. An entry never outlives its token.
 """
 
+import time
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 from jose import jwt, JWTError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -18,6 +24,7 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.utils.cache import TTLCache
 
 # Secret key and algorithm for JWT encoding, loaded from settings.
 SECRET_KEY = settings.SECRET_KEY
@@ -25,13 +32,64 @@ ALGORITHM = settings.ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
-def create_access_token(data: dict, role: str):
+
+class UserSnapshot(NamedTuple):
+    """
+    Immutable copy of the user fields needed to authorize a request.
+
+    It is loaded as plain columns rather than a `User` instance and is bound to no session,
+    so it is cheap to build and can be shared between requests.
+    """
+    id: int
+    username: Optional[str]
+    email: str
+    role: str
+    is_active: bool
+
+
+# Columns loaded into a `UserSnapshot`, in field order
+SNAPSHOT_COLUMNS = (User.id, User.username, User.email, User.role, User.is_active)
+
+
+class CachedToken(NamedTuple):
+    """A verified token: its decoded payload and the user it resolved to."""
+    payload: dict
+    user: UserSnapshot
+
+
+# Verified tokens, keyed by the raw token string
+auth_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# Bumped by every invalidation, so a lookup racing with one does not cache stale data
+_invalidations = 0
+
+
+def invalidate_user(user_id: int) -> int:
+    """
+    Drop every cached token of a user, so the next request reloads their record.
+
+    Call it after committing a change to the user's role or profile.
+
+    Args:
+    - user_id (int): ID of the changed user.
+
+    Returns:
+    - int: Number of dropped cache entries.
+    """
+    global _invalidations
+    _invalidations += 1
+    return auth_cache.discard_where(lambda token, entry: entry.user.id == user_id)
+
+
+def create_access_token(data: dict, role: str, user_id: Optional[int] = None):
     """
     Generates a JWT token with user data, role, and expiration.
 
     Args:
     - data (dict): Information to include in the token.
     - role (str): User role to be embedded in the token.
+    - user_id (Optional[int]): User ID embedded as the `uid` claim, so the user is
+      resolved by primary key.
     
     Returns:
     - str: Encoded JWT token.
@@ -39,6 +97,8 @@ def create_access_token(data: dict, role: str):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "role": role})
+    if user_id is not None:
+        to_encode["uid"] = user_id
     
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -55,8 +115,9 @@ def get_current_user_role(token: str):
     Raises:
     - HTTPException: If the role is missing or the token is invalid.
     """
+    cached = auth_cache.get(token)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = cached.payload if cached else jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         role = payload.get("role")
         
         if role is None:
@@ -86,16 +147,25 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     """
     Retrieves the current user based on the JWT token.
 
+    The user is looked up by the primary key in the token's `uid` claim; tokens issued
+    before that claim existed fall back to the username in `sub`. A token seen recently is
+    answered from `auth_cache` without verifying its signature again or querying the
+    database.
+
     Args:
     - token (str): JWT token.
     - db (Session): Database session.
 
     Returns:
-    - User: Current user object.
+    - UserSnapshot: Current user.
 
     Raises:
     - HTTPException: If the user is not found or the token is invalid.
     """
+    cached = auth_cache.get(token)
+    if cached:
+        return cached.user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -104,12 +174,25 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id = payload.get("uid")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+
+    invalidations = _invalidations
+    query = db.query(*SNAPSHOT_COLUMNS)
+    if isinstance(user_id, int):
+        row = query.filter(User.id == user_id).first()
+        # A token naming another user than the one now holding its ID is not trusted
+        if row is not None and row.username != username:
+            row = None
+    else:
+        row = query.filter(User.username == username).first()
+    if row is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+
+    snapshot = UserSnapshot(*row)
+    if invalidations == _invalidations:
+        auth_cache.set(token, CachedToken(payload, snapshot), ttl=payload.get("exp", 0) - time.time())
+    return snapshot
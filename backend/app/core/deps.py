@@ -1,39 +1,17 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.auth import get_current_user_role
-from app.database import get_db
-from app.models.user import User
-
-# OAuth2PasswordBearer retrieves the token from the Authorization header.
-# `tokenUrl` is the endpoint where clients can obtain a token.
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """
-    Retrieves the current user based on the JWT token.
+"""
+Authentication dependencies for the API routers.
 
-    Args:
-    - token (str): JWT token from the Authorization header.
-    - db (Session): Database session provided via FastAPI dependency.
+`get_current_user` is the single dependency resolving a bearer token to the current user;
+it is defined in `app.core.auth` and re-exported here, so routers importing it from either
+module share one resolution path and one cache.
 
-    Returns:
-    - User: The user corresponding to the role in the token.
+Functions:
+- `get_current_user`: Resolves the bearer token to a `UserSnapshot`.
+- `role_required`: Builds a dependency that rejects users without one of the given roles.
+"""
 
-    Raises:
-    - HTTPException: If no user is found or the token is invalid (401 Unauthorized).
-    """
-    # Get the role from the token.
-    role = get_current_user_role(token)
-    
-    # Query the database for a user with the matching role.
-    user = db.query(User).filter(User.role == role).first()
-    
-    # Raise an exception if no user matches the role.
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-    
-    return user
+from fastapi import Depends, HTTPException, status
+from app.core.auth import UserSnapshot, get_current_user, oauth2_scheme  # noqa: F401 (re-exported)
 
 def role_required(*required_roles: str):
     """
@@ -48,7 +26,7 @@ def role_required(*required_roles: str):
     Raises:
     - HTTPException: If the user's role is unauthorized (403 Forbidden).
     """
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: UserSnapshot = Depends(get_current_user)):
         # Check if the user's role matches any of the required roles.
         if current_user.role not in required_roles:
             # Raise a 403 error if the role is unauthorized.
@@ -1,30 +1,174 @@
+"""
+Password hashing and verification with bcrypt.
+
+bcrypt is deliberately slow, so it never runs on the event loop. Every hash and
+verification goes through `password_hasher`, which runs them on a dedicated thread pool of
+`PASSWORD_HASH_WORKERS` threads (bcrypt releases the GIL while hashing). At most
+`PASSWORD_HASH_MAX_QUEUE` further jobs may wait for a worker; beyond that,
+`PasswordHasherBusy` is raised and answered with 503 and a `Retry-After` header instead of
+letting a login storm stall every other request.
+
+The handlers hashing or verifying passwords are sync, as they also query the database:
+FastAPI runs them on its threadpool, whose thread waits for the bcrypt job without using
+the CPU. The bounded pool is what caps how many hashes run at once.
+
+Hashes created with another cost than `BCRYPT_ROUNDS` are reported by
+`verify_and_update_password` together with a replacement hash, so stored hashes follow
+the configured cost as users log in.
+
+Functions:
+- `get_password_hash`: Hashes passwords.
+- `verify_password`: Compares plain text passwords with hashed ones.
+- `verify_and_update_password`: Verifies a password and returns a new hash if the stored one is outdated.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-# Initialize the password hashing context using the bcrypt algorithm
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import settings
+
+# Initialize the password hashing context using the bcrypt algorithm.
+# Hashes with any other cost than BCRYPT_ROUNDS need an update.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(HTTPException):
+    """Raised when the password hashing pool has no room for another job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt operations on a bounded thread pool.
+
+    Jobs beyond the workers wait in the pool's queue, up to `max_queue` of them; further
+    jobs are rejected with `PasswordHasherBusy`. The calling thread waits for the job.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int, retry_after: int):
+        self.context = context
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0  # Jobs submitted and not yet finished, running or queued
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _submit(self, function: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusy(self.retry_after)
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._submit(self.context.verify, password, hashed_password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return self._submit(self.context.verify_and_update, password, hashed_password).result()
+
+    def stats(self) -> dict:
+        """
+        Return the pool's load.
+
+        Returns:
+            dict: `workers`, `max_queue`, `running`, `queued` (jobs waiting for a worker),
+            `peak_pending`, `completed` and `rejected`.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(self._pending, self.workers),
+                "queued": max(self._pending - self.workers, 0),
+                "peak_pending": self._peak_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
 
 def get_password_hash(password: str) -> str:
     """
     Hashes a plain text password using the bcrypt algorithm.
-    
+
     Args:
         password (str): The plain text password to be hashed.
-    
+
     Returns:
         str: The securely hashed password.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
     """
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies if the plain text password matches the hashed password.
-    
+
     Args:
         plain_password (str): The plain text password to verify.
         hashed_password (str): The previously hashed password to compare against.
-    
+
     Returns:
         bool: True if the passwords match, False otherwise.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
+    """
+    return password_hasher.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    Verifies a password and rehashes it if the stored hash uses another bcrypt cost.
 
+    Args:
+        plain_password (str): The plain text password to verify.
+        hashed_password (str): The stored hash.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and a hash with the
+        configured cost to store in place of the old one, or None if it is current.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
+    """
+    return password_hasher.verify_and_update(plain_password, hashed_password)
@@ -1,34 +1,462 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, event, exc, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import Session, object_mapper, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, SingletonThreadPool, StaticPool
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters describing how the connection pool is being used.
+
+    Checkouts and checkins are recorded through pool events, while the time spent
+    waiting for a connection is recorded by `InstrumentedQueuePool`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters to zero."""
+        with self._lock:
+            self.connections_opened = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.waits = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+            self.timeouts = 0
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        """Return the current counters as a plain dictionary."""
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "timeouts": self.timeouts,
+                "wait_time_avg_ms": (self.wait_time_total / self.waits * 1000) if self.waits else 0.0,
+                "wait_time_max_ms": self.wait_time_max * 1000,
+            }
+
+
+# Metrics for every engine built by `build_engine`
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long callers wait for a connection.
+
+    The wait covers both blocking on an exhausted pool and opening a new connection,
+    which is exactly the latency a request pays before its first query runs.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+
+POOL_CLASSES = {
+    "queue": InstrumentedQueuePool,
+    "null": NullPool,
+    "static": StaticPool,
+    "singleton": SingletonThreadPool,
+}
+
+
+def is_sqlite_memory(url) -> bool:
+    """
+    Check whether a database URL points to an in-memory SQLite database.
+
+    Args:
+        url: Database URL as a string or SQLAlchemy `URL`.
+
+    Returns:
+        bool: True for `sqlite://`, `sqlite:///:memory:` and `mode=memory` URLs.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def get_engine_options(url) -> dict:
+    """
+    Build the keyword arguments for `create_engine` from the pool settings.
+
+    With `DB_POOL_CLASS = "auto"`, in-memory SQLite databases get a `StaticPool` so every
+    thread sees the same database, while SQLite files and server databases get a
+    `QueuePool` so threadpool-executed endpoints can run on separate connections.
+
+    Args:
+        url: Database URL as a string or SQLAlchemy `URL`.
+
+    Returns:
+        dict: Options for `create_engine`.
+
+    Raises:
+        ValueError: If `DB_POOL_CLASS` is not a known pool name.
+    """
+    url = make_url(url)
+    pool_name = settings.DB_POOL_CLASS.lower()
+    if pool_name == "auto":
+        pool_name = "static" if is_sqlite_memory(url) else "queue"
+    if pool_name not in POOL_CLASSES:
+        raise ValueError(
+            f"Invalid DB_POOL_CLASS: {settings.DB_POOL_CLASS}. "
+            f"Allowed values: auto, {', '.join(POOL_CLASSES)}"
+        )
+
+    options = {
+        "poolclass": POOL_CLASSES[pool_name],
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if url.get_backend_name() == "sqlite":
+        # Connections are handed between worker threads, never shared concurrently
+        options["connect_args"] = {"check_same_thread": False}
+    if pool_name == "queue":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_LEVELS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+SQLITE_TEMP_STORES = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+
+def get_sqlite_pragmas() -> dict:
+    """
+    Build the PRAGMA profile applied to every new SQLite connection.
+
+    `busy_timeout` comes first so that switching the journal mode waits for other
+    connections instead of failing while the database is locked.
+
+    Returns:
+        dict: PRAGMA names mapped to the values to set, in the order they are applied.
+
+    Raises:
+        ValueError: If a PRAGMA setting has a value SQLite does not accept.
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    temp_store = settings.SQLITE_TEMP_STORE.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {settings.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {settings.SQLITE_SYNCHRONOUS}")
+    if temp_store not in SQLITE_TEMP_STORES:
+        raise ValueError(f"Invalid SQLITE_TEMP_STORE: {settings.SQLITE_TEMP_STORE}")
+
+    return {
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT),
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "cache_size": int(settings.SQLITE_CACHE_SIZE),
+        "mmap_size": int(settings.SQLITE_MMAP_SIZE),
+        "temp_store": temp_store,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """
+    Engine `connect` hook applying the PRAGMA profile to a new SQLite connection.
+
+    Args:
+        dbapi_connection: The raw `sqlite3` connection.
+        connection_record: The pool's record for the connection (unused).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def read_sqlite_pragmas(target_engine=None) -> dict:
+    """
+    Read back the effective values of the PRAGMAs of the profile.
+
+    Args:
+        target_engine: Engine to inspect, defaults to the application engine.
+
+    Returns:
+        dict: Effective PRAGMA values, or an empty dict for non-SQLite databases.
+    """
+    target_engine = target_engine or engine
+    if target_engine.dialect.name != "sqlite":
+        return {}
+
+    effective = {}
+    with target_engine.connect() as connection:
+        for name in get_sqlite_pragmas():
+            value = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            effective[name] = value.upper() if isinstance(value, str) else value
+    return effective
+
+
+def check_sqlite_pragmas(target_engine=None) -> dict:
+    """
+    Read back the effective PRAGMA values and log any that differ from the profile.
+
+    SQLite silently keeps its own value when a PRAGMA cannot be applied, e.g. in-memory
+    databases always report `journal_mode=memory`, so this is run once at startup;
+    `read_sqlite_pragmas` reports the values without logging.
+
+    Args:
+        target_engine: Engine to inspect, defaults to the application engine.
+
+    Returns:
+        dict: Effective PRAGMA values, or an empty dict for non-SQLite databases.
+    """
+    effective = read_sqlite_pragmas(target_engine)
+    if not effective:
+        return effective
+
+    expected = get_sqlite_pragmas()
+    expected["synchronous"] = SQLITE_SYNCHRONOUS_LEVELS[expected["synchronous"]]
+    expected["temp_store"] = SQLITE_TEMP_STORES[expected["temp_store"]]
+    if settings.SQLITE_PRAGMAS_ENABLED:
+        for name, value in expected.items():
+            if effective[name] != value:
+                logger.warning("SQLite PRAGMA %s is %s instead of %s", name, effective[name], value)
+    logger.info("Effective SQLite PRAGMAs: %s", effective)
+    return effective
+
+
+def register_engine_hooks(target_engine):
+    """
+    Wire an engine to the pool metrics and, for SQLite, to the PRAGMA profile.
+
+    Args:
+        target_engine: A sync `Engine`, or the `sync_engine` of an async engine.
+    """
+    event.listen(target_engine, "connect", lambda dbapi_connection, record: pool_metrics.record_connect())
+    event.listen(target_engine, "checkout", lambda dbapi_connection, record, proxy: pool_metrics.record_checkout())
+    event.listen(target_engine, "checkin", lambda dbapi_connection, record: pool_metrics.record_checkin())
+    if target_engine.dialect.name == "sqlite" and settings.SQLITE_PRAGMAS_ENABLED:
+        event.listen(target_engine, "connect", apply_sqlite_pragmas)
+
+
+def build_engine(url: str = settings.DATABASE_URL):
+    """
+    Create an engine configured from the settings and wired to the pool metrics.
+
+    SQLite engines also get the PRAGMA profile applied on every new connection
+    unless `SQLITE_PRAGMAS_ENABLED` is off.
+
+    Args:
+        url (str): Database URL, defaults to `settings.DATABASE_URL`.
+
+    Returns:
+        Engine: The configured SQLAlchemy engine.
+    """
+    new_engine = create_engine(url, **get_engine_options(url))
+    register_engine_hooks(new_engine)
+    return new_engine
+
+
+# Async drivers used when `ASYNC_DATABASE_URL` is not set explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str = settings.DATABASE_URL) -> str:
+    """
+    Derive the async driver URL for a database URL.
+
+    Args:
+        url (str): Sync database URL, defaults to `settings.DATABASE_URL`.
+
+    Returns:
+        str: `settings.ASYNC_DATABASE_URL` if set, otherwise `url` with its async driver.
+
+    Raises:
+        ValueError: If no async driver is known for the database backend.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases; set ASYNC_DATABASE_URL")
+    return str(url.set(drivername=ASYNC_DRIVERS[backend]))
+
+
+def build_async_engine(url: str = None):
+    """
+    Create an async engine with the same pool settings and hooks as `build_engine`.
+
+    Async engines need an asyncio-aware queue pool, so `AsyncAdaptedQueuePool` takes the
+    place of `InstrumentedQueuePool`; checkouts are still counted through pool events.
+
+    Args:
+        url (str): Async database URL, defaults to `get_async_database_url()`.
+
+    Returns:
+        AsyncEngine: The configured async SQLAlchemy engine.
+    """
+    url = url or get_async_database_url()
+    options = get_engine_options(url)
+    if options["poolclass"] is InstrumentedQueuePool:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    new_engine = create_async_engine(url, **options)
+    register_engine_hooks(new_engine.sync_engine)
+    return new_engine
+
+
 # Create the SQLAlchemy engine for connecting to the database
-# The engine uses the database URL from the settings and a static connection pool.
-# StaticPool is suitable for single-threaded applications or tests.
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite to allow usage across threads
-    poolclass=StaticPool  # StaticPool is used here to avoid creating multiple connections
-)
+# The pool class and its sizing come from the settings (see `get_engine_options`).
+engine = build_engine()
 
 # Create a configured "Session" class to be used for creating database sessions
 # This session factory handles the transactions and queries for the application.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, only created when `USE_ASYNC_DB` is enabled so the
+# async driver is not required otherwise.
+# `expire_on_commit=False` keeps loaded attributes usable after commit, since expired
+# attributes cannot be lazily refreshed outside of an awaited call.
+async_engine = build_async_engine() if settings.USE_ASYNC_DB else None
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base class for all SQLAlchemy declarative models
 # This class maintains the metadata for all models and provides a base class for model definitions.
 Base = declarative_base()
 
+# Callables run with the names of the tables written by each committed transaction
+_write_listeners = []
+
+def on_committed_writes(listener):
+    """
+    Register `listener(tables)` to run after every commit that wrote to the database.
+
+    `tables` is the set of table names the transaction inserted into, updated or deleted
+    from, through flushed objects or ORM bulk statements. Caches use it to drop entries
+    derived from those tables. Usable as a decorator.
+    """
+    _write_listeners.append(listener)
+    return listener
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    tables = session.info.setdefault("written_tables", set())
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        tables.add(object_mapper(instance).local_table.name)
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_select or orm_execute_state.bind_mapper is None:
+        return
+    tables = orm_execute_state.session.info.setdefault("written_tables", set())
+    tables.add(orm_execute_state.bind_mapper.local_table.name)
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_writes(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        for listener in _write_listeners:
+            listener(tables)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop("written_tables", None)
+
 def create_tables():
     """
     Create all tables in the database based on the metadata of the declarative models.
 
     This function uses the `Base.metadata.create_all` method to generate the database schema.
-    It ensures that all defined models have corresponding tables created in the database.
+    It ensures that all defined models have corresponding tables created in the database,
+    along with the full-text search index of the tool catalog where the database supports it.
+    Newly created `library_counters` and `reservation_rollups` tables are filled from the
+    existing rows.
     """
+    from app.services.counter_service import CounterService
+    from app.services.rollup_service import RollupService
+    from app.services.search_index import ToolSearchIndex
+
+    existing_tables = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        ToolSearchIndex.ensure(connection)
+
+    db = SessionLocal()
+    try:
+        if "library_counters" not in existing_tables:
+            CounterService.reconcile(db)
+        if "reservation_rollups" not in existing_tables:
+            RollupService.backfill(db)
+    finally:
+        db.close()
+
+def get_pool_status() -> dict:
+    """
+    Report the pool configuration together with its usage metrics.
+
+    Returns:
+        dict: Pool class, current pool status and the `PoolMetrics` counters.
+    """
+    return {
+        "pool_class": type(engine.pool).__name__,
+        "status": engine.pool.status(),
+        **pool_metrics.snapshot(),
+    }
 
 def get_db():
     """
@@ -36,8 +464,8 @@ def get_db():
 
     Yields:
         Session: A SQLAlchemy session instance used for interacting with the database.
-    
-    This function is designed to be used as a dependency in FastAPI routes to ensure that 
+
+    This function is designed to be used as a dependency in FastAPI routes to ensure that
     each request gets a new session and that the session is properly closed after the request.
     """
     db = SessionLocal()
@@ -45,3 +473,13 @@ def get_db():
         yield db  # Provide the session to the request
     finally:
         db.close()  # Ensure the session is closed after use
+
+async def get_async_db():
+    """
+    Dependency function to provide an async database session.
+
+    Yields:
+        AsyncSession: A session bound to the async engine, closed after the request.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
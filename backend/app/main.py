@@ -8,7 +8,10 @@ application such as user management, tool management, and authentication.
 
 Components:
 - `create_tables()`: Function to create database tables based on the model metadata.
+- `check_sqlite_pragmas()`: Startup check reporting the effective SQLite PRAGMA values.
 - `app`: Instance of the FastAPI application.
+- `CompressionMiddleware`: gzip/brotli compression of responses, see `app.utils.compression`.
+- `UploadSizeLimitMiddleware`: Rejects oversized uploads before parsing them, see `app.utils.upload_limits`.
 - Routers: 
   - `auth.auth_router`: Handles authentication-related routes.
   - `user.router`: Manages user-related routes.
@@ -19,8 +22,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import user, tool, auth, reservation, admin, tool_submission
 from app.config import settings
-from app.database import create_tables
-from fastapi.staticfiles import StaticFiles
+from app.database import create_tables, check_sqlite_pragmas
+from app.utils.compression import CompressionMiddleware
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.serializers import FastJSONResponse
+from app.utils.static_files import UploadFiles
+from app.utils.upload_limits import UploadSizeLimitMiddleware
 from pathlib import Path
 
 
@@ -28,7 +35,16 @@ from pathlib import Path
 create_tables()
 
 # Initialize the FastAPI application with a title from settings
-app = FastAPI(title=settings.PROJECT_NAME)
+# Responses are encoded with orjson when it is installed
+app = FastAPI(title=settings.PROJECT_NAME, default_response_class=FastJSONResponse)
+
+@app.on_event("startup")
+def report_database_settings():
+    """Report the effective SQLite PRAGMA profile once the application starts."""
+    check_sqlite_pragmas()
+
+# Reject oversized uploads before Starlette spools them; inside CORS so browsers can read the 413
+app.add_middleware(UploadSizeLimitMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -37,8 +53,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER],  # Let the frontend read pagination cursors
 )
 
+# Compress large text responses, such as the tool catalog, with brotli or gzip
+app.add_middleware(CompressionMiddleware)
+
 # Include the routers for various parts of the application
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(user.router, prefix="/api/v1/users", tags=["users"])
@@ -51,8 +71,8 @@ app.include_router(
     tags=["tool-submissions"]
 )
 
-# Mount static file directory
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Mount static file directory, with ETags, immutable caching of content-named files and ranges
+app.mount("/uploads", UploadFiles(directory="uploads"), name="uploads")
 
 
 
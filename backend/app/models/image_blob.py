@@ -0,0 +1,21 @@
+"""
+Module defining the ImageBlob model for the Tool Lending Library application.
+
+Uploaded images are stored once per distinct content, under a name derived from the
+SHA-256 of their bytes (see `FileService`). Each row counts the tools, tool submissions
+and user profiles whose image URL points at the blob, so a blob can be removed once
+nothing references it.
+
+Attributes:
+- `name` (String): File name of the blob, the hex digest followed by the image extension.
+- `ref_count` (Integer): Number of rows whose image URL references the blob.
+"""
+
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class ImageBlob(Base):
+    __tablename__ = "image_blobs"
+
+    name = Column(String, primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
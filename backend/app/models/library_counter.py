@@ -0,0 +1,29 @@
+"""
+Module defining the LibraryCounter model for the Tool Lending Library application.
+
+Each row holds one running total that the services keep up to date in the same
+transaction as the write it counts, so dashboard figures are read from a handful of rows
+instead of counted over whole tables.
+
+Attributes:
+- `name` (String): What is counted, e.g. "tools_available" (see `app.services.counter_service`).
+- `subject_id` (Integer): The entity the count belongs to, e.g. a user ID for
+  "user_reservations"; 0 for library-wide counters.
+- `value` (Integer): The current count.
+
+Indexes:
+- `ix_library_counters_name_value`: Serves top-N queries such as the most active users.
+"""
+
+from sqlalchemy import Column, Index, Integer, String
+from app.database import Base
+
+class LibraryCounter(Base):
+    __tablename__ = "library_counters"
+    __table_args__ = (
+        Index("ix_library_counters_name_value", "name", "value"),
+    )
+
+    name = Column(String, primary_key=True)
+    subject_id = Column(Integer, primary_key=True, default=0, autoincrement=False)
+    value = Column(Integer, nullable=False, default=0)
@@ -1,16 +1,20 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, Date, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Active reservation lookups by checkout and return filter on all three columns
+        Index("ix_reservations_tool_user_active", "tool_id", "user_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tool_id = Column(Integer, ForeignKey("tools.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    reservation_date = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    reservation_date = Column(Date, nullable=False, index=True)
     return_date = Column(Date, nullable=True)
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
     is_checked_out = Column(Boolean, default=False)
 
     tool = relationship("Tool", back_populates="reservations")
@@ -0,0 +1,34 @@
+"""
+Module defining the ReservationRollup model for the Tool Lending Library application.
+
+Each row counts the reservations made for, and the returns made on, one day, either for
+the whole library or for one category or tool, so trend statistics read a few rows per
+day instead of the `reservations` table.
+
+Attributes:
+- `dimension` (String): "all" for the whole library, "category" or "tool".
+- `key` (String): The category name or tool ID; "" for "all" and for uncategorized tools.
+- `day` (Date): The reservation date of counted reservations, the return date of returns.
+- `reservations` (Integer): Reservations for the day.
+- `returns` (Integer): Returns on the day.
+
+The primary key `(dimension, key, day)` serves date ranges of one series.
+
+Indexes:
+- `ix_reservation_rollups_dimension_day`: Serves per-category and per-tool breakdowns of a date range.
+"""
+
+from sqlalchemy import Column, Date, Index, Integer, String
+from app.database import Base
+
+class ReservationRollup(Base):
+    __tablename__ = "reservation_rollups"
+    __table_args__ = (
+        Index("ix_reservation_rollups_dimension_day", "dimension", "day"),
+    )
+
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True, default="")
+    day = Column(Date, primary_key=True)
+    reservations = Column(Integer, nullable=False, default=0)
+    returns = Column(Integer, nullable=False, default=0)
@@ -9,29 +9,49 @@ Attributes:
 - `description` (String): Brief description of the tool.
 - `category` (String): Tool category, indexed for efficient search operations.
 - `owner_id` (Integer): Foreign key linking the tool to its owner's `id` in the User model.
+- `image_url` (String): URL of the tool's image as uploaded.
+- `image_variants` (JSON): URLs of the resized variants of the image, per variant and
+  encoding, e.g. `{"thumb": {"webp": ..., "jpeg": ...}, ...}`; null without variants.
+
+Indexes:
+- `ix_tools_available_created`: Serves the catalog listing, which filters on `is_available`
+  and pages by `(created_at, id)`.
+- `ix_tools_category_created`: Serves category listings, paged the same way, and any
+  other lookup by `category`.
 
 Relationships:
 - `owner`: Establishes a many-to-one relationship with the User model, linking tools to their respective owners.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Index, JSON
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
 
 
+def thumbnail_url(image_url, image_variants):
+    """The small image shown in listings, or the original when it has no variants."""
+    if image_variants:
+        return image_variants["thumb"]["webp"]
+    return image_url
+
+
 class Tool(Base):
     """
     The Tool model represents a tool entity in the 'tools' table.
     Each tool is linked to a user (the owner) via a foreign key.
     """
     __tablename__ = "tools"  # Name of the table in the database
+    __table_args__ = (
+        Index("ix_tools_available_created", "is_available", "created_at", "id"),
+        Index("ix_tools_category_created", "category", "created_at", "id"),
+    )
 
     # Primary key for each tool, unique and auto-incremented
     id = Column(Integer, primary_key=True, index=True)
     
     # Name of the tool, indexed for faster search performance
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     
     # Brief description of the tool, explaining its purpose or features
     description = Column(String, nullable=True)
@@ -53,9 +73,13 @@ class Tool(Base):
 
     image_url = Column(String, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # SQL NULL rather than JSON null until the variants are generated, so they can be found
+    image_variants = Column(JSON(none_as_null=True), nullable=True)
 
+    # Part of the `(created_at, id)` keyset of the tool lists, so never NULL
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-   
-    
- 
\ No newline at end of file
+    @property
+    def thumbnail_url(self):
+        """The small image shown in listings, or the original when it has no variants."""
+        return thumbnail_url(self.image_url, self.image_variants)
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Index, JSON, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.models.tool import thumbnail_url
 
 class ToolSubmission(Base):
     __tablename__ = "tool_submissions"
+    __table_args__ = (
+        # Only pending submissions are ever listed, so only they are indexed
+        Index(
+            "ix_tool_submissions_pending",
+            "submitted_at",
+            sqlite_where=text("status = 'pending'"),
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -12,8 +22,14 @@ class ToolSubmission(Base):
     category = Column(String)
     condition = Column(String)
     image_url = Column(String, nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    image_variants = Column(JSON(none_as_null=True), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     status = Column(String, default="pending")
     submitted_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="tool_submissions")
+
+    @property
+    def thumbnail_url(self):
+        """The small image shown in listings, or the original when it has no variants."""
+        return thumbnail_url(self.image_url, self.image_variants)
@@ -1,72 +1,112 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from app.database import get_db
-from app.models.tool import Tool
-from app.models.reservation import Reservation
-from app.models.user import User
-from app.core.auth import get_current_user
-from app.models.tool_submission import ToolSubmission
+from app.database import get_db, get_pool_status, read_sqlite_pragmas
+from app.core.auth import UserSnapshot, auth_cache, get_current_user
+from app.core.security import password_hasher
+from app.services.image_pipeline import image_pipeline
+from app.services.rollup_service import ALL, CATEGORY, TOOL, RollupService
+from app.services.stats_service import StatsService, stats_cache
+from app.utils.compression import compressor
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 
 @router.get("/stats", tags=["admin"])
 def get_admin_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get comprehensive statistics for admin dashboard."""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    # Basic stats
-    total_tools = db.query(Tool).count()
-    active_reservations = db.query(Reservation).filter(Reservation.is_active == True).count()
-    total_users = db.query(User).count()
+    return StatsService.get_admin_statistics(db)
 
-    # Tool availability stats
-    available_tools = db.query(Tool).filter(Tool.is_available == True).count()
-    checked_out_tools = total_tools - available_tools
+def trend_range(start: Optional[date], end: Optional[date]):
+    """Default a trend range to the 30 days ending today."""
+    end = end or date.today()
+    return start or end - timedelta(days=29), end
 
-    # Reservation stats for last 30 days
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    monthly_reservations = (
-        db.query(Reservation)
-        .filter(Reservation.reservation_date >= thirty_days_ago)
-        .count()
-    )
+@router.get("/trends/reservations", tags=["admin"])
+def get_reservation_trend(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: str = Query("day", regex="^(day|week|month|year)$"),
+    category: Optional[str] = None,
+    tool_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    """
+    Get reservations and returns per day, week, month or year of a date range.
+
+    The series covers the whole library, or one category or tool when `category` or
+    `tool_id` is given. It is summed from the daily rollups, never from `reservations`.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if category is not None and tool_id is not None:
+        raise HTTPException(status_code=400, detail="Filter by category or by tool, not both")
 
-    # Most active users
-    active_users = (
-        db.query(
-            User.username,
-            func.count(Reservation.id).label('reservation_count')
-        )
-        .join(Reservation)
-        .group_by(User.username)
-        .order_by(func.count(Reservation.id).desc())
-        .limit(5)
-        .all()
-    )
+    dimension, key = ALL, ""
+    if category is not None:
+        dimension, key = CATEGORY, category
+    elif tool_id is not None:
+        dimension, key = TOOL, str(tool_id)
+    start, end = trend_range(start, end)
+    try:
+        series = RollupService.series(db, start, end, bucket, dimension, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Get count of tools in review
-    tools_in_review = db.query(ToolSubmission).filter(
-        ToolSubmission.status == "pending"
-    ).count()
+    return {
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "dimension": dimension,
+        "key": key,
+        "series": series
+    }
+
+@router.get("/trends/reservations/breakdown", tags=["admin"])
+def get_reservation_breakdown(
+    by: str = Query(CATEGORY, regex="^(category|tool)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user)
+):
+    """Get the categories or tools with the most reservations in a date range."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    start, end = trend_range(start, end)
+    if start > end:
+        raise HTTPException(status_code=400, detail="The start of the range must not be after its end")
+
+    return {
+        "start": start,
+        "end": end,
+        "by": by,
+        "items": RollupService.breakdown(db, start, end, by, limit)
+    }
+
+@router.get("/metrics", tags=["admin"])
+def get_runtime_metrics(current_user: UserSnapshot = Depends(get_current_user)):
+    """Get runtime metrics such as database connection pool usage and SQLite settings."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
 
     return {
-        "total_tools": total_tools,
-        "active_reservations": active_reservations,
-        "total_users": total_users,
-        "tool_stats": {
-            "available": available_tools,
-            "checked_out": checked_out_tools,
-            "in_review": tools_in_review
-        },
-        "monthly_reservations": monthly_reservations,
-        "active_users": [
-            {"username": username, "reservations": count}
-            for username, count in active_users
-        ]
-    }
\ No newline at end of file
+        "db_pool": get_pool_status(),
+        "sqlite_pragmas": read_sqlite_pragmas(),
+        "auth_cache": auth_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "admin_stats_cache": stats_cache.stats(),
+        "image_pipeline": image_pipeline.stats(),
+        "response_cache": response_cache.stats(),
+        "compression": compressor.stats()
+    }
@@ -17,7 +17,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.user_service import UserService
-from app.core.security import verify_password
+from app.core.security import verify_and_update_password
 from app.core.auth import create_access_token
 from app.config import settings
 from pydantic import BaseModel
@@ -93,14 +93,20 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
     """
     db_user = UserService.get_user_by_username(db, user.username)
     
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    verified, new_hash = (
+        verify_and_update_password(user.password, db_user.hashed_password) if db_user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Upgrade a hash created with another bcrypt cost
+    if new_hash:
+        UserService.update_password_hash(db, db_user, new_hash)
     
-    access_token = create_access_token(data={"sub": db_user.username}, role=db_user.role)
+    access_token = create_access_token(data={"sub": db_user.username}, role=db_user.role, user_id=db_user.id)
     
     return {
         "access_token": access_token,
@@ -110,7 +116,7 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Authenticate a user using form data and return a JWT token.
 
@@ -123,18 +129,26 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     
     Returns:
     - A dictionary with the JWT access token and token type.
+
+    Like `/login`, this is a sync handler: FastAPI runs it on its threadpool, so the user
+    lookup, the wait for the bcrypt pool and the commit of an upgraded hash never block
+    the event loop.
     """
     # Get user by username from the database
     user = UserService.get_user_by_username(db, form_data.username)
     
-    # Verify the user's password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (
+        verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        UserService.update_password_hash(db, user, new_hash)
     
     # Generate and return JWT access token
-    access_token = create_access_token(data={"sub": user.username}, role=user.role)
+    access_token = create_access_token(data={"sub": user.username}, role=user.role, user_id=user.id)
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.tool_service import ToolService
 from app.services.reservation_service import ReservationService
 from app.schemas.reservation import Reservation, ReservationCreate
-from app.core.deps import get_current_user
-from app.models.user import User
-from typing import List
+from app.core.deps import UserSnapshot, get_current_user
+from app.utils.serializers import FastJSONResponse, parse_fields, reservation_serializer
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -14,22 +14,22 @@ router = APIRouter()
 def reserve_tool(
     reservation: ReservationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    tool = ToolService.get_one_tool(db, reservation.tool_id)
-    if not tool or not tool.is_available:
+    # Claim the tool and create the reservation in a single transaction
+    new_reservation = ReservationService.reserve_tool(db, reservation, current_user.id)
+    if new_reservation is None:
+        # Only the failure path pays for telling a missing tool from a taken one
+        if ToolService.get_one_tool(db, reservation.tool_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tool not found")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail="Tool not available for reservation"
         )
-
-    # Create a reservation and update tool availability
-    new_reservation = ReservationService.create_reservation(db, reservation, current_user.id)
-    ToolService.update_tool_availability(db, reservation.tool_id, False)
     return new_reservation
 
 @router.post("/checkout/{tool_id}", status_code=status.HTTP_200_OK)
-def check_out_tool(tool_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def check_out_tool(tool_id: int, db: Session = Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
     reservation = ReservationService.checkout_tool(db, tool_id, current_user.id)
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No active reservation found")
@@ -38,7 +38,7 @@ def check_out_tool(tool_id: int, db: Session = Depends(get_db), current_user: Us
     return {"msg": f"Tool '{tool_id}' checked out successfully"}
 
 @router.post("/return/{tool_id}", status_code=status.HTTP_200_OK)
-def return_tool(tool_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def return_tool(tool_id: int, db: Session = Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
     reservation = ReservationService.return_tool(db, tool_id, current_user.id)
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No active reservation found")
@@ -48,7 +48,13 @@ def return_tool(tool_id: int, db: Session = Depends(get_db), current_user: User
 
 @router.get("/", response_model=List[Reservation])
 def get_user_reservations(
+    fields: Optional[str] = Query(None, description="Comma-separated reservation fields to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return ReservationService.get_user_reservations(db, current_user.id)
\ No newline at end of file
+    try:
+        serializer = reservation_serializer.only(parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    rows = ReservationService.get_user_reservations(db, current_user.id, columns=serializer.columns)
+    return FastJSONResponse(serializer.many(rows))
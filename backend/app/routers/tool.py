@@ -1,37 +1,188 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Callable, Iterable, List, Optional
+from app.config import settings
 from app.database import get_db
 from app.services.tool_service import ToolService
-from app.schemas.tool import Tool, ToolCreate, ToolUpdate
-from app.core.deps import get_current_user
-from app.models.user import User
+from app.schemas.tool import Tool, ToolBatch, ToolCreate, ToolUpdate
+from app.core.deps import UserSnapshot, get_current_user
 from app.schemas.reservation import Reservation, ReservationCreate
+from app.services.counter_service import CATALOG_VERSION, TOOL_VERSION, CounterService
 from app.services.reservation_service import ReservationService
+from app.utils.pagination import NEXT_CURSOR_HEADER, Page, parse_ids
+from app.utils.response_cache import CATALOG_TAG, CachedResponse, cache_key, category_tag, response_cache, tool_tag
+from app.utils.serializers import FastJSONResponse, RowSerializer, parse_fields, render_json, tool_serializer
+from app.utils.static_files import etag_matches
 
 router = APIRouter()
 
-def get_current_user_id(current_user: User = Depends(get_current_user)) -> int:
+# Largest page a list endpoint returns in one response
+MAX_PAGE_SIZE = 1000
+
+# Clients may keep catalog responses but must revalidate them, which costs a 304
+CATALOG_CACHE_CONTROL = "no-cache"
+
+def get_current_user_id(current_user: UserSnapshot = Depends(get_current_user)) -> int:
     return current_user.id
 
+def invalid_cursor(error: ValueError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+def not_modified(request: Request, response: Response, tag: str) -> Optional[Response]:
+    """
+    Return a 304 response when the client's copy carries the ETag `tag`, otherwise set the
+    ETag on `response` and return None.
+
+    The version a tag is built from must be read before the tools, so that a write landing
+    in between makes the tag older than the data rather than newer.
+    """
+    etag = f'W/"{tag}"'
+    headers = {"etag": etag, "cache-control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match", ""), f'"{tag}"'):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def catalog_not_modified(request: Request, response: Response, db: Session) -> Optional[Response]:
+    """`not_modified` for responses listing tools, tagged with the catalog version."""
+    return not_modified(request, response, f"catalog-{CounterService.get_value(db, CATALOG_VERSION)}")
+
+def tool_fields(fields: Optional[str]) -> RowSerializer:
+    """The serializer of the tool fields named by a `fields` parameter, or a 400 naming the unknown ones."""
+    try:
+        return tool_serializer.only(parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def cached_response(request: Request, response: Response, tags: Iterable[str], params: dict,
+                    load: Callable[[], Any], serializer: RowSerializer = tool_serializer) -> Response:
+    """
+    Send a catalog read from the response cache, rendering and storing it on a miss.
+
+    `load` returns the tool, or the `Page` of rows of `serializer.columns`, to send. The entry is keyed by the route,
+    `params`, the validated parameters the response depends on, and the serializer's fields, and stored with the
+    headers already set on `response`, so a hit sends the ETag of the data it was rendered from.
+    """
+    if serializer is not tool_serializer:
+        params = {**params, "fields": ",".join(serializer.fields)}
+    key = cache_key(request.scope["route"].path, params)
+    entry = response_cache.get(key)
+    if entry is None:
+        snapshot = response_cache.snapshot(tags)
+        try:
+            result = load()
+        except ValueError as e:
+            raise invalid_cursor(e)
+        headers = dict(response.headers)
+        if isinstance(result, Page):
+            if result.next_cursor:
+                headers[NEXT_CURSOR_HEADER] = result.next_cursor
+            content = serializer.many(result.items)
+        else:
+            content = serializer.from_objects([result])[0]
+        entry = CachedResponse(render_json(content), headers)
+        response_cache.set(key, entry, tags, snapshot)
+    return Response(entry.body, headers=entry.headers, media_type="application/json")
+
+def get_tool_or_404(db: Session, tool_id: int):
+    tool = ToolService.get_one_tool(db, tool_id)
+    if tool is None:
+        raise HTTPException(status_code=404, detail="Tool not found")
+    return tool
+
 @router.get("/", response_model=List[Tool])
-def read_tools(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tools = ToolService.get_tools(db, skip=skip, limit=limit)
-    print("Tools with images:", [(t.id, t.image_url) for t in tools])  # Debug log
-    return tools
+def read_tools(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated tool fields to return"),
+    db: Session = Depends(get_db)
+):
+    serializer = tool_fields(fields)
+    unchanged = catalog_not_modified(request, response, db)
+    if unchanged:
+        return unchanged
+    return cached_response(
+        request, response, [CATALOG_TAG], {"skip": skip, "limit": limit, "cursor": cursor},
+        lambda: ToolService.get_tools(db, skip=skip, limit=limit, cursor=cursor, columns=serializer.columns),
+        serializer
+    )
 
 @router.get("/search/", response_model=List[Tool])
-def search_tools(search_term: str, db: Session = Depends(get_db)):
-    tools = ToolService.search_tools(db, search_term)
-    return tools
+def search_tools(
+    search_term: str,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated tool fields to return"),
+    db: Session = Depends(get_db)
+):
+    serializer = tool_fields(fields)
+    unchanged = catalog_not_modified(request, response, db)
+    if unchanged:
+        return unchanged
+    return cached_response(
+        request, response, [CATALOG_TAG],
+        {"search_term": search_term, "skip": skip, "limit": limit, "cursor": cursor},
+        lambda: ToolService.search_tools(
+            db, search_term, skip=skip, limit=limit, cursor=cursor, columns=serializer.columns
+        ),
+        serializer
+    )
 
 @router.get("/category/{category}", response_model=List[Tool])
-def get_tools_by_category(category: str, db: Session = Depends(get_db)):
-    tools = ToolService.get_tools_by_category(db, category)
-    return tools
+def get_tools_by_category(
+    category: str,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated tool fields to return"),
+    db: Session = Depends(get_db)
+):
+    serializer = tool_fields(fields)
+    unchanged = catalog_not_modified(request, response, db)
+    if unchanged:
+        return unchanged
+    return cached_response(
+        request, response, [category_tag(category)],
+        {"category": category, "skip": skip, "limit": limit, "cursor": cursor},
+        lambda: ToolService.get_tools_by_category(
+            db, category, skip=skip, limit=limit, cursor=cursor, columns=serializer.columns
+        ),
+        serializer
+    )
+
+@router.get("/batch", response_model=ToolBatch)
+def read_tools_batch(
+    ids: str = Query(..., description="Comma-separated tool IDs"),
+    fields: Optional[str] = Query(None, description="Comma-separated tool fields to return"),
+    db: Session = Depends(get_db)
+):
+    """Get several tools with one query, in the order of `ids`, and the IDs with no tool."""
+    serializer = tool_fields(fields)
+    try:
+        tool_ids = parse_ids(ids, settings.BATCH_MAX_IDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    batch = ToolService.get_many(db, tool_ids, columns=serializer.columns)
+    return FastJSONResponse({"items": serializer.many(batch.items), "missing": batch.missing})
+
+@router.get("/{tool_id}", response_model=Tool)
+def read_tool(tool_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    unchanged = not_modified(request, response, f"tool-{tool_id}-{CounterService.get_value(db, TOOL_VERSION, tool_id)}")
+    if unchanged:
+        return unchanged
+    return cached_response(request, response, [tool_tag(tool_id)], {"tool_id": tool_id},
+                           lambda: get_tool_or_404(db, tool_id))
 
 @router.post("/sample", status_code=status.HTTP_201_CREATED)
-def create_sample_tools(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_sample_tools(db: Session = Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to create sample tools")
     created_tools = ToolService.create_sample_tools(db)
@@ -41,7 +192,7 @@ def create_sample_tools(db: Session = Depends(get_db), current_user: User = Depe
 def create_tool(
     tool: ToolCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to create tools")
@@ -52,7 +203,7 @@ def update_tool(
     tool_id: int,
     tool: ToolUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to update tools")
@@ -65,7 +216,7 @@ def update_tool(
 def delete_tool(
     tool_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to delete tools")
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.services.tool_submission_service import ToolSubmissionService
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.services.tool_submission_service import ToolSubmissionService, AsyncToolSubmissionService
 from app.schemas.tool_submission import ToolSubmission, ToolSubmissionCreate
-from app.core.deps import get_current_user
-from app.models.user import User
-from app.services.file_service import FileService
+from app.core.deps import UserSnapshot, get_current_user
+from app.services.file_service import FileService, UploadTooLarge
 
 router = APIRouter()
 
@@ -17,7 +18,7 @@ async def create_tool_submission(
     category: str = Form(...),
     condition: str = Form(...),
     image: Optional[UploadFile] = File(None),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
@@ -25,7 +26,9 @@ async def create_tool_submission(
         image_url = None
         if image:
             try:
-                image_url = await FileService.save_upload(image, "tool-images")
+                image_url = await FileService.save_upload(image)
+            except UploadTooLarge as e:
+                raise HTTPException(status_code=413, detail=str(e))
             except Exception as e:
                 raise HTTPException(
                     status_code=400,
@@ -39,14 +42,27 @@ async def create_tool_submission(
             condition=condition
         )
         
-        submission = ToolSubmissionService.create_submission(
-            db=db,
-            submission=submission_data,
-            user_id=current_user.id,
-            image_url=image_url
-        )
+        # Keep blocking database calls off the event loop
+        if settings.USE_ASYNC_DB:
+            async with AsyncSessionLocal() as async_db:
+                submission = await AsyncToolSubmissionService.create_submission(
+                    db=async_db,
+                    submission=submission_data,
+                    user_id=current_user.id,
+                    image_url=image_url
+                )
+        else:
+            submission = await run_in_threadpool(
+                ToolSubmissionService.create_submission,
+                db=db,
+                submission=submission_data,
+                user_id=current_user.id,
+                image_url=image_url
+            )
         
         return submission
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -56,7 +72,7 @@ async def create_tool_submission(
 @router.get("/pending", response_model=List[ToolSubmission])
 def get_pending_submissions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -66,7 +82,7 @@ def get_pending_submissions(
 def approve_submission(
     submission_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -81,7 +97,7 @@ def approve_submission(
 def reject_submission(
     submission_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.user_service import UserService
-from app.schemas.user import UserCreate, User, UserProfileUpdate
-from app.core.auth import get_current_user_role, get_current_user
-from app.services.file_service import FileService
+from typing import Optional
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.services.user_service import UserService, AsyncUserService
+from app.schemas.user import UserBatch, UserCreate, User, UserProfileUpdate
+from app.core.auth import UserSnapshot, get_current_user_role, get_current_user
+from app.services.file_service import FileService, UploadTooLarge
+from app.utils.pagination import parse_ids
+from app.utils.serializers import FastJSONResponse, parse_fields, user_serializer
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
@@ -52,12 +57,17 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     return db_user
 
 @router.get("/admin/users", response_model=list[User])
-async def list_all_users(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def list_all_users(
+    fields: Optional[str] = Query(None, description="Comma-separated user fields to return"),
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
     """
     Retrieve a list of all users in the system.
     This is an admin-only endpoint that requires authentication with an admin role.
 
     Args:
+    - fields (Optional[str]): Comma-separated user fields to return; every field when omitted.
     - db (Session): The database session, automatically provided by FastAPI's dependency injection.
     - token (str): The JWT token for authentication, automatically extracted from the request headers.
 
@@ -65,6 +75,7 @@ async def list_all_users(db: Session = Depends(get_db), token: str = Depends(oau
     - list[User]: A list of all user objects in the system.
 
     Raises:
+    - HTTPException (status_code=400): If `fields` names something that is not a user field.
     - HTTPException (status_code=403): If the authenticated user is not an admin.
     - HTTPException (status_code=401): If the token is invalid or missing (raised by get_current_user_role).
 
@@ -76,17 +87,56 @@ async def list_all_users(db: Session = Depends(get_db), token: str = Depends(oau
     current_user_role = get_current_user_role(token)
     if current_user_role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
-    return UserService.get_all_users(db)
+    try:
+        serializer = user_serializer.only(parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if settings.USE_ASYNC_DB:
+        async with AsyncSessionLocal() as async_db:
+            rows = await AsyncUserService.get_all_users(async_db, columns=serializer.columns)
+    else:
+        rows = await run_in_threadpool(UserService.get_all_users, db, serializer.columns)
+    return FastJSONResponse(serializer.many(rows))
+
+@router.get("/admin/users/batch", response_model=UserBatch)
+async def read_users_batch(
+    ids: str = Query(..., description="Comma-separated user IDs"),
+    fields: Optional[str] = Query(None, description="Comma-separated user fields to return"),
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Retrieve several users with one query, in the order of `ids`, and the IDs with no user.
+    This is an admin-only endpoint, like `list_all_users`.
+
+    Raises:
+    - HTTPException (status_code=400): If `ids` is not a list of at most `BATCH_MAX_IDS` integers,
+      or `fields` names something that is not a user field.
+    - HTTPException (status_code=403): If the authenticated user is not an admin.
+    """
+    if get_current_user_role(token) != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    try:
+        serializer = user_serializer.only(parse_fields(fields))
+        user_ids = parse_ids(ids, settings.BATCH_MAX_IDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if settings.USE_ASYNC_DB:
+        async with AsyncSessionLocal() as async_db:
+            batch = await AsyncUserService.get_many(async_db, user_ids, columns=serializer.columns)
+    else:
+        batch = await run_in_threadpool(UserService.get_many, db, user_ids, serializer.columns)
+    return FastJSONResponse({"items": serializer.many(batch.items), "missing": batch.missing})
 
 @router.get("/profile/{user_id}", response_model=User)
-def get_user_profile(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_user_profile(user_id: int, db: Session = Depends(get_db), current_user: UserSnapshot = Depends(get_current_user)):
     """
     Retrieve a user's profile.
     
     Args:
         user_id (int): The ID of the user whose profile is being requested.
         db (Session): The database session.
-        current_user (User): The currently authenticated user.
+        current_user (UserSnapshot): The currently authenticated user.
 
     Returns:
         User: The requested user's profile.
@@ -106,7 +156,7 @@ def update_user_profile(
     user_id: int,
     profile_data: UserProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """
     Update a user's profile.
@@ -115,7 +165,7 @@ def update_user_profile(
         user_id (int): The ID of the user whose profile is being updated.
         profile_data (UserProfileUpdate): The new profile data.
         db (Session): The database session.
-        current_user (User): The currently authenticated user.
+        current_user (UserSnapshot): The currently authenticated user.
 
     Returns:
         User: The updated user profile.
@@ -135,15 +185,21 @@ def update_user_profile(
 async def update_profile_image(
     image: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     try:
         # Save the uploaded image
-        image_url = await FileService.save_upload(image, "profile-images")
+        image_url = await FileService.save_upload(image)
         
-        # Update user's profile image
-        updated_user = UserService.update_profile_image(db, current_user.id, image_url)
+        # Update user's profile image without blocking the event loop
+        if settings.USE_ASYNC_DB:
+            async with AsyncSessionLocal() as async_db:
+                updated_user = await AsyncUserService.update_profile_image(async_db, current_user.id, image_url)
+        else:
+            updated_user = await run_in_threadpool(UserService.update_profile_image, db, current_user.id, image_url)
         
         return {"message": "Profile image updated successfully", "image_url": image_url}
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ToolBase(BaseModel):
@@ -36,6 +36,8 @@ class Tool(ToolBase):
     - `owner_id` (int): The ID of the user who owns the tool.
     - `is_available` (bool): Indicates if the tool is available for use.
     - `created_at` (datetime): The date and time when the tool was created.
+    - `image_variants` (Optional[dict]): URLs of the resized WebP and JPEG variants of the image.
+    - `thumbnail_url` (Optional[str]): The small image for listings, the original when there are no variants.
     
     Configuration:
     - `orm_mode` (bool): Allows the model to be used with SQLAlchemy ORM objects.
@@ -44,10 +46,23 @@ class Tool(ToolBase):
     owner_id: int
     is_available: bool
     created_at: datetime
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    thumbnail_url: Optional[str] = None
 
     class Config:
         orm_mode = True  # Enables SQLAlchemy ORM compatibility
 
+class ToolBatch(BaseModel):
+    """
+    Response model of a multi-get of tools.
+
+    Attributes:
+    - `items` (List[Tool]): The tools found, in the order their IDs were requested.
+    - `missing` (List[int]): The requested IDs with no tool.
+    """
+    items: List[Tool]
+    missing: List[int]
+
 class ToolUpdate(BaseModel):
     """
     Model for updating tool details. All fields are optional to allow for partial updates.
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 class ToolSubmissionBase(BaseModel):
     name: str
@@ -18,6 +18,8 @@ class ToolSubmission(ToolSubmissionBase):
     submitted_at: datetime
     user_name: Optional[str] = None
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    thumbnail_url: Optional[str] = None
 
     class Config:
         orm_mode = True
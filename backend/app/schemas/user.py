@@ -6,6 +6,7 @@ Schemas:
 - `UserCreate`: Extends `UserBase`, used for creating a new user, includes password and optional username and role.
 - `UserInDB`: Schema for the user as stored in the database, includes hashed password and user status.
 - `User`: Response model for returning user information, excluding sensitive data like password.
+- `UserBatch`: Response model of a multi-get of users, with the requested IDs that were not found.
 """
 
 from pydantic import BaseModel, EmailStr
@@ -54,6 +55,14 @@ class User(UserBase):
     class Config:
         orm_mode = True  # Allows ORM objects to be returned as response models
 
+class UserBatch(BaseModel):
+    """
+    Response schema of a multi-get of users: the users found, in the order their IDs were
+    requested, and the requested IDs with no user.
+    """
+    items: list[User]
+    missing: list[int]
+
 class UserProfileUpdate(BaseModel):
     full_name: str | None = None
     bio: str | None = None
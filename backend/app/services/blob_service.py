@@ -0,0 +1,272 @@
+"""
+Service layer for the reference counts of the content-addressed image store.
+
+`FileService` stores every distinct uploaded image once. Services that point a tool, tool
+submission or user profile at an image, or stop doing so, call `add_references` before
+committing, so the `image_blobs` count of a blob moves in the same transaction as the
+rows referencing it. Approving a submission therefore shares its blob with the new tool
+instead of copying the file.
+
+Garbage collection treats the image URL columns as the source of truth: it recounts the
+references, repairs drifted counts and removes the blobs nothing references. Blobs
+written less than `BLOB_GC_GRACE` seconds ago are kept, as the row that will reference a
+fresh upload may not be committed yet.
+
+Functions:
+- `add_references`: Adds deltas to the reference counts of blobs inside the caller's transaction.
+- `count_references`: Counts the rows referencing each blob from the image URL columns.
+- `collect_garbage`: Repairs the reference counts and deletes unreferenced blobs.
+- `record_variants`: Stores the variant URLs of tools and submissions whose image has none.
+- `record_variants_of`: Records the variants of one image on rows committed without them.
+
+The variants of a new upload are recorded by `record_variants` once `image_pipeline` has
+written them, on the rows that were saved while the job ran; services call
+`record_variants_of` after committing a row that got none, in case the job finished
+just before the commit.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import Text, cast, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.image_blob import ImageBlob
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.services.counter_service import CounterService, catalog_changes
+from app.services.file_service import BLOB_NAME, FileService
+from app.services.image_pipeline import image_pipeline
+from app.utils.response_cache import catalog_tags, response_cache
+from app.utils.upsert import add_to_row, async_add_to_row
+
+# Columns holding image URLs that may reference blobs
+IMAGE_URL_COLUMNS = (Tool.image_url, ToolSubmission.image_url, User.profile_image_url)
+
+# Models recording the resized variants of their image
+VARIANT_MODELS = (Tool, ToolSubmission)
+
+
+class GarbageReport(NamedTuple):
+    """Outcome of a garbage collection run."""
+    removed: int
+    freed_bytes: int
+    repaired: int
+    kept: int
+
+
+def _by_blob(changes: Dict[Optional[str], int]) -> Dict[str, int]:
+    deltas = {}
+    for url, delta in changes.items():
+        name = FileService.blob_name(url)
+        if name:
+            deltas[name] = deltas.get(name, 0) + delta
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+class BlobService:
+
+    @staticmethod
+    def add_references(db: Session, changes: Dict[Optional[str], int]) -> None:
+        """
+        Add deltas to the reference counts of blobs without committing.
+
+        Parameters:
+        - `db` (Session): The session whose transaction the changes join.
+        - `changes` (dict): Delta per image URL, e.g. `{old_url: -1, new_url: 1}`; None and
+          URLs outside the blob store are ignored.
+        """
+        for name, delta in _by_blob(changes).items():
+            add_to_row(db, ImageBlob, {"name": name}, {"ref_count": delta})
+
+    @staticmethod
+    def count_references(db: Session) -> Dict[str, int]:
+        """
+        Count the rows referencing each blob.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+
+        Returns:
+        - dict: Number of referencing rows per blob name, for referenced blobs only.
+        """
+        counts: Dict[str, int] = {}
+        for column in IMAGE_URL_COLUMNS:
+            rows = db.query(column, func.count()).filter(
+                column.like(f"%/{FileService.BLOB_FOLDER}/%")
+            ).group_by(column)
+            for url, count in rows:
+                name = FileService.blob_name(url)
+                if name:
+                    counts[name] = counts.get(name, 0) + count
+        return counts
+
+    @staticmethod
+    def collect_garbage(db: Session, dry_run: bool = False, grace: Optional[float] = None) -> GarbageReport:
+        """
+        Recount the blob references and delete the blobs nothing references.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `dry_run` (bool): Whether to only report what would be repaired and removed.
+        - `grace` (Optional[float]): Seconds since their last upload during which unreferenced
+          blobs are kept; `BLOB_GC_GRACE` by default.
+
+        Returns:
+        - GarbageReport: Files removed (blobs and abandoned partial uploads), bytes freed
+          (including the variants of removed blobs), reference counts repaired and files kept.
+        """
+        grace = settings.BLOB_GC_GRACE if grace is None else grace
+        cutoff = time.time() - grace
+        referenced = BlobService.count_references(db)
+        stored = dict(db.query(ImageBlob.name, ImageBlob.ref_count))
+
+        files = {path.name: path for path in FileService.iter_blob_files()}
+        garbage = {
+            name: path for name, path in files.items()
+            if name not in referenced and path.stat().st_mtime < cutoff
+        }
+        drifted = {
+            name: referenced.get(name, 0)
+            for name in set(stored) | set(referenced)
+            if stored.get(name) != referenced.get(name, 0)
+        }
+        # Rows of blobs that are gone, or about to be, and have no references
+        dropped = [
+            name for name in stored
+            if name not in referenced and (name in garbage or name not in files)
+        ]
+
+        freed = 0
+        removed = 0
+        if not dry_run:
+            for name, ref_count in drifted.items():
+                if name not in dropped:
+                    db.merge(ImageBlob(name=name, ref_count=ref_count))
+            if dropped:
+                db.query(ImageBlob).filter(ImageBlob.name.in_(dropped)).delete(synchronize_session=False)
+            db.commit()
+
+        for name, path in garbage.items():
+            try:
+                stat = path.stat()
+                # Uploaded again since the scan; the new upload's row may not be committed yet
+                if stat.st_mtime >= cutoff:
+                    continue
+                if not dry_run:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += stat.st_size
+            # The resized variants and compressed copies go with their original
+            derived = FileService.variant_paths(name) + FileService.precompressed_paths(name)
+            for variant in derived if BLOB_NAME.match(name) else []:
+                try:
+                    freed += variant.stat().st_size
+                    if not dry_run:
+                        variant.unlink()
+                except FileNotFoundError:
+                    pass
+
+        return GarbageReport(
+            removed=removed, freed_bytes=freed, repaired=len(drifted), kept=len(files) - len(garbage)
+        )
+
+    @staticmethod
+    def record_variants(db: Session, names: Optional[Iterable[str]] = None) -> int:
+        """
+        Store the variant URLs of tools and submissions whose stored image has none yet.
+
+        Only variants whose files exist are recorded.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `names` (Optional[Iterable[str]]): Blob names to limit the update to; all blobs by default.
+
+        Returns:
+        - int: Number of rows updated.
+        """
+        updated = 0
+        tool_ids = []
+        tags = set()
+        for model in VARIANT_MODELS:
+            if names is None:
+                image_filter = model.image_url.like(f"%/{FileService.BLOB_FOLDER}/%")
+            else:
+                image_filter = or_(*(model.image_url.like(f"%/{FileService.BLOB_FOLDER}/%/{name}") for name in names))
+            # Rows saved before `none_as_null` hold a JSON null
+            missing = or_(model.image_variants.is_(None), cast(model.image_variants, Text) == "null")
+            rows = db.query(model).filter(image_filter, missing)
+            for row in rows:
+                row.image_variants = FileService.variant_urls(row.image_url)
+                updated += row.image_variants is not None
+                if model is Tool and row.image_variants is not None:
+                    tool_ids.append(row.id)
+                    tags.update(catalog_tags(row.id, row.category))
+        if tool_ids:
+            # The tools' responses now list the variants
+            CounterService.apply(db, catalog_changes(*tool_ids))
+            response_cache.invalidate_after_commit(db, tags)
+        db.commit()
+        return updated
+
+    @staticmethod
+    def record_variants_of(db: Session, image_url: Optional[str]) -> int:
+        """
+        Record the variants of an image on the rows saved without them, after their commit.
+
+        The variants of an upload may be written while a row referencing it is being saved,
+        after `FileService.variant_urls` found none and before the commit made the row
+        visible to the pipeline's listener. Services call this once the row is committed.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `image_url` (Optional[str]): The URL of the image.
+
+        Returns:
+        - int: Number of rows updated.
+        """
+        name = FileService.blob_name(image_url)
+        if name is None or not image_pipeline.enabled:
+            return 0
+        return BlobService.record_variants(db, [name])
+
+
+@image_pipeline.on_generated
+def _record_generated_variants(source: Path) -> None:
+    db = SessionLocal()
+    try:
+        BlobService.record_variants(db, [source.name])
+    finally:
+        db.close()
+
+
+class AsyncBlobService:
+
+    @staticmethod
+    async def add_references(db: AsyncSession, changes: Dict[Optional[str], int]) -> None:
+        """
+        Async counterpart of `BlobService.add_references`.
+        """
+        for name, delta in _by_blob(changes).items():
+            await async_add_to_row(db, ImageBlob, {"name": name}, {"ref_count": delta})
+
+    @staticmethod
+    async def record_variants(db: AsyncSession, names: Optional[Iterable[str]] = None) -> int:
+        """
+        Async counterpart of `BlobService.record_variants`.
+        """
+        return await db.run_sync(BlobService.record_variants, names)
+
+    @staticmethod
+    async def record_variants_of(db: AsyncSession, image_url: Optional[str]) -> int:
+        """
+        Async counterpart of `BlobService.record_variants_of`.
+        """
+        return await db.run_sync(BlobService.record_variants_of, image_url)
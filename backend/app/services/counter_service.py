@@ -0,0 +1,199 @@
+"""
+Service layer for the running totals in the `library_counters` table.
+
+Services that add, remove or change counted rows call `CounterService.apply` with the
+changes before committing, so a counter moves in the same transaction as the rows it
+counts. Each change adds a delta to the stored value (see `app.utils.upsert`), so
+concurrent writers never overwrite each other's counts.
+
+Counters:
+- `tools_total`, `tools_available`: Tools in the catalog, and those not reserved or checked out.
+- `reservations_active`: Reservations not yet returned.
+- `submissions_pending`: Tool submissions awaiting review.
+- `users_total`: Registered users.
+- `user_reservations`: Reservations made by each user, keyed by user ID.
+- `catalog_version`, `tool_version`: Bumped by every write changing what the catalog
+  endpoints return, library-wide and per tool ID. They serve as ETags (see
+  `app.routers.tool`) and are never recomputed.
+
+Functions:
+- `apply`: Adds deltas to counters inside the caller's transaction.
+- `catalog_changes`: Returns the changes bumping the catalog versions.
+- `get_values`: Reads library-wide counters.
+- `get_value`: Reads one counter.
+- `recompute`: Counts every counter from the source tables.
+- `reconcile`: Compares stored counters with recomputed ones and repairs the drift.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Union
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.library_counter import LibraryCounter
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.utils.upsert import add_to_row, async_add_to_row
+
+TOOLS_TOTAL = "tools_total"
+TOOLS_AVAILABLE = "tools_available"
+RESERVATIONS_ACTIVE = "reservations_active"
+SUBMISSIONS_PENDING = "submissions_pending"
+USERS_TOTAL = "users_total"
+USER_RESERVATIONS = "user_reservations"
+CATALOG_VERSION = "catalog_version"
+TOOL_VERSION = "tool_version"
+
+# Counters recomputed from the source tables by `recompute` and `reconcile`
+DERIVED_COUNTERS = (
+    TOOLS_TOTAL, TOOLS_AVAILABLE, RESERVATIONS_ACTIVE, SUBMISSIONS_PENDING, USERS_TOTAL, USER_RESERVATIONS
+)
+
+# `subject_id` of library-wide counters
+LIBRARY = 0
+
+# A counter name, or a `(name, subject_id)` pair for per-subject counters
+CounterKey = Union[str, Tuple[str, int]]
+
+
+class Drift(NamedTuple):
+    """A counter whose stored value differs from the recomputed one."""
+    name: str
+    subject_id: int
+    stored: int
+    actual: int
+
+
+def _normalize(changes: Dict[CounterKey, int]) -> Dict[Tuple[str, int], int]:
+    keys = {}
+    for key, delta in changes.items():
+        key = (key, LIBRARY) if isinstance(key, str) else key
+        keys[key] = keys.get(key, 0) + delta
+    return {key: delta for key, delta in keys.items() if delta}
+
+
+def catalog_changes(*tool_ids: int) -> Dict[CounterKey, int]:
+    """Return the changes bumping the catalog version and the versions of the given tools."""
+    changes: Dict[CounterKey, int] = {CATALOG_VERSION: 1}
+    changes.update({(TOOL_VERSION, tool_id): 1 for tool_id in tool_ids})
+    return changes
+
+
+class CounterService:
+
+    @staticmethod
+    def apply(db: Session, changes: Dict[CounterKey, int]) -> None:
+        """
+        Add deltas to counters without committing.
+
+        Parameters:
+        - `db` (Session): The session whose transaction the changes join.
+        - `changes` (dict): Delta per counter, e.g. `{TOOLS_TOTAL: 1, (USER_RESERVATIONS, 7): 1}`.
+        """
+        for (name, subject_id), delta in _normalize(changes).items():
+            add_to_row(db, LibraryCounter, {"name": name, "subject_id": subject_id}, {"value": delta})
+
+    @staticmethod
+    def get_values(db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Read library-wide counters, with 0 for counters never written.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+        - `names` (Iterable[str]): The counters to read.
+
+        Returns:
+        - dict: Value per counter name.
+        """
+        names = list(names)
+        rows = db.query(LibraryCounter.name, LibraryCounter.value).filter(
+            LibraryCounter.name.in_(names), LibraryCounter.subject_id == LIBRARY
+        ).all()
+        values = dict.fromkeys(names, 0)
+        values.update(rows)
+        return values
+
+    @staticmethod
+    def get_value(db: Session, name: str, subject_id: int = LIBRARY) -> int:
+        """
+        Read one counter by its primary key, with 0 when it was never written.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+        - `name` (str): The counter to read.
+        - `subject_id` (int): The entity the counter belongs to; library-wide by default.
+
+        Returns:
+        - int: The counter's value.
+        """
+        value = db.query(LibraryCounter.value).filter(
+            LibraryCounter.name == name, LibraryCounter.subject_id == subject_id
+        ).scalar()
+        return value or 0
+
+    @staticmethod
+    def recompute(db: Session) -> Dict[Tuple[str, int], int]:
+        """
+        Count every derived counter from the source tables.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+
+        Returns:
+        - dict: Value per `(name, subject_id)`.
+        """
+        counts = {
+            (TOOLS_TOTAL, LIBRARY): db.query(func.count(Tool.id)).scalar(),
+            (TOOLS_AVAILABLE, LIBRARY): db.query(func.count(Tool.id)).filter(Tool.is_available == True).scalar(),
+            (RESERVATIONS_ACTIVE, LIBRARY): db.query(func.count(Reservation.id))
+                .filter(Reservation.is_active == True).scalar(),
+            (SUBMISSIONS_PENDING, LIBRARY): db.query(func.count(ToolSubmission.id))
+                .filter(ToolSubmission.status == "pending").scalar(),
+            (USERS_TOTAL, LIBRARY): db.query(func.count(User.id)).scalar(),
+        }
+        per_user = db.query(Reservation.user_id, func.count(Reservation.id)).group_by(Reservation.user_id)
+        for user_id, count in per_user:
+            counts[(USER_RESERVATIONS, user_id)] = count
+        return counts
+
+    @staticmethod
+    def reconcile(db: Session, repair: bool = True) -> List[Drift]:
+        """
+        Compare the stored counters with counts from the source tables.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `repair` (bool): Whether to overwrite drifted counters with the recomputed values.
+
+        Returns:
+        - List[Drift]: The counters that differed, ordered by name and subject.
+        """
+        actual = CounterService.recompute(db)
+        stored = {
+            (row.name, row.subject_id): row.value
+            for row in db.query(LibraryCounter).filter(LibraryCounter.name.in_(DERIVED_COUNTERS))
+        }
+        drift = [
+            Drift(name, subject_id, stored.get((name, subject_id), 0), actual.get((name, subject_id), 0))
+            for name, subject_id in sorted(set(actual) | set(stored))
+            if stored.get((name, subject_id), 0) != actual.get((name, subject_id), 0)
+        ]
+        if repair and drift:
+            for counter in drift:
+                db.merge(LibraryCounter(name=counter.name, subject_id=counter.subject_id, value=counter.actual))
+            db.commit()
+        return drift
+
+
+class AsyncCounterService:
+
+    @staticmethod
+    async def apply(db: AsyncSession, changes: Dict[CounterKey, int]) -> None:
+        """
+        Async counterpart of `CounterService.apply`.
+        """
+        for (name, subject_id), delta in _normalize(changes).items():
+            await async_add_to_row(db, LibraryCounter, {"name": name, "subject_id": subject_id}, {"value": delta})
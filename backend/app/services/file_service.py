@@ -1,43 +1,221 @@
+import hashlib
 import os
+import re
 import uuid
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.services.image_pipeline import VARIANT_FORMATS, VARIANTS, image_pipeline, variant_name
+
+# Leading bytes of each accepted image format, with the extensions it may be uploaded under
+IMAGE_SIGNATURES = {
+    "jpeg": {".jpg", ".jpeg", ".jfif"},
+    "png": {".png"},
+    "gif": {".gif"},
+    "webp": {".webp"},
+    "bmp": {".bmp"},
+}
+
+# Bytes needed to recognise every format in IMAGE_SIGNATURES
+SIGNATURE_LENGTH = 12
+
+# Extension each image format is stored under, whatever it was uploaded as
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "gif": ".gif", "webp": ".webp", "bmp": ".bmp"}
+
+# Names of stored blobs: the SHA-256 hex digest of the content and the format's extension
+BLOB_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z]+$")
+
+# Suffix of uploads still being written
+TEMP_SUFFIX = ".part"
+
+
+def detect_image_format(head: bytes) -> Optional[str]:
+    """Return the image format announced by the first bytes of a file, or None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"BM"):
+        return "bmp"
+    return None
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds `MAX_UPLOAD_SIZE`."""
+
 
 class FileService:
+    """
+    Content-addressed storage of uploaded images.
+
+    Every upload is stored as `blobs/<d[0:2]>/<d[2:4]>/<d><ext>` below `UPLOAD_DIR`, where
+    `d` is the SHA-256 of its bytes, so uploading the same image again reuses the stored
+    file and every row showing that image shares one URL. Which rows reference a blob is
+    tracked by `BlobService`. Resized variants are written next to each blob in the
+    background (see `image_pipeline`).
+    """
     UPLOAD_DIR = Path("uploads")
+    BLOB_FOLDER = "blobs"
+    BASE_URL = "http://localhost:8000/uploads"
     ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".jfif", ".webp", ".bmp"}
+    ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/pjpeg", "image/png", "image/gif", "image/webp", "image/bmp"}
+
+    @classmethod
+    def blob_root(cls) -> Path:
+        return cls.UPLOAD_DIR / cls.BLOB_FOLDER
+
+    @classmethod
+    def blob_path(cls, name: str) -> Path:
+        """Return the path of a blob, sharded by the first two bytes of its digest."""
+        return cls.blob_root() / name[:2] / name[2:4] / name
+
+    @classmethod
+    def blob_url(cls, name: str) -> str:
+        """Return the URL a blob is served under."""
+        return f"{cls.BASE_URL}/{cls.BLOB_FOLDER}/{name[:2]}/{name[2:4]}/{name}"
+
+    @classmethod
+    def blob_name(cls, url: Optional[str]) -> Optional[str]:
+        """Return the name of the blob an image URL points at, or None for other URLs."""
+        if not url or f"/{cls.BLOB_FOLDER}/" not in url:
+            return None
+        name = url.rsplit("/", 1)[-1]
+        return name if BLOB_NAME.match(name) else None
+
+    @classmethod
+    def variant_paths(cls, name: str) -> List[Path]:
+        """Return the paths of every variant of a blob, whether generated or not."""
+        return [
+            cls.blob_path(variant_name(name, variant, encoding))
+            for variant in VARIANTS for encoding in VARIANT_FORMATS
+        ]
 
     @classmethod
-    async def save_upload(cls, file: UploadFile, subfolder: str = "") -> str:
+    def precompressed_paths(cls, name: str) -> List[Path]:
+        """Return the paths of the compressed copies a blob may be served from."""
+        path = cls.blob_path(name)
+        return [path.with_name(f"{name}.gz"), path.with_name(f"{name}.br")]
+
+    @classmethod
+    def variant_urls(cls, url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Return the URLs of the resized variants of a stored image.
+
+        Parameters:
+        - `url` (Optional[str]): The URL of the original image.
+
+        Returns:
+        - Optional[dict]: URL per encoding ("webp", "jpeg") per variant ("thumb", "card",
+          "full"); None for images outside the blob store, when variants are disabled or
+          when they have not been generated (yet).
+        """
+        name = cls.blob_name(url)
+        if name is None or not image_pipeline.enabled:
+            return None
+        if not all(path.exists() for path in cls.variant_paths(name)):
+            return None
+        return {
+            variant: {encoding: cls.blob_url(variant_name(name, variant, encoding)) for encoding in VARIANT_FORMATS}
+            for variant in VARIANTS
+        }
+
+    @classmethod
+    def iter_blob_files(cls) -> Iterator[Path]:
+        """Yield every stored blob and every upload still being written."""
+        root = cls.blob_root()
+        if root.is_dir():
+            for path in root.rglob("*"):
+                if path.is_file() and (BLOB_NAME.match(path.name) or path.name.endswith(TEMP_SUFFIX)):
+                    yield path
+
+    @classmethod
+    async def save_upload(cls, file: UploadFile) -> str:
+        """
+        Stream an uploaded image into the content-addressed store.
+
+        The file is copied in chunks of `UPLOAD_CHUNK_SIZE` bytes into a temporary file,
+        hashing it on the way, with the disk writes run off the event loop. Once complete
+        it is renamed to its content-derived name, or dropped when that blob is already
+        stored. Memory use is one chunk however large the file is, and a partially
+        written or rejected upload is never visible under a blob name. Generating the
+        resized variants is then started without waiting for it.
+
+        Parameters:
+        - `file` (UploadFile): The uploaded file.
+
+        Returns:
+        - str: The URL the blob is served under.
+
+        Raises:
+        - ValueError: If the extension, content type or leading bytes are not those of an
+          allowed image.
+        - UploadTooLarge: If the file is larger than `MAX_UPLOAD_SIZE`.
+        """
+        print(f"Saving file: {file.filename}")
+
+        # Reject wrong file types before anything is written
+        ext = Path(file.filename or "").suffix.lower()
+        if ext not in cls.ALLOWED_EXTENSIONS:
+            raise ValueError(
+                f"Invalid file type: {ext}. Allowed types: {', '.join(sorted(cls.ALLOWED_EXTENSIONS))}"
+            )
+        if file.content_type not in cls.ALLOWED_CONTENT_TYPES:
+            raise ValueError(f"Invalid content type: {file.content_type}")
+
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        image_format = detect_image_format(chunk[:SIGNATURE_LENGTH])
+        if image_format is None or ext not in IMAGE_SIGNATURES[image_format]:
+            raise ValueError(f"File content is not a valid {ext.lstrip('.')} image")
+
+        root = cls.blob_root()
+        await run_in_threadpool(root.mkdir, parents=True, exist_ok=True)
+        temp_path = root / f".{uuid.uuid4()}{TEMP_SUFFIX}"
+
+        digest = hashlib.sha256()
+        buffer = await run_in_threadpool(open, temp_path, "wb")
         try:
-            print(f"Saving file: {file.filename} to {subfolder}")
-            
-            # Create upload directory if it doesn't exist
-            upload_path = cls.UPLOAD_DIR / subfolder
-            upload_path.mkdir(parents=True, exist_ok=True)
-
-            # Generate unique filename
-            ext = Path(file.filename).suffix.lower()
-            if ext not in cls.ALLOWED_EXTENSIONS:
-                raise ValueError(
-                    f"Invalid file type: {ext}. Allowed types: {', '.join(cls.ALLOWED_EXTENSIONS)}"
-                )
-
-            # Convert JFIF to JPG for better compatibility
-            if ext == '.jfif':
-                ext = '.jpg'
-
-            filename = f"{uuid.uuid4()}{ext}"
-            file_path = upload_path / filename
-
-            # Save file
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-
-            print(f"File saved successfully: {file_path}")
-            return f"http://localhost:8000/uploads/{subfolder}/{filename}"
-            
-        except Exception as e:
-            print(f"Error saving file: {str(e)}")
+            size = 0
+            while chunk:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise UploadTooLarge(f"File is larger than the limit of {settings.MAX_UPLOAD_SIZE} bytes")
+                await run_in_threadpool(cls._write_chunk, buffer, digest, chunk)
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            await run_in_threadpool(buffer.close)
+            name = f"{digest.hexdigest()}{FORMAT_EXTENSIONS[image_format]}"
+            await run_in_threadpool(cls._store, temp_path, name)
+        except BaseException:
+            await run_in_threadpool(cls._discard, buffer, temp_path)
             raise
+        image_pipeline.submit(cls.blob_path(name))
+
+        print(f"File saved successfully: {name}")
+        return cls.blob_url(name)
+
+    @staticmethod
+    def _write_chunk(buffer, digest, chunk: bytes) -> None:
+        buffer.write(chunk)
+        digest.update(chunk)
+
+    @classmethod
+    def _store(cls, temp_path: Path, name: str) -> None:
+        path = cls.blob_path(name)
+        if path.exists():
+            # Already stored; refresh it so garbage collection counts its grace period from now
+            os.utime(path)
+            temp_path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, path)
+
+    @staticmethod
+    def _discard(buffer, temp_path: Path) -> None:
+        buffer.close()
+        temp_path.unlink(missing_ok=True)
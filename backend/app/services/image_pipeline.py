@@ -0,0 +1,221 @@
+"""
+Background generation of resized image variants.
+
+Every stored upload is scaled down to a few widths so that listings can show a small image
+instead of the original photo. Each variant is written as WebP and as JPEG next to its
+original, named after it: `<digest>.thumb.webp`, `<digest>.card.jpg` and so on. Variants are
+re-encoded from the decoded pixels after applying the EXIF orientation, so no EXIF data
+(camera, location) survives. Originals in uncompressed formats (BMP) also get a gzip
+sibling, `<name>.gz`, served to clients accepting gzip (see `app.utils.static_files`).
+
+The work runs on a small dedicated thread pool, started by `FileService.save_upload`
+without waiting for it. Variant URLs are only recorded on a tool or submission once the
+files exist: rows saved after the job get them straight away, and listeners registered with
+`on_generated` record them on the rows saved while it ran. Until then, and for good when
+generation fails, listings fall back to the original image.
+
+Pillow is optional: without it, `image_pipeline.enabled` is False, no variants are made or
+recorded, and listings fall back to the original image.
+
+Functions:
+- `variant_name`: Returns the file name of a variant of a stored image.
+- `generate_variants`: Writes the missing variants of an image.
+- `precompress`: Writes the gzip sibling of an uncompressed image.
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow is an optional dependency
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels of each variant; smaller originals are never scaled up
+VARIANTS = {"thumb": 320, "card": 640, "full": 1600}
+
+# Pillow format and file extension of each variant encoding
+VARIANT_FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+
+# Variant shown in listings
+LISTING_VARIANT = "thumb"
+
+# Extensions of stored originals worth serving compressed
+COMPRESSIBLE_SUFFIXES = {".bmp"}
+
+
+def variant_name(name: str, variant: str, encoding: str) -> str:
+    """Return the file name of a variant of the stored image `name`."""
+    digest = name.split(".", 1)[0]
+    return f"{digest}.{variant}{VARIANT_FORMATS[encoding][1]}"
+
+
+def _encode(image, path: Path, pillow_format: str) -> None:
+    temp_path = path.with_name(f".{uuid.uuid4()}.part")
+    try:
+        if pillow_format == "JPEG":
+            image.save(temp_path, pillow_format, quality=settings.IMAGE_VARIANT_QUALITY, optimize=True,
+                       progressive=True)
+        else:
+            image.save(temp_path, pillow_format, quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def generate_variants(source: Path) -> List[Path]:
+    """
+    Write the variants of a stored image that do not exist yet.
+
+    Parameters:
+    - `source` (Path): The stored original.
+
+    Returns:
+    - List[Path]: The variant files written.
+    """
+    targets = {
+        (variant, encoding): source.with_name(variant_name(source.name, variant, encoding))
+        for variant in VARIANTS for encoding in VARIANT_FORMATS
+    }
+    missing = {key: path for key, path in targets.items() if not path.exists()}
+    if not missing:
+        return []
+
+    written = []
+    with Image.open(source) as original:
+        # Bake the EXIF orientation into the pixels, as the metadata is dropped
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            for encoding, (pillow_format, _) in VARIANT_FORMATS.items():
+                path = missing.get((variant, encoding))
+                if path is None:
+                    continue
+                encoded = resized
+                if pillow_format == "JPEG" and resized.mode == "RGBA":
+                    # JPEG has no alpha channel; flatten onto white
+                    encoded = Image.new("RGB", resized.size, (255, 255, 255))
+                    encoded.paste(resized, mask=resized.getchannel("A"))
+                _encode(encoded, path, pillow_format)
+                written.append(path)
+    return written
+
+
+def precompress(source: Path) -> Optional[Path]:
+    """
+    Write the gzip sibling of an image stored in an uncompressed format.
+
+    Parameters:
+    - `source` (Path): The stored original.
+
+    Returns:
+    - Optional[Path]: The file written, or None for compressed formats and existing siblings.
+    """
+    target = source.with_name(f"{source.name}.gz")
+    if source.suffix not in COMPRESSIBLE_SUFFIXES or target.exists():
+        return None
+    temp_path = source.with_name(f".{uuid.uuid4()}.part")
+    try:
+        with open(source, "rb") as original, gzip.open(temp_path, "wb", compresslevel=9) as compressed:
+            shutil.copyfileobj(original, compressed)
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return target
+
+
+class ImagePipeline:
+    """
+    Generates image variants on a dedicated thread pool.
+
+    `submit` returns immediately; failures are logged and counted, never raised to the
+    uploader, as the original image stays usable. Listeners registered with `on_generated`
+    run on the pipeline's thread once the variants of an image are written.
+    """
+
+    def __init__(self, workers: int, enabled: bool = True):
+        self.workers = workers
+        self._enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-variants")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._listeners = []
+
+    def on_generated(self, listener):
+        """
+        Register `listener(source)` to run after the variants of the image at `source` are written.
+
+        Listener errors are logged and do not count as failed jobs. Usable as a decorator.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    @property
+    def enabled(self) -> bool:
+        """Whether variants are generated, which needs Pillow."""
+        return self._enabled and Image is not None
+
+    def submit(self, source: Path) -> Optional[Future]:
+        """Start generating the variants of `source`, or return None when disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._run, source)
+
+    def _run(self, source: Path) -> List[Path]:
+        try:
+            written = generate_variants(source)
+            compressed = precompress(source)
+            if compressed:
+                written.append(compressed)
+        except Exception:
+            logger.exception("Generating the variants of %s failed", source.name)
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+            return []
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        for listener in self._listeners:
+            try:
+                listener(source)
+            except Exception:
+                logger.exception("Recording the variants of %s failed", source.name)
+        return written
+
+    def stats(self) -> dict:
+        """
+        Return the pipeline's load.
+
+        Returns:
+            dict: `enabled`, `workers`, `pending`, `completed` and `failed`.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "workers": self.workers,
+                "pending": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+
+image_pipeline = ImagePipeline(workers=settings.IMAGE_PIPELINE_WORKERS, enabled=settings.IMAGE_VARIANTS_ENABLED)
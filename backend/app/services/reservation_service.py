@@ -1,6 +1,16 @@
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional, Sequence
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from app.models.reservation import Reservation
+from app.models.tool import Tool
 from app.schemas.reservation import ReservationCreate
+from app.services.counter_service import (
+    RESERVATIONS_ACTIVE, TOOLS_AVAILABLE, USER_RESERVATIONS, AsyncCounterService, CounterService, catalog_changes
+)
+from app.services.rollup_service import AsyncRollupService, RollupService
+from app.utils.response_cache import catalog_tags, response_cache
 
 class ReservationService:
 
@@ -13,10 +23,66 @@ class ReservationService:
             is_checked_out=False
         )
         db.add(db_reservation)
+        CounterService.apply(db, {RESERVATIONS_ACTIVE: 1, (USER_RESERVATIONS, user_id): 1})
+        RollupService.record(db, reservation_data.tool_id, reservation_data.reservation_date, reservations=1)
         db.commit()
         db.refresh(db_reservation)
         return db_reservation
 
+    @staticmethod
+    def reserve_tool(db: Session, reservation_data: ReservationCreate, user_id: int):
+        """
+        Atomically claims an available tool and records the reservation in one transaction.
+
+        The availability check and flip is a single conditional UPDATE, so when several
+        users reserve the same tool concurrently exactly one of them changes a row.
+
+        Returns:
+        - The new reservation, or None if the tool does not exist or is already reserved.
+        """
+        claimed = db.query(Tool).filter(
+            Tool.id == reservation_data.tool_id,
+            Tool.is_available == True
+        ).update({Tool.is_available: False}, synchronize_session=False)
+        if not claimed:
+            db.rollback()
+            return None
+
+        db_reservation = Reservation(
+            tool_id=reservation_data.tool_id,
+            user_id=user_id,
+            reservation_date=reservation_data.reservation_date,
+            is_checked_out=False
+        )
+        db.add(db_reservation)
+        CounterService.apply(db, {
+            **catalog_changes(reservation_data.tool_id),
+            TOOLS_AVAILABLE: -1, RESERVATIONS_ACTIVE: 1, (USER_RESERVATIONS, user_id): 1
+        })
+        category = db.query(Tool.category).filter(Tool.id == reservation_data.tool_id).scalar()
+        RollupService.record(
+            db, reservation_data.tool_id, reservation_data.reservation_date, reservations=1, category=category
+        )
+        response_cache.invalidate_after_commit(db, catalog_tags(reservation_data.tool_id, category))
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        # Reload with the reserved tool, which the response nests
+        return ReservationService.get_reservation_with_tool(db, db_reservation.id)
+
+    @staticmethod
+    def get_reservation_with_tool(db: Session, reservation_id: int):
+        """
+        Load a reservation and its tool in one joined query.
+        """
+        return db.query(Reservation)\
+            .join(Reservation.tool)\
+            .options(contains_eager(Reservation.tool))\
+            .filter(Reservation.id == reservation_id)\
+            .first()
+
     @staticmethod
     def cancel_reservation(db: Session, reservation_id: int, user_id: int):
         reservation = db.query(Reservation).filter(
@@ -24,6 +90,12 @@ class ReservationService:
             Reservation.user_id == user_id
         ).first()
         if reservation:
+            CounterService.apply(db, {
+                RESERVATIONS_ACTIVE: -1 if reservation.is_active else 0, (USER_RESERVATIONS, user_id): -1
+            })
+            RollupService.record(db, reservation.tool_id, reservation.reservation_date, reservations=-1)
+            if reservation.return_date:
+                RollupService.record(db, reservation.tool_id, reservation.return_date, returns=-1)
             db.delete(reservation)
             db.commit()
             return True
@@ -38,10 +110,17 @@ class ReservationService:
         ).first()
 
     @staticmethod
-    def get_user_reservations(db: Session, user_id: int):
+    def get_user_reservations(db: Session, user_id: int, columns: Optional[Sequence] = None):
+        # Given `columns`, return rows of just those columns, which may include the tool's
+        if columns is not None:
+            return db.query(*columns).select_from(Reservation).join(Reservation.tool).filter(
+                Reservation.user_id == user_id
+            ).all()
+        # The joined tool columns populate `Reservation.tool`, so serializing the
+        # nested tool does not lazy-load it once per reservation
         return db.query(Reservation).filter(
             Reservation.user_id == user_id
-        ).join(Reservation.tool).all()
+        ).join(Reservation.tool).options(contains_eager(Reservation.tool)).all()
 
     @staticmethod
     def checkout_tool(db: Session, tool_id: int, user_id: int):
@@ -66,6 +145,94 @@ class ReservationService:
         if reservation:
             reservation.is_active = False
             reservation.is_checked_out = False
+            reservation.return_date = date.today()
+            CounterService.apply(db, {RESERVATIONS_ACTIVE: -1})
+            RollupService.record(db, tool_id, reservation.return_date, returns=1)
             db.commit()
             db.refresh(reservation)
-        return reservation
\ No newline at end of file
+        return reservation
+
+
+class AsyncReservationService:
+
+    @staticmethod
+    async def create_reservation(db: AsyncSession, reservation_data: ReservationCreate, user_id: int):
+        db_reservation = Reservation(
+            tool_id=reservation_data.tool_id,
+            user_id=user_id,
+            reservation_date=reservation_data.reservation_date,
+            is_checked_out=False
+        )
+        db.add(db_reservation)
+        await AsyncCounterService.apply(db, {RESERVATIONS_ACTIVE: 1, (USER_RESERVATIONS, user_id): 1})
+        await AsyncRollupService.record(
+            db, reservation_data.tool_id, reservation_data.reservation_date, reservations=1
+        )
+        await db.commit()
+        await db.refresh(db_reservation)
+        return db_reservation
+
+    @staticmethod
+    async def reserve_tool(db: AsyncSession, reservation_data: ReservationCreate, user_id: int):
+        """
+        Async counterpart of `ReservationService.reserve_tool`.
+        """
+        result = await db.execute(
+            update(Tool)
+            .where(Tool.id == reservation_data.tool_id, Tool.is_available == True)
+            .values(is_available=False)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            await db.rollback()
+            return None
+
+        db_reservation = Reservation(
+            tool_id=reservation_data.tool_id,
+            user_id=user_id,
+            reservation_date=reservation_data.reservation_date,
+            is_checked_out=False
+        )
+        db.add(db_reservation)
+        await AsyncCounterService.apply(
+            db, {
+                **catalog_changes(reservation_data.tool_id),
+                TOOLS_AVAILABLE: -1, RESERVATIONS_ACTIVE: 1, (USER_RESERVATIONS, user_id): 1
+            }
+        )
+        category = (await db.execute(select(Tool.category).where(Tool.id == reservation_data.tool_id))).scalar()
+        await AsyncRollupService.record(
+            db, reservation_data.tool_id, reservation_data.reservation_date, reservations=1, category=category
+        )
+        response_cache.invalidate_after_commit(db, catalog_tags(reservation_data.tool_id, category))
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        result = await db.execute(
+            select(Reservation)
+            .join(Reservation.tool)
+            .options(contains_eager(Reservation.tool))
+            .filter(Reservation.id == db_reservation.id)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_active_reservation(db: AsyncSession, tool_id: int, user_id: int):
+        result = await db.execute(select(Reservation).filter(
+            Reservation.tool_id == tool_id,
+            Reservation.user_id == user_id,
+            Reservation.is_active == True
+        ))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_user_reservations(db: AsyncSession, user_id: int):
+        # Relationships cannot be lazy-loaded on an AsyncSession, so load the tools up front
+        result = await db.execute(
+            select(Reservation)
+            .filter(Reservation.user_id == user_id)
+            .options(selectinload(Reservation.tool))
+        )
+        return result.scalars().all()
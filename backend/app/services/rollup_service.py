@@ -0,0 +1,250 @@
+"""
+Service layer for the daily reservation rollups behind the trend statistics.
+
+Every reservation adds one to the rollups of its reservation date, and every return one to
+the rollups of its return date, in the same transaction as the reservation change. Each
+change is recorded three times: for the whole library, for the tool's category and for
+the tool (see `ReservationRollup`). Trend series of any range and granularity are then
+summed from at most one row per day, without reading `reservations`.
+
+Rollups mirror the reservations that exist: cancelling a reservation or deleting a tool
+with its reservations subtracts them again, and moving a tool to another category moves
+its counts along, so `backfill` rebuilds the same values from the `reservations` table.
+
+Functions:
+- `record`: Adds reservations and returns of one tool and day inside the caller's transaction.
+- `move_category`: Moves a tool's counts to its new category inside the caller's transaction.
+- `backfill`: Rebuilds the rollups of a date range from the `reservations` table.
+- `series`: Returns reservation and return counts per day, week, month or year of a range.
+- `breakdown`: Returns the categories or tools with the most reservations in a range.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.reservation import Reservation
+from app.models.reservation_rollup import ReservationRollup
+from app.models.tool import Tool
+from app.utils.upsert import add_to_row, async_add_to_row
+
+# Dimensions of the rollups
+ALL = "all"
+CATEGORY = "category"
+TOOL = "tool"
+
+BUCKETS = ("day", "week", "month", "year")
+
+# Largest number of periods a series may have, e.g. ten years of days
+MAX_SERIES_POINTS = 3660
+
+# Marks a category that still has to be looked up
+_LOOKUP = object()
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """Return the first day of the period containing `day`; weeks start on Monday."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start: date, bucket: str) -> date:
+    """Return the first day of the period following the one starting on `start`."""
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if bucket == "year":
+        return date(start.year + 1, 1, 1)
+    return start + timedelta(days=1)
+
+
+def rollup_keys(category: Optional[str], tool_id: int) -> List[Tuple[str, str]]:
+    """The `(dimension, key)` pairs a reservation of a tool is counted under."""
+    return [(ALL, ""), (CATEGORY, category or ""), (TOOL, str(tool_id))]
+
+
+class RollupService:
+
+    @staticmethod
+    def record(db: Session, tool_id: int, day: date, reservations: int = 0, returns: int = 0,
+               category=_LOOKUP) -> None:
+        """
+        Add reservations and returns of a tool on a day to the rollups, without committing.
+
+        Parameters:
+        - `db` (Session): The session whose transaction the change joins.
+        - `tool_id` (int): The reserved or returned tool.
+        - `day` (date): Reservation date of the reservations, return date of the returns.
+        - `reservations`, `returns` (int): Amounts to add; negative to subtract.
+        - `category` (Optional[str]): The tool's category, looked up when not given.
+        """
+        if category is _LOOKUP:
+            category = db.query(Tool.category).filter(Tool.id == tool_id).scalar()
+        for dimension, key in rollup_keys(category, tool_id):
+            add_to_row(
+                db, ReservationRollup, {"dimension": dimension, "key": key, "day": day},
+                {"reservations": reservations, "returns": returns}
+            )
+
+    @staticmethod
+    def move_category(db: Session, tool_id: int, old_category: Optional[str], new_category: Optional[str]) -> None:
+        """
+        Move the counts of a tool from its old category's rollups to the new one's, without committing.
+
+        The tool's own rollups hold exactly its share of each day, so they are subtracted
+        from the old category and added to the new one.
+
+        Parameters:
+        - `db` (Session): The session whose transaction the change joins.
+        - `tool_id` (int): The tool changing category.
+        - `old_category`, `new_category` (Optional[str]): The categories before and after the change.
+        """
+        old_key, new_key = old_category or "", new_category or ""
+        if old_key == new_key:
+            return
+        days = db.query(ReservationRollup.day, ReservationRollup.reservations, ReservationRollup.returns).filter(
+            ReservationRollup.dimension == TOOL, ReservationRollup.key == str(tool_id)
+        ).all()
+        for day, reservations, returns in days:
+            if not (reservations or returns):
+                continue
+            for key, sign in ((old_key, -1), (new_key, 1)):
+                add_to_row(
+                    db, ReservationRollup, {"dimension": CATEGORY, "key": key, "day": day},
+                    {"reservations": sign * reservations, "returns": sign * returns}
+                )
+
+    @staticmethod
+    def backfill(db: Session, since: Optional[date] = None, until: Optional[date] = None) -> int:
+        """
+        Rebuild the rollups of a date range from the `reservations` table.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `since`, `until` (Optional[date]): First and last day to rebuild; unbounded when None.
+
+        Returns:
+        - int: Number of rollup rows written.
+        """
+        def in_range(column):
+            conditions = [column.isnot(None)]
+            if since:
+                conditions.append(column >= since)
+            if until:
+                conditions.append(column <= until)
+            return and_(*conditions)
+
+        totals: Dict[Tuple[str, str, date], List[int]] = {}
+        for column, index in ((Reservation.reservation_date, 0), (Reservation.return_date, 1)):
+            rows = db.query(column, Tool.category, Reservation.tool_id, func.count(Reservation.id))\
+                .join(Tool, Tool.id == Reservation.tool_id)\
+                .filter(in_range(column))\
+                .group_by(column, Tool.category, Reservation.tool_id)
+            for day, category, tool_id, count in rows:
+                for dimension, key in rollup_keys(category, tool_id):
+                    totals.setdefault((dimension, key, day), [0, 0])[index] += count
+
+        db.query(ReservationRollup).filter(in_range(ReservationRollup.day)).delete(synchronize_session=False)
+        if totals:
+            db.execute(insert(ReservationRollup), [
+                {"dimension": dimension, "key": key, "day": day, "reservations": counts[0], "returns": counts[1]}
+                for (dimension, key, day), counts in totals.items()
+            ])
+        db.commit()
+        return len(totals)
+
+    @staticmethod
+    def series(db: Session, start: date, end: date, bucket: str = "day",
+               dimension: str = ALL, key: str = "") -> List[dict]:
+        """
+        Return the reservations and returns of each period of a date range.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+        - `start`, `end` (date): First and last day of the range.
+        - `bucket` (str): Period length: "day", "week", "month" or "year".
+        - `dimension`, `key`: The series, e.g. `(CATEGORY, "Power Tools")`; the whole library by default.
+
+        Returns:
+        - List[dict]: `period` (first day of the period), `reservations` and `returns` for every
+          period overlapping the range, including empty ones.
+
+        Raises:
+        - ValueError: If the range is reversed, the bucket unknown or the series too long.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Invalid bucket, expected one of: {', '.join(BUCKETS)}")
+        if start > end:
+            raise ValueError("The start of the range must not be after its end")
+
+        periods = {}
+        period = bucket_start(start, bucket)
+        while period <= end:
+            if len(periods) == MAX_SERIES_POINTS:
+                raise ValueError(f"The range spans more than {MAX_SERIES_POINTS} periods, use a larger bucket")
+            periods[period] = {"period": period.isoformat(), "reservations": 0, "returns": 0}
+            period = next_bucket(period, bucket)
+
+        rows = db.query(ReservationRollup.day, ReservationRollup.reservations, ReservationRollup.returns)\
+            .filter(
+                ReservationRollup.dimension == dimension,
+                ReservationRollup.key == key,
+                ReservationRollup.day.between(start, end)
+            )
+        for day, reservations, returns in rows:
+            point = periods[bucket_start(day, bucket)]
+            point["reservations"] += reservations
+            point["returns"] += returns
+        return list(periods.values())
+
+    @staticmethod
+    def breakdown(db: Session, start: date, end: date, dimension: str = CATEGORY, limit: int = 10) -> List[dict]:
+        """
+        Return the categories or tools with the most reservations in a date range.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+        - `start`, `end` (date): First and last day of the range.
+        - `dimension` (str): `CATEGORY` or `TOOL`.
+        - `limit` (int): Maximum number of entries.
+
+        Returns:
+        - List[dict]: `key`, `reservations` and `returns`, most reserved first.
+        """
+        reservations = func.sum(ReservationRollup.reservations)
+        rows = db.query(ReservationRollup.key, reservations, func.sum(ReservationRollup.returns))\
+            .filter(ReservationRollup.dimension == dimension, ReservationRollup.day.between(start, end))\
+            .group_by(ReservationRollup.key)\
+            .having(reservations > 0)\
+            .order_by(reservations.desc(), ReservationRollup.key)\
+            .limit(limit)
+        return [
+            {"key": key, "reservations": reservation_count, "returns": return_count}
+            for key, reservation_count, return_count in rows
+        ]
+
+
+class AsyncRollupService:
+
+    @staticmethod
+    async def record(db: AsyncSession, tool_id: int, day: date, reservations: int = 0, returns: int = 0,
+                     category=_LOOKUP) -> None:
+        """
+        Async counterpart of `RollupService.record`.
+        """
+        if category is _LOOKUP:
+            category = (await db.execute(select(Tool.category).where(Tool.id == tool_id))).scalar()
+        for dimension, key in rollup_keys(category, tool_id):
+            await async_add_to_row(
+                db, ReservationRollup, {"dimension": dimension, "key": key, "day": day},
+                {"reservations": reservations, "returns": returns}
+            )
@@ -0,0 +1,207 @@
+"""
+Full-text search index for the tool catalog.
+
+On SQLite builds with FTS5, tool names and descriptions are indexed in the `tools_fts`
+virtual table. It is an external-content table: it stores only the index and reads the
+text from `tools`, and triggers on `tools` keep it in sync on every insert, update and
+delete. On other databases, or SQLite builds without FTS5, `ToolService.search_tools`
+falls back to `ILIKE` matching.
+
+`ToolSearchIndex` methods:
+- `ensure`: Creates the index and its triggers if missing and fills it from `tools`.
+- `rebuild`: Recomputes the whole index from the `tools` table.
+- `is_available`: Tells whether a database has a usable index.
+- `build_match_query`: Turns a user search term into an FTS5 prefix query.
+- `search`: Returns a page of the tools matching an FTS5 query, best matches first.
+"""
+
+import re
+from typing import Optional, Sequence
+from sqlalchemy import Float, column, event, text
+from sqlalchemy.orm import Session
+from app.models.tool import Tool
+
+FTS_TABLE = "tools_fts"
+
+# Matches on the name weigh ten times more than matches on the description
+RANK_EXPRESSION = f"bm25({FTS_TABLE}, 10.0, 1.0)"
+
+CREATE_STATEMENTS = [
+    # The prefix indexes make 2 and 3 character prefix queries index lookups
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='tools', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS tools_fts_ai AFTER INSERT ON tools BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tools_fts_ad AFTER DELETE ON tools BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tools_fts_au AFTER UPDATE OF name, description ON tools BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS tools_fts_ai",
+    "DROP TRIGGER IF EXISTS tools_fts_ad",
+    "DROP TRIGGER IF EXISTS tools_fts_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+REBUILD_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+# Whether each database (by URL) has the index, so searches skip the catalog lookup
+_availability = {}
+
+
+def _supports_fts5(connection) -> bool:
+    """Check whether the SQLite library behind a connection was compiled with FTS5."""
+    if connection.dialect.name != "sqlite":
+        return False
+    options = connection.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+class ToolSearchIndex:
+    """
+    Maintains and queries the FTS5 index of tool names and descriptions.
+    """
+
+    @staticmethod
+    def ensure(connection) -> bool:
+        """
+        Create the search index and its triggers if they are missing.
+
+        A newly created index is filled from the existing `tools` rows, so this also
+        upgrades databases created before the index existed.
+
+        Args:
+            connection: A SQLAlchemy connection inside a transaction.
+
+        Returns:
+            bool: True if the database has the index, False if it cannot have one.
+        """
+        if not _supports_fts5(connection):
+            _availability[str(connection.engine.url)] = False
+            return False
+
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+        for statement in CREATE_STATEMENTS:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            connection.exec_driver_sql(REBUILD_STATEMENT)
+        _availability[str(connection.engine.url)] = True
+        return True
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute the search index from the `tools` table.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            int: Number of indexed tools.
+
+        Raises:
+            RuntimeError: If the database does not support the search index.
+        """
+        if not ToolSearchIndex.ensure(db.connection()):
+            raise RuntimeError("The database does not support FTS5 full-text search")
+        db.execute(text(REBUILD_STATEMENT))
+        db.commit()
+        return db.query(Tool).count()
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """
+        Tell whether the session's database has a usable search index.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            bool: True if searches can use the index.
+        """
+        bind = db.get_bind()
+        key = str(bind.url)
+        if key not in _availability:
+            if bind.dialect.name != "sqlite":
+                _availability[key] = False
+            else:
+                _availability[key] = db.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": FTS_TABLE}
+                ).first() is not None
+        return _availability[key]
+
+    @staticmethod
+    def build_match_query(search_term: str) -> Optional[str]:
+        """
+        Turn a user search term into an FTS5 query matching every word as a prefix.
+
+        Each word is quoted, so FTS5 operators typed by users are treated as text.
+
+        Args:
+            search_term (str): The raw search string, e.g. "cordless dri".
+
+        Returns:
+            Optional[str]: The query, e.g. '"cordless"* "dri"*', or None if it has no words.
+        """
+        words = re.findall(r"\w+", search_term)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def search(db: Session, match_query: str, limit: int = 100, skip: int = 0, after: Optional[tuple] = None,
+               columns: Optional[Sequence] = None):
+        """
+        Return the tools matching an FTS5 query, best matches first.
+
+        Results are ordered by `(score, id)`, where a lower score is a better match, so a
+        page can continue after the last row of the previous one.
+
+        Args:
+            db (Session): The database session.
+            match_query (str): Query built by `build_match_query`.
+            limit (int): Maximum number of tools to return.
+            skip (int): Number of matches to skip, ignored when `after` is given.
+            after (Optional[tuple]): `(score, id)` of the last tool of the previous page.
+            columns (Optional[Sequence]): `Tool` columns to select instead of whole tools.
+
+        Returns:
+            List of `(tool, score)` tuples, or rows of `columns` followed by the score.
+        """
+        keyset = ""
+        params = {"query": match_query, "limit": limit, "skip": skip}
+        if after is not None:
+            keyset = "WHERE ranked.score > :score OR (ranked.score = :score AND tools.id > :id) "
+            params.update(score=after[0], id=after[1], skip=0)
+        statement = text(
+            f"SELECT tools.*, ranked.score AS score FROM ("
+            f"SELECT rowid AS id, {RANK_EXPRESSION} AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query"
+            f") AS ranked JOIN tools ON tools.id = ranked.id {keyset}"
+            f"ORDER BY ranked.score, tools.id LIMIT :limit OFFSET :skip"
+        )
+        entities = columns or (Tool,)
+        return db.query(*entities, column("score", Float)).from_statement(statement).params(**params).all()
+
+
+@event.listens_for(Tool.__table__, "before_drop")
+def _drop_index(target, connection, **kw):
+    """Drop the index together with the `tools` table so a recreated table starts clean."""
+    if connection.dialect.name == "sqlite":
+        for statement in DROP_STATEMENTS:
+            connection.exec_driver_sql(statement)
+        _availability.pop(str(connection.engine.url), None)
@@ -0,0 +1,150 @@
+"""
+Service layer for the admin dashboard statistics.
+
+The catalog, reservation, submission and user totals come from the `library_counters`
+rows kept up to date by the services, and the five most active users from the
+per-user reservation counters, and the 30-day reservation count is summed from the
+daily `reservation_rollups`, so the cost does not grow with the tables. Everything is
+read by one statement.
+
+The result is cached for `ADMIN_STATS_CACHE_TTL` seconds and dropped as soon as a
+transaction writing to one of the counted tables commits, so polling dashboards cost a
+cache lookup.
+
+Functions:
+- `get_admin_statistics`: Returns the dashboard statistics, from the cache when fresh.
+- `compute_admin_statistics`: Computes the statistics from the database.
+- `invalidate`: Drops the cached statistics.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import case, func, select, true
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import on_committed_writes
+from app.models.library_counter import LibraryCounter
+from app.models.reservation import Reservation
+from app.models.reservation_rollup import ReservationRollup
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.services.counter_service import (
+    LIBRARY, RESERVATIONS_ACTIVE, SUBMISSIONS_PENDING, TOOLS_AVAILABLE, TOOLS_TOTAL, USER_RESERVATIONS, USERS_TOTAL
+)
+from app.services.rollup_service import ALL
+from app.utils.cache import TTLCache
+
+CACHE_KEY = "admin_stats"
+
+# Tables the statistics are computed from; a committed write to any of them drops the cache
+STATS_TABLES = {
+    Tool.__tablename__, Reservation.__tablename__, ToolSubmission.__tablename__, User.__tablename__,
+    LibraryCounter.__tablename__, ReservationRollup.__tablename__
+}
+
+ACTIVE_USERS_LIMIT = 5
+
+stats_cache = TTLCache(maxsize=1, ttl=settings.ADMIN_STATS_CACHE_TTL)
+
+# Bumped by every invalidation, so statistics computed during a write are not cached
+_invalidations = 0
+
+
+def _counter(name: str):
+    """The value of a library-wide counter, pivoted out of the `library_counters` rows."""
+    return func.coalesce(func.max(case((LibraryCounter.name == name, LibraryCounter.value))), 0).label(name)
+
+
+class StatsService:
+
+    @staticmethod
+    def compute_admin_statistics(db: Session) -> dict:
+        """
+        Compute the dashboard statistics in one round trip, mostly from the counters.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+
+        Returns:
+        - dict: Tool, reservation, user and submission counts and the most active users.
+        """
+        since = date.today() - timedelta(days=30)
+
+        counters = select(
+            _counter(TOOLS_TOTAL), _counter(TOOLS_AVAILABLE), _counter(RESERVATIONS_ACTIVE),
+            _counter(SUBMISSIONS_PENDING), _counter(USERS_TOTAL),
+        ).where(LibraryCounter.subject_id == LIBRARY).subquery()
+        monthly = select(
+            func.coalesce(func.sum(ReservationRollup.reservations), 0).label("monthly_reservations")
+        ).where(
+            ReservationRollup.dimension == ALL, ReservationRollup.key == "", ReservationRollup.day >= since
+        ).subquery()
+        active_users = (
+            select(User.username, LibraryCounter.value.label("reservations"))
+            .join(User, User.id == LibraryCounter.subject_id)
+            .where(LibraryCounter.name == USER_RESERVATIONS, LibraryCounter.value > 0)
+            .order_by(LibraryCounter.value.desc(), User.username)
+            .limit(ACTIVE_USERS_LIMIT)
+            .subquery()
+        )
+
+        # One row per active user, or a single row with NULL user columns when there is none
+        statement = select(
+            counters, monthly, active_users.c.username, active_users.c.reservations,
+        ).select_from(
+            counters
+            .join(monthly, true())
+            .outerjoin(active_users, true())
+        ).order_by(active_users.c.reservations.desc(), active_users.c.username)
+        rows = db.execute(statement).all()
+
+        totals = rows[0]
+        return {
+            "total_tools": totals.tools_total,
+            "active_reservations": totals.reservations_active,
+            "total_users": totals.users_total,
+            "tool_stats": {
+                "available": totals.tools_available,
+                "checked_out": totals.tools_total - totals.tools_available,
+                "in_review": totals.submissions_pending
+            },
+            "monthly_reservations": totals.monthly_reservations,
+            "active_users": [
+                {"username": row.username, "reservations": row.reservations}
+                for row in rows if row.username is not None
+            ]
+        }
+
+    @staticmethod
+    def get_admin_statistics(db: Session) -> dict:
+        """
+        Return the dashboard statistics, computing them only when the cache is stale.
+
+        Parameters:
+        - `db` (Session): The database session used on a cache miss.
+
+        Returns:
+        - dict: See `compute_admin_statistics`.
+        """
+        stats = stats_cache.get(CACHE_KEY)
+        if stats is None:
+            invalidations = _invalidations
+            stats = StatsService.compute_admin_statistics(db)
+            if invalidations == _invalidations:
+                stats_cache.set(CACHE_KEY, stats)
+        return stats
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached statistics."""
+        global _invalidations
+        _invalidations += 1
+        stats_cache.clear()
+
+
+@on_committed_writes
+def _invalidate_on_write(tables: set) -> None:
+    if tables & STATS_TABLES:
+        StatsService.invalidate()
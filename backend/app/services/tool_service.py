@@ -4,22 +4,57 @@ Service layer for managing tool-related operations.
 This module provides methods to handle CRUD (Create, Read, Update, Delete) operations for tools. 
 It interacts with the database and applies any custom business rules when managing tools. 
 The service includes functionality for searching tools by name or description and filtering by category.
+Searches use the FTS5 index from `search_index` when the database has one.
+
+List methods return a `Page` whose `next_cursor` continues after the last row. Lists are
+ordered by `(created_at, id)`, ranked searches by `(score, id)`. Read-only callers may pass
+the `columns` they need, e.g. `tool_serializer.columns`, to get plain rows of those values
+instead of `Tool` objects, skipping entity construction and identity-map bookkeeping.
 
 Functions:
-- `get_tools`: Retrieves tools with pagination.
+- `get_tools`: Retrieves a page of available tools, by offset or by cursor.
 - `create_tool`: Adds a new tool to the database.
-- `search_tools`: Searches for tools by name or description.
-- `get_tools_by_category`: Filters tools by category.
+- `search_tools`: Searches for tools by name or description, one page at a time.
+- `get_tools_by_category`: Filters tools by category, one page at a time.
 - `create_sample_tools`: Creates a set of predefined sample tools for testing.
 - `update_tool`: Updates existing tool data.
 - `delete_tool`: Deletes a tool from the database.
+- `get_many`: Retrieves several tools by ID in one query, in the requested order.
+
+Writes that add, remove or flip the availability of tools update the `library_counters`
+running totals in the same transaction (see `counter_service`), and every write bumps the
+catalog version the tool endpoints derive their ETags from, and drops the cached catalog
+responses showing the tool once it commits (see `response_cache`). Deleting a tool
+subtracts its reservations from the rollups (see `rollup_service`). Changes to a tool's
+image move the reference counts of the stored images (see `blob_service`).
+
+`AsyncToolService` provides the read and availability operations on an `AsyncSession`.
 """
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.tool import Tool  # Tool database model
 from app.schemas.tool import ToolCreate, ToolUpdate  # Pydantic models for input validation
 from app.models.reservation import Reservation
-from sqlalchemy import func
+from app.services.blob_service import AsyncBlobService, BlobService
+from app.services.file_service import FileService
+from app.services.counter_service import (
+    RESERVATIONS_ACTIVE, TOOLS_AVAILABLE, TOOLS_TOTAL, USER_RESERVATIONS, AsyncCounterService, CounterService,
+    catalog_changes
+)
+from app.services.rollup_service import RollupService
+from app.services.search_index import ToolSearchIndex
+from app.utils.pagination import Batch, Page, decode_cursor, decode_datetime, encode_cursor, in_requested_order
+from app.utils.response_cache import catalog_tags, response_cache
+from sqlalchemy import and_, func, or_
+from typing import Optional, Sequence
+
+# Cursor kinds for lists ordered by creation time and for ranked search results
+CREATED_CURSOR = "created"
+RANK_CURSOR = "rank"
+
+# Columns a page is keyed by, selected with projected columns so the next cursor can be built
+SORT_COLUMNS = (Tool.created_at, Tool.id)
 
 class ToolService:
     """
@@ -27,19 +62,81 @@ class ToolService:
     """
 
     @staticmethod
-    def get_tools(db: Session, skip: int = 0, limit: int = 100):
+    def projection(columns: Sequence) -> tuple:
+        """Return `columns` followed by the sort key columns missing from them."""
+        return (*columns, *[key for key in SORT_COLUMNS if not any(key is selected for selected in columns)])
+
+    @staticmethod
+    def select(db: Session, columns: Optional[Sequence] = None):
+        """
+        Start a tool query, of whole `Tool` objects or of plain rows of `columns`.
+
+        Parameters:
+        - `db` (Session): The database session for querying.
+        - `columns` (Optional[Sequence]): `Tool` columns to select; the sort key columns are
+          appended when missing, after the requested ones.
+
+        Returns:
+        - Query selecting `Tool` objects, or rows of the columns.
+        """
+        return db.query(Tool) if columns is None else db.query(*ToolService.projection(columns))
+
+    @staticmethod
+    def paginate(query, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        """
+        Applies stable `(created_at, id)` ordering and pagination to a tool query.
+
+        Parameters:
+        - `query`: Query selecting `Tool` objects or rows including `created_at` and `id`.
+        - `skip` (int): Number of records to skip, ignored when a cursor is given.
+        - `limit` (int): Maximum number of records to return.
+        - `cursor` (Optional[str]): Cursor of the previous page, for keyset pagination.
+
+        Returns:
+        - Page of tools with the cursor of the next page.
+
+        Raises:
+        - ValueError: If the cursor is invalid.
+        """
+        query = query.order_by(Tool.created_at, Tool.id)
+        if cursor:
+            created_at, tool_id = decode_cursor(cursor, CREATED_CURSOR, 2)
+            created_at = decode_datetime(created_at)
+            if not isinstance(tool_id, int):
+                raise ValueError("Invalid cursor")
+            query = query.filter(or_(
+                Tool.created_at > created_at,
+                and_(Tool.created_at == created_at, Tool.id > tool_id)
+            ))
+        else:
+            query = query.offset(skip)
+        tools = query.limit(limit).all()
+
+        next_cursor = None
+        if len(tools) == limit:
+            next_cursor = encode_cursor(CREATED_CURSOR, tools[-1].created_at, tools[-1].id)
+        return Page(tools, next_cursor)
+
+    @staticmethod
+    def get_tools(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                  columns: Optional[Sequence] = None) -> Page:
         """
-        Retrieves a list of tools from the database with pagination.
+        Retrieves a page of available tools from the database.
 
         Parameters:
         - `db` (Session): The database session for querying.
-        - `skip` (int): Number of records to skip for pagination.
+        - `skip` (int): Number of records to skip for offset pagination.
         - `limit` (int): Maximum number of records to return.
+        - `cursor` (Optional[str]): Cursor of the previous page; replaces `skip` when given.
+        - `columns` (Optional[Sequence]): Columns to return as plain rows instead of tools.
 
         Returns:
-        - List of tools within the specified range.
+        - Page of tools within the specified range.
+
+        Raises:
+        - ValueError: If the cursor is invalid.
         """
-        return db.query(Tool).filter(Tool.is_available).offset(skip).limit(limit).all()
+        return ToolService.paginate(ToolService.select(db, columns).filter(Tool.is_available), skip, limit, cursor)
 
     @staticmethod
     def create_tool(db: Session, tool: ToolCreate, owner_id: int):
@@ -54,41 +151,84 @@ class ToolService:
         Returns:
         - The newly created tool record.
         """
-        db_tool = Tool(**tool.dict(), owner_id=owner_id)  # Create tool instance
+        db_tool = Tool(**tool.dict(), owner_id=owner_id,
+                       image_variants=FileService.variant_urls(tool.image_url))  # Create tool instance
         db.add(db_tool)
+        CounterService.apply(db, {**catalog_changes(), TOOLS_TOTAL: 1, TOOLS_AVAILABLE: 1})
+        BlobService.add_references(db, {db_tool.image_url: 1})
+        response_cache.invalidate_after_commit(db, catalog_tags(None, db_tool.category))
         db.commit()  # Save to database
         db.refresh(db_tool)  # Refresh with latest data
+        if db_tool.image_variants is None and BlobService.record_variants_of(db, db_tool.image_url):
+            db.refresh(db_tool)
         return db_tool
 
     @staticmethod
-    def search_tools(db: Session, search_term: str):
+    def search_tools(db: Session, search_term: str, skip: int = 0, limit: int = 100,
+                     cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
         """
         Searches for tools by name or description using a search term.
 
+        With the full-text index, every word of the term matches as a prefix and results
+        are ranked by relevance; otherwise the term is matched as a substring.
+
         Parameters:
         - `db` (Session): The database session for querying.
         - `search_term` (str): Search string for matching tools.
+        - `skip` (int): Number of records to skip, ignored when a cursor is given.
+        - `limit` (int): Maximum number of records to return.
+        - `cursor` (Optional[str]): Cursor of the previous page.
+        - `columns` (Optional[Sequence]): Columns to return as plain rows instead of tools.
 
         Returns:
-        - List of tools matching the search term.
+        - Page of tools matching the search term.
+
+        Raises:
+        - ValueError: If the cursor is invalid.
         """
-        return db.query(Tool).filter(
+        match_query = ToolSearchIndex.build_match_query(search_term)
+        if match_query and ToolSearchIndex.is_available(db):
+            after = None
+            if cursor:
+                score, tool_id = decode_cursor(cursor, RANK_CURSOR, 2)
+                if not isinstance(score, (int, float)) or not isinstance(tool_id, int):
+                    raise ValueError("Invalid cursor")
+                after = (score, tool_id)
+            if columns is not None:
+                columns = ToolService.projection(columns)
+            rows = ToolSearchIndex.search(db, match_query, limit=limit, skip=skip, after=after, columns=columns)
+            next_cursor = None
+            if len(rows) == limit:
+                last = rows[-1]
+                next_cursor = encode_cursor(RANK_CURSOR, last.score, last[0].id if columns is None else last.id)
+            return Page([row[0] if columns is None else row[:-1] for row in rows], next_cursor)
+
+        query = ToolService.select(db, columns).filter(
             Tool.name.ilike(f"%{search_term}%") | Tool.description.ilike(f"%{search_term}%")
-        ).all()
+        )
+        return ToolService.paginate(query, skip, limit, cursor)
 
     @staticmethod
-    def get_tools_by_category(db: Session, category: str):
+    def get_tools_by_category(db: Session, category: str, skip: int = 0, limit: int = 100,
+                              cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
         """
         Retrieves tools by a specific category.
 
         Parameters:
         - `db` (Session): The database session for querying.
         - `category` (str): The category to filter tools by.
+        - `skip` (int): Number of records to skip, ignored when a cursor is given.
+        - `limit` (int): Maximum number of records to return.
+        - `cursor` (Optional[str]): Cursor of the previous page.
+        - `columns` (Optional[Sequence]): Columns to return as plain rows instead of tools.
 
         Returns:
-        - List of tools in the specified category.
+        - Page of tools in the specified category.
+
+        Raises:
+        - ValueError: If the cursor is invalid.
         """
-        return db.query(Tool).filter(Tool.category == category).all()
+        return ToolService.paginate(ToolService.select(db, columns).filter(Tool.category == category), skip, limit, cursor)
 
     @staticmethod
     def create_sample_tools(db: Session):
@@ -115,6 +255,10 @@ class ToolService:
             db.add(db_tool)
             created_tools.append(db_tool)
 
+        CounterService.apply(db, {
+            **catalog_changes(), TOOLS_TOTAL: len(created_tools), TOOLS_AVAILABLE: len(created_tools)
+        })
+        response_cache.invalidate_after_commit(db, catalog_tags(None, *(tool.category for tool in created_tools)))
         db.commit()  # Save all sample tools to the database
         for tool in created_tools:
             db.refresh(tool)  # Refresh tool instances
@@ -136,10 +280,21 @@ class ToolService:
         db_tool = db.query(Tool).filter(Tool.id == tool_id).first()
         if db_tool is None:
             return None  # Tool not found
-        for key, value in tool_update.dict(exclude_unset=True).items():
+        changes = tool_update.dict(exclude_unset=True)
+        response_cache.invalidate_after_commit(db, catalog_tags(tool_id, db_tool.category, changes.get("category")))
+        if "image_url" in changes and changes["image_url"] != db_tool.image_url:
+            BlobService.add_references(db, {db_tool.image_url: -1, changes["image_url"]: 1})
+            changes["image_variants"] = FileService.variant_urls(changes["image_url"])
+        if "category" in changes:
+            RollupService.move_category(db, tool_id, db_tool.category, changes["category"])
+        for key, value in changes.items():
             setattr(db_tool, key, value)  # Update only provided fields
+        CounterService.apply(db, catalog_changes(tool_id))
         db.commit()  # Save changes
         db.refresh(db_tool)  # Refresh updated tool
+        if "image_variants" in changes and db_tool.image_variants is None \
+                and BlobService.record_variants_of(db, db_tool.image_url):
+            db.refresh(db_tool)
         return db_tool
 
     @staticmethod
@@ -155,15 +310,31 @@ class ToolService:
         - True if the tool was deleted, otherwise False.
         """
         try:
-            # First, delete associated reservations
-            db.query(Reservation).filter(Reservation.tool_id == tool_id).delete()
-            
-            # Then delete the tool
             db_tool = db.query(Tool).filter(Tool.id == tool_id).first()
             if db_tool is None:
                 return False  # Tool not found
+
+            # First, delete associated reservations, uncounting them
+            changes = {**catalog_changes(tool_id), TOOLS_TOTAL: -1, TOOLS_AVAILABLE: -1 if db_tool.is_available else 0}
+            rollups = {}
+            reservations = db.query(
+                Reservation.user_id, Reservation.is_active, Reservation.reservation_date, Reservation.return_date
+            ).filter(Reservation.tool_id == tool_id).all()
+            for user_id, is_active, reservation_date, return_date in reservations:
+                changes[(USER_RESERVATIONS, user_id)] = changes.get((USER_RESERVATIONS, user_id), 0) - 1
+                changes[RESERVATIONS_ACTIVE] = changes.get(RESERVATIONS_ACTIVE, 0) - (1 if is_active else 0)
+                rollups.setdefault(reservation_date, [0, 0])[0] -= 1
+                if return_date:
+                    rollups.setdefault(return_date, [0, 0])[1] -= 1
+            db.query(Reservation).filter(Reservation.tool_id == tool_id).delete()
+            for day, (reservation_delta, return_delta) in rollups.items():
+                RollupService.record(db, tool_id, day, reservation_delta, return_delta, category=db_tool.category)
             
+            # Then delete the tool
             db.delete(db_tool)  # Delete tool
+            CounterService.apply(db, changes)
+            BlobService.add_references(db, {db_tool.image_url: -1})
+            response_cache.invalidate_after_commit(db, catalog_tags(tool_id, db_tool.category))
             db.commit()  # Commit transaction
             return True
             
@@ -182,6 +353,8 @@ class ToolService:
             return None  # Tool not available or not found
 
         db_tool.is_available = False
+        CounterService.apply(db, {**catalog_changes(tool_id), TOOLS_AVAILABLE: -1})
+        response_cache.invalidate_after_commit(db, catalog_tags(tool_id, db_tool.category))
         db.commit()
         db.refresh(db_tool)
         return db_tool
@@ -196,6 +369,8 @@ class ToolService:
             return None  # Tool not checked out or not found
 
         db_tool.is_available = True
+        CounterService.apply(db, {**catalog_changes(tool_id), TOOLS_AVAILABLE: 1})
+        response_cache.invalidate_after_commit(db, catalog_tags(tool_id, db_tool.category))
         db.commit()
         db.refresh(db_tool)
         return db_tool
@@ -204,6 +379,9 @@ class ToolService:
     def update_tool_availability(db: Session, tool_id: int, is_available: bool):
         tool = db.query(Tool).filter(Tool.id == tool_id).first()
         if tool:
+            if tool.is_available != is_available:
+                CounterService.apply(db, {**catalog_changes(tool_id), TOOLS_AVAILABLE: 1 if is_available else -1})
+                response_cache.invalidate_after_commit(db, catalog_tags(tool_id, tool.category))
             tool.is_available = is_available
             db.commit()
             db.refresh(tool)
@@ -222,5 +400,102 @@ class ToolService:
         - Tool: The tool object if found, otherwise None.
         """
         return db.query(Tool).filter(Tool.id == tool_id).first()
-    
-    
\ No newline at end of file
+
+    @staticmethod
+    def get_many(db: Session, tool_ids: Sequence[int], columns: Optional[Sequence] = None) -> Batch:
+        """
+        Retrieves several tools by their IDs with a single `IN` query.
+
+        Parameters:
+        - `db` (Session): The database session.
+        - `tool_ids` (Sequence[int]): The IDs to look up; repeated IDs are looked up once.
+        - `columns` (Optional[Sequence]): `Tool` columns to select instead of whole tools, as for
+          the list methods; the sort key columns are appended when missing.
+
+        Returns:
+        - Batch of the tools (or rows) found, in the order their IDs were requested, and the
+          requested IDs with no tool.
+        """
+        ids = list(dict.fromkeys(tool_ids))
+        if not ids:
+            return Batch([], [])
+        query = ToolService.select(db, columns).filter(Tool.id.in_(ids))
+        if columns is None:
+            found = {tool.id: tool for tool in query}
+        else:
+            position = next(i for i, column in enumerate(ToolService.projection(columns)) if column is Tool.id)
+            found = {row[position]: row for row in query}
+        return in_requested_order(found, ids)
+
+
+class AsyncToolService:
+    """
+    Async counterparts of the `ToolService` operations used by async handlers.
+
+    The list and search methods run the `ToolService` queries on the session's sync view, so
+    they return the same pages, FTS5 ranking and `(created_at, id)` cursors.
+    """
+
+    @staticmethod
+    async def get_tools(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                        columns: Optional[Sequence] = None) -> Page:
+        """
+        Retrieves a page of available tools, see `ToolService.get_tools`.
+        """
+        return await db.run_sync(ToolService.get_tools, skip, limit, cursor, columns)
+
+    @staticmethod
+    async def get_one_tool(db: AsyncSession, tool_id: int):
+        """
+        Retrieves a single tool by its ID, or None if it does not exist.
+        """
+        return await db.get(Tool, tool_id)
+
+    @staticmethod
+    async def search_tools(db: AsyncSession, search_term: str, skip: int = 0, limit: int = 100,
+                           cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+        """
+        Searches for tools by name or description, see `ToolService.search_tools`.
+        """
+        return await db.run_sync(ToolService.search_tools, search_term, skip, limit, cursor, columns)
+
+    @staticmethod
+    async def get_tools_by_category(db: AsyncSession, category: str, skip: int = 0, limit: int = 100,
+                                    cursor: Optional[str] = None, columns: Optional[Sequence] = None) -> Page:
+        """
+        Retrieves tools by a specific category, see `ToolService.get_tools_by_category`.
+        """
+        return await db.run_sync(ToolService.get_tools_by_category, category, skip, limit, cursor, columns)
+
+    @staticmethod
+    async def create_tool(db: AsyncSession, tool: ToolCreate, owner_id: int):
+        """
+        Creates and saves a new tool in the database.
+        """
+        db_tool = Tool(**tool.dict(), owner_id=owner_id, image_variants=FileService.variant_urls(tool.image_url))
+        db.add(db_tool)
+        await AsyncCounterService.apply(db, {**catalog_changes(), TOOLS_TOTAL: 1, TOOLS_AVAILABLE: 1})
+        await AsyncBlobService.add_references(db, {db_tool.image_url: 1})
+        response_cache.invalidate_after_commit(db, catalog_tags(None, db_tool.category))
+        await db.commit()
+        await db.refresh(db_tool)
+        if db_tool.image_variants is None and await AsyncBlobService.record_variants_of(db, db_tool.image_url):
+            await db.refresh(db_tool)
+        return db_tool
+
+    @staticmethod
+    async def update_tool_availability(db: AsyncSession, tool_id: int, is_available: bool):
+        """
+        Sets the availability flag of a tool, returning None if it does not exist.
+        """
+        tool = await db.get(Tool, tool_id)
+        if tool:
+            if tool.is_available != is_available:
+                await AsyncCounterService.apply(
+                    db, {**catalog_changes(tool_id), TOOLS_AVAILABLE: 1 if is_available else -1}
+                )
+                response_cache.invalidate_after_commit(db, catalog_tags(tool_id, tool.category))
+            tool.is_available = is_available
+            await db.commit()
+            await db.refresh(tool)
+        return tool
@@ -1,9 +1,17 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
 from app.models.tool_submission import ToolSubmission
 from app.schemas.tool_submission import ToolSubmissionCreate
 from typing import List, Optional
 from app.models.tool import Tool
 from app.models.user import User
+from app.services.blob_service import AsyncBlobService, BlobService
+from app.services.file_service import FileService
+from app.services.counter_service import (
+    SUBMISSIONS_PENDING, TOOLS_AVAILABLE, TOOLS_TOTAL, AsyncCounterService, CounterService, catalog_changes
+)
+from app.utils.response_cache import catalog_tags, response_cache
 
 class ToolSubmissionService:
     @staticmethod
@@ -14,23 +22,30 @@ class ToolSubmissionService:
             category=submission.category,
             condition=submission.condition,
             user_id=user_id,
-            image_url=image_url
+            image_url=image_url,
+            image_variants=FileService.variant_urls(image_url)
         )
         db.add(db_submission)
+        CounterService.apply(db, {SUBMISSIONS_PENDING: 1})
+        BlobService.add_references(db, {image_url: 1})
         db.commit()
         db.refresh(db_submission)
+        if db_submission.image_variants is None and BlobService.record_variants_of(db, image_url):
+            db.refresh(db_submission)
         return db_submission
 
     @staticmethod
     def get_pending_submissions(db: Session) -> List[ToolSubmission]:
-        submissions = db.query(ToolSubmission, User.username)\
-            .join(User, ToolSubmission.user_id == User.id)\
+        # The submitter is loaded by the same query, with only the username column
+        submissions = db.query(ToolSubmission)\
+            .join(ToolSubmission.user)\
+            .options(contains_eager(ToolSubmission.user).load_only(User.username))\
             .filter(ToolSubmission.status == "pending")\
             .all()
         
         # Convert to dictionary and add username
         result = []
-        for submission, username in submissions:
+        for submission in submissions:
             submission_dict = {
                 "id": submission.id,
                 "name": submission.name,
@@ -40,7 +55,10 @@ class ToolSubmissionService:
                 "user_id": submission.user_id,
                 "status": submission.status,
                 "submitted_at": submission.submitted_at,
-                "user_name": username
+                "user_name": submission.user.username,
+                "image_url": submission.image_url,
+                "image_variants": submission.image_variants,
+                "thumbnail_url": submission.thumbnail_url
             }
             result.append(submission_dict)
         
@@ -57,10 +75,19 @@ class ToolSubmissionService:
                 condition=submission.condition,
                 owner_id=submission.user_id,
                 is_available=True,
-                image_url=submission.image_url
+                image_url=submission.image_url,
+                # Variants generated since the submission was saved are recorded on the tool
+                image_variants=submission.image_variants or FileService.variant_urls(submission.image_url)
             )
             try:
                 db.add(new_tool)
+                CounterService.apply(db, {
+                    **catalog_changes(), TOOLS_TOTAL: 1, TOOLS_AVAILABLE: 1,
+                    SUBMISSIONS_PENDING: -1 if submission.status == "pending" else 0
+                })
+                # The tool shows the submitted image from the same blob
+                BlobService.add_references(db, {new_tool.image_url: 1})
+                response_cache.invalidate_after_commit(db, catalog_tags(None, new_tool.category))
                 submission.status = "approved"
                 db.commit()
                 db.refresh(submission)
@@ -78,7 +105,68 @@ class ToolSubmissionService:
     def reject_submission(db: Session, submission_id: int):
         submission = db.query(ToolSubmission).filter(ToolSubmission.id == submission_id).first()
         if submission:
+            if submission.status == "pending":
+                CounterService.apply(db, {SUBMISSIONS_PENDING: -1})
             submission.status = "rejected"
             db.commit()
             db.refresh(submission)
         return submission
+
+
+class AsyncToolSubmissionService:
+    @staticmethod
+    async def create_submission(db: AsyncSession, submission: ToolSubmissionCreate, user_id: int, image_url: Optional[str] = None):
+        db_submission = ToolSubmission(
+            name=submission.name,
+            description=submission.description,
+            category=submission.category,
+            condition=submission.condition,
+            user_id=user_id,
+            image_url=image_url,
+            image_variants=FileService.variant_urls(image_url)
+        )
+        db.add(db_submission)
+        await AsyncCounterService.apply(db, {SUBMISSIONS_PENDING: 1})
+        await AsyncBlobService.add_references(db, {image_url: 1})
+        await db.commit()
+        await db.refresh(db_submission)
+        if db_submission.image_variants is None and await AsyncBlobService.record_variants_of(db, image_url):
+            await db.refresh(db_submission)
+        return db_submission
+
+    @staticmethod
+    async def get_pending_submissions(db: AsyncSession) -> List[dict]:
+        result = await db.execute(
+            select(ToolSubmission)
+            .join(ToolSubmission.user)
+            .options(contains_eager(ToolSubmission.user).load_only(User.username))
+            .filter(ToolSubmission.status == "pending")
+        )
+        return [
+            {
+                "id": submission.id,
+                "name": submission.name,
+                "description": submission.description,
+                "category": submission.category,
+                "condition": submission.condition,
+                "user_id": submission.user_id,
+                "status": submission.status,
+                "submitted_at": submission.submitted_at,
+                "user_name": submission.user.username,
+                "image_url": submission.image_url,
+                "image_variants": submission.image_variants,
+                "thumbnail_url": submission.thumbnail_url
+            }
+            for submission in result.scalars().all()
+        ]
+
+    @staticmethod
+    async def reject_submission(db: AsyncSession, submission_id: int):
+        submission = await db.get(ToolSubmission, submission_id)
+        if submission:
+            if submission.status == "pending":
+                await AsyncCounterService.apply(db, {SUBMISSIONS_PENDING: -1})
+            submission.status = "rejected"
+            await db.commit()
+            await db.refresh(submission)
+        return submission
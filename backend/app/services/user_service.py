@@ -12,15 +12,30 @@ Functions:
 - `get_user_by_email`: Retrieves a user by their email address.
 - `get_user_by_username`: Retrieves a user by their username.
 - `update_user_role`: Updates the role of an existing user.
+- `update_password_hash`: Stores a new hash of a user's password.
 - `get_all_users`: Retrieves all users from the database.
+- `get_many`: Retrieves several users by ID in one query, in the requested order.
+
+`AsyncUserService` provides the lookups and profile image update on an `AsyncSession`.
 """
 
+from typing import Optional, Sequence
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.core.auth import invalidate_user
 from app.core.security import get_password_hash
+from app.services.blob_service import AsyncBlobService, BlobService
+from app.services.counter_service import USERS_TOTAL, CounterService
 from app.config import VALID_ROLES
 from app.schemas.user import UserCreate, UserProfileUpdate  # Add UserProfileUpdate here
+from app.utils.pagination import Batch, in_requested_order
+
+def with_id(columns: Sequence) -> tuple:
+    """Return `columns` followed by `User.id` when it is missing from them."""
+    return tuple(columns) if any(column is User.id for column in columns) else (*columns, User.id)
 
 class UserService:
     @staticmethod
@@ -47,6 +62,7 @@ class UserService:
         hashed_password = get_password_hash(password)
         db_user = User(username=username, email=email, hashed_password=hashed_password, role=role)
         db.add(db_user)
+        CounterService.apply(db, {USERS_TOTAL: 1})
         db.commit()
         db.refresh(db_user)
         return db_user
@@ -133,22 +149,68 @@ class UserService:
 
         user.role = new_role
         db.commit()
+        invalidate_user(user_id)
         db.refresh(user)
         return user
 
     @staticmethod
-    def get_all_users(db: Session):
+    def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+        """
+        Stores a new hash of a user's unchanged password, e.g. after the bcrypt cost changed.
+
+        Parameters:
+        - `db` (Session): The database session used for updating the user.
+        - `user` (User): The user whose hash is replaced.
+        - `hashed_password` (str): The new hash.
+
+        Returns:
+        - User: The updated user record.
+        """
+        user.hashed_password = hashed_password
+        db.commit()
+        return user
+
+    @staticmethod
+    def get_all_users(db: Session, columns: Optional[Sequence] = None):
         """
         Retrieves all users from the database.
 
         Parameters:
         - `db` (Session): The database session used for querying.
+        - `columns` (Optional[Sequence]): User columns to select instead of whole users.
 
         Returns:
-        - List[User]: A list of all user records in the database.
+        - List[User]: A list of all user records in the database, or rows of `columns` when given.
         """
+        if columns is not None:
+            return db.query(*columns).all()
         return db.query(User).all()
 
+    @staticmethod
+    def get_many(db: Session, user_ids: Sequence[int], columns: Optional[Sequence] = None) -> Batch:
+        """
+        Retrieves several users by their IDs with a single `IN` query.
+
+        Parameters:
+        - `db` (Session): The database session used for querying.
+        - `user_ids` (Sequence[int]): The IDs to look up; repeated IDs are looked up once.
+        - `columns` (Optional[Sequence]): User columns to select instead of whole users.
+
+        Returns:
+        - Batch of the users (or rows of `columns`, followed by the ID when it is not among
+          them) found, in the order their IDs were requested, and the requested IDs with no user.
+        """
+        ids = list(dict.fromkeys(user_ids))
+        if not ids:
+            return Batch([], [])
+        if columns is None:
+            found = {user.id: user for user in db.query(User).filter(User.id.in_(ids))}
+        else:
+            selected = with_id(columns)
+            position = next(i for i, column in enumerate(selected) if column is User.id)
+            found = {row[position]: row for row in db.query(*selected).filter(User.id.in_(ids))}
+        return in_requested_order(found, ids)
+
     @staticmethod
     def get_user_profile(db: Session, user_id: int):
         """
@@ -182,6 +244,7 @@ class UserService:
         for key, value in profile_data.dict(exclude_unset=True).items():
             setattr(user, key, value)
         db.commit()
+        invalidate_user(user_id)
         db.refresh(user)
         return user
 
@@ -189,7 +252,84 @@ class UserService:
     def update_profile_image(db: Session, user_id: int, image_url: str):
         user = db.query(User).filter(User.id == user_id).first()
         if user:
+            if user.profile_image_url != image_url:
+                BlobService.add_references(db, {user.profile_image_url: -1, image_url: 1})
             user.profile_image_url = image_url
             db.commit()
             db.refresh(user)
-        return user
\ No newline at end of file
+        return user
+
+
+class AsyncUserService:
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: int) -> User:
+        """
+        Retrieves a user by their ID.
+
+        Raises:
+        - HTTPException: If the user is not found.
+        """
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return user
+
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str) -> User:
+        """
+        Retrieves a user by their username.
+
+        Raises:
+        - HTTPException: If the user is not found.
+        """
+        result = await db.execute(select(User).filter(User.username == username))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return user
+
+    @staticmethod
+    async def get_all_users(db: AsyncSession, columns: Optional[Sequence] = None):
+        """
+        Retrieves all users from the database, or rows of `columns` when given.
+        """
+        if columns is not None:
+            return (await db.execute(select(*columns))).all()
+        result = await db.execute(select(User))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_many(db: AsyncSession, user_ids: Sequence[int], columns: Optional[Sequence] = None) -> Batch:
+        """
+        Retrieves several users by their IDs with a single `IN` query, see `UserService.get_many`.
+        """
+        ids = list(dict.fromkeys(user_ids))
+        if not ids:
+            return Batch([], [])
+        if columns is None:
+            result = await db.execute(select(User).filter(User.id.in_(ids)))
+            found = {user.id: user for user in result.scalars()}
+        else:
+            selected = with_id(columns)
+            position = next(i for i, column in enumerate(selected) if column is User.id)
+            result = await db.execute(select(*selected).filter(User.id.in_(ids)))
+            found = {row[position]: row for row in result}
+        return in_requested_order(found, ids)
+
+    @staticmethod
+    async def get_user_profile(db: AsyncSession, user_id: int):
+        """
+        Retrieve a user's profile by their ID, or None if not found.
+        """
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def update_profile_image(db: AsyncSession, user_id: int, image_url: str):
+        user = await db.get(User, user_id)
+        if user:
+            if user.profile_image_url != image_url:
+                await AsyncBlobService.add_references(db, {user.profile_image_url: -1, image_url: 1})
+            user.profile_image_url = image_url
+            await db.commit()
+            await db.refresh(user)
+        return user
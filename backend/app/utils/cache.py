@@ -0,0 +1,131 @@
+"""
+Bounded in-process cache with per-entry expiry.
+
+`TTLCache` keeps at most `maxsize` entries and evicts the least recently used one when
+full. Every entry expires `ttl` seconds after it was stored, or earlier when stored with
+a shorter `ttl`. All operations are guarded by a lock, so one cache can be shared by the
+threads serving requests.
+
+`TTLCache` methods:
+- `get`: Returns a live entry and marks it as recently used, counting a hit or a miss.
+- `set`: Stores an entry, evicting the least recently used one if the cache is full.
+- `pop`: Removes one entry.
+- `discard_where`: Removes every entry matching a predicate.
+- `clear`: Removes all entries.
+- `stats`: Returns the size and the hit, miss, eviction and expiration counters.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize (int): Maximum number of entries; 0 disables the cache.
+            ttl (float): Default lifetime of an entry in seconds.
+            clock (Callable): Time source, replaceable in tests.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the live entry stored under `key`, or `default`.
+
+        Expired entries are removed on access and count as misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store `value` under `key`.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl (Optional[float]): Lifetime in seconds, capped at the cache's `ttl`.
+        """
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Remove the entry stored under `key`, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove every entry for which `predicate(key, value)` is true.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the cache size and counters.
+
+        Returns:
+            dict: `size`, `maxsize`, `ttl`, `hits`, `misses`, `hit_rate`, `evictions`
+            and `expirations`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
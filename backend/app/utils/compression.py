@@ -0,0 +1,218 @@
+"""
+Compression of HTTP responses.
+
+`CompressionMiddleware` compresses response bodies with brotli or gzip, whichever the client
+accepts, preferring brotli. brotli is an optional dependency; without it only gzip is offered.
+A response is compressed when it:
+- has status 200 and no `Content-Encoding` yet (precompressed uploads keep theirs);
+- has a text-like content type, such as JSON;
+- is sent in a single body message of at least `COMPRESSION_MINIMUM_SIZE` bytes. Streamed
+  responses, such as large files, pass through unchanged;
+- does not ask for `Cache-Control: no-transform`.
+Such responses get `Vary: Accept-Encoding` whether or not this client accepts a coding, and a
+strong ETag is weakened when the body is compressed, since the bytes differ from the identity ones.
+
+Responses carrying an ETag, such as the tool catalog and category lists, are rendered from the
+response cache and sent byte for byte again and again. Their compressed bodies are kept in a
+cache keyed by the coding and the hash of the uncompressed body, next to that body. A hit on
+the local response cache sends the very same bytes object, whose hash Python has computed
+once already, so a repeated hit costs an identity check instead of compressing the body.
+
+Functions:
+- `gzip_compress`: Compresses bytes with gzip, with a fixed modification time.
+
+`Compressor` methods:
+- `negotiate`: Picks the content coding for an `Accept-Encoding` header.
+- `eligible`: Checks whether a response may be compressed.
+- `compress`: Compresses a body, reusing the cached bytes of a cacheable one.
+- `clear`: Drops the cached compressed bodies.
+- `stats`: Returns the compression counters and the cache statistics.
+"""
+
+import gzip
+import threading
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.static_files import accepts_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+# Content types worth compressing, besides text/*
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/javascript", "application/xml", "image/svg+xml",
+}
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    """Compress `body` with gzip; the header's modification time is zeroed so equal bodies give equal bytes."""
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class Compressor:
+    """
+    Negotiates and applies the content coding of responses, and counts what it saves.
+    """
+
+    def __init__(self, minimum_size: int, gzip_level: int, brotli_quality: int,
+                 cache_size: int, cache_ttl: float, enabled: bool = True):
+        """
+        Args:
+            minimum_size (int): Smallest body, in bytes, that is compressed.
+            gzip_level (int): gzip compression level (1-9).
+            brotli_quality (int): brotli quality (0-11).
+            cache_size (int): Compressed bodies of cacheable responses kept; 0 disables the cache.
+            cache_ttl (float): Lifetime of a cached compressed body in seconds.
+            enabled (bool): Whether responses are compressed at all.
+        """
+        self.enabled = enabled
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.codings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._lock = threading.Lock()
+        self._responses = {coding: 0 for coding in self.codings}
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Return the preferred coding the `Accept-Encoding` header allows, or None for identity."""
+        for coding in self.codings:
+            if accepts_encoding(accept_encoding, coding):
+                return coding
+        return None
+
+    def eligible(self, status_code: int, headers: Headers, size: int) -> bool:
+        """Whether a response with a complete body of `size` bytes may be compressed."""
+        if status_code != 200 or size < self.minimum_size or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        return content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+
+    def compress(self, body: bytes, coding: str, cacheable: bool = False) -> bytes:
+        """
+        Compress `body` with `coding`.
+
+        Args:
+            body (bytes): The uncompressed body.
+            coding (str): "br" or "gzip", as returned by `negotiate`.
+            cacheable (bool): Whether the body is likely to be sent again, so its compressed
+                bytes are cached and reused.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        key = None
+        compressed = None
+        if cacheable:
+            key = (coding, hash(body))
+            cached = self._cache.get(key)
+            # Equal hashes of unequal bodies are unlikely but possible
+            if cached is not None and (cached[0] is body or cached[0] == body):
+                compressed = cached[1]
+        if compressed is None:
+            if coding == "br":
+                compressed = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                compressed = gzip_compress(body, self.gzip_level)
+            if key is not None:
+                self._cache.set(key, (body, compressed))
+        with self._lock:
+            self._responses[coding] += 1
+            self._bytes_in += len(body)
+            self._bytes_out += len(compressed)
+        return compressed
+
+    def clear(self) -> None:
+        """Drop the cached compressed bodies."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the compression counters.
+
+        Returns:
+            dict: `codings` offered, compressed `responses` per coding, `bytes_in`, `bytes_out`,
+            the overall `ratio` of compressed to uncompressed bytes and the `cache` statistics.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "codings": list(self.codings),
+                "minimum_size": self.minimum_size,
+                "responses": dict(self._responses),
+                "bytes_in": self._bytes_in,
+                "bytes_out": self._bytes_out,
+                "ratio": round(self._bytes_out / self._bytes_in, 4) if self._bytes_in else 0.0,
+                "cache": self._cache.stats(),
+            }
+
+
+compressor = Compressor(
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    cache_size=settings.COMPRESSION_CACHE_SIZE,
+    cache_ttl=settings.RESPONSE_CACHE_TTL,
+    enabled=settings.COMPRESSION_ENABLED,
+)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing eligible responses with the coding negotiated by `compressor`.
+    """
+
+    def __init__(self, app: ASGIApp, compressor: Compressor = compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.compressor.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.compressor.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+        started = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, started
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if started or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # The first body message decides; later ones, if any, pass through
+            started = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or not self.compressor.eligible(start["status"], headers, len(body)):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if coding is not None:
+                body = self.compressor.compress(body, coding, cacheable="etag" in headers)
+                headers["content-encoding"] = coding
+                headers["content-length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,91 @@
+"""
+Counting the SQL statements sent to the database, to catch N+1 query patterns.
+
+`count_queries` records every statement an engine executes inside a `with` block, and
+`max_queries` fails the block when it issued more statements than allowed:
+
+    with max_queries(2):
+        client.get("/api/v1/reservations/")
+
+Statements are counted per engine, across threads, so wrapping a single request in a
+test counts exactly the statements that request issued.
+
+Functions:
+- `count_queries`: Context manager yielding a `QueryCounter` for the statements of the block.
+- `max_queries`: Context manager raising `TooManyQueries` when the block exceeds a limit.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import engine as default_engine
+
+
+class TooManyQueries(AssertionError):
+    """Raised by `max_queries` when a block issued more statements than allowed."""
+
+
+class QueryCounter:
+    """
+    Statements executed on an engine while the counter is listening.
+
+    Attributes:
+    - `statements`: `(statement, parameters)` pairs in execution order.
+    """
+
+    def __init__(self):
+        self.statements: List[Tuple[str, object]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append((statement, parameters))
+
+
+@contextmanager
+def count_queries(bind: Engine = default_engine) -> Iterator[QueryCounter]:
+    """
+    Record the statements executed on `bind` inside the block.
+
+    Args:
+        bind (Engine): The engine to listen on, the application engine by default.
+
+    Yields:
+        QueryCounter: Filled while the block runs.
+    """
+    counter = QueryCounter()
+    event.listen(bind, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", counter._record)
+
+
+@contextmanager
+def max_queries(limit: int, bind: Engine = default_engine) -> Iterator[QueryCounter]:
+    """
+    Fail when the block executes more than `limit` statements on `bind`.
+
+    Args:
+        limit (int): Largest number of statements allowed.
+        bind (Engine): The engine to listen on, the application engine by default.
+
+    Yields:
+        QueryCounter: Filled while the block runs.
+
+    Raises:
+        TooManyQueries: If the block executed more than `limit` statements.
+    """
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"{i}. {statement}" for i, (statement, _) in enumerate(counter.statements, 1))
+        raise TooManyQueries(f"Expected at most {limit} queries, got {counter.count}:\n{listing}")
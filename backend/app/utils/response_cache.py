@@ -0,0 +1,414 @@
+"""
+Cache of rendered responses, invalidated by tag.
+
+Read-heavy endpoints store the bytes they send under a key built from the route and its
+normalized query parameters (see `cache_key`), labelled with tags naming what the
+response shows, e.g. `tool:12`, `category:Hand Tools` or `catalog`. Services writing that
+data call `invalidate_after_commit` with the same tags, and the entries go once the
+transaction commits; a rolled back transaction invalidates nothing.
+
+A response computed while a write commits must not be stored after the write's
+invalidation, so a caller takes a `snapshot` of its tags before loading the data and
+passes it to `set`, which drops the entry when one of the tags was invalidated since.
+
+Backends:
+- `LocalBackend`: In-process LRU (the default). Each worker process has its own, so with
+  several workers a write only invalidates the cache of the worker running it; the others
+  serve the old response for at most `RESPONSE_CACHE_TTL` seconds.
+- `SharedBackend`: Entries and per-tag version numbers in a key-value store shared by
+  the workers, through the `get`, `mget`, `set(ex=)` and `incr` calls of `SharedStore`,
+  which a Redis client provides as is. Invalidating a tag increments its version, and an
+  entry is only served while the versions it was stored with are current.
+- `MemoryStore`: A local stand-in for the shared store, for single-process deployments and tests.
+
+Functions:
+- `cache_key`: Builds the key of a route and its query parameters.
+- `catalog_tags`: Returns the tags of the catalog responses a write to a tool changes.
+- `build_backend`: Creates the backend named by `RESPONSE_CACHE_BACKEND`.
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+
+# Tag of every response listing tools
+CATALOG_TAG = "catalog"
+
+
+def tool_tag(tool_id: int) -> str:
+    return f"tool:{tool_id}"
+
+
+def category_tag(category: str) -> str:
+    return f"category:{category}"
+
+
+def catalog_tags(tool_id: Optional[int] = None, *categories: Optional[str]) -> Set[str]:
+    """
+    Return the tags of the responses a write to a tool changes.
+
+    Args:
+        tool_id (Optional[int]): The tool, or None for a tool not stored yet.
+        categories (Optional[str]): The categories the tool is listed under before and after the write.
+
+    Returns:
+        Set[str]: The catalog tag, the tool's tag and the tags of its categories.
+    """
+    tags = {CATALOG_TAG}
+    if tool_id is not None:
+        tags.add(tool_tag(tool_id))
+    tags.update(category_tag(category) for category in categories if category is not None)
+    return tags
+
+
+class CachedResponse(NamedTuple):
+    """A rendered response: its body and the headers sent with it."""
+    body: bytes
+    headers: Dict[str, str]
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        headers, _, body = data.partition(b"\n")
+        return cls(body, json.loads(headers))
+
+
+def cache_key(route: str, params: Dict[str, Any]) -> str:
+    """
+    Build the cache key of a route and its query parameters.
+
+    Args:
+        route (str): The route's path template, e.g. "/api/v1/tools/category/{category}".
+        params (dict): The validated parameters the response depends on. Unset (None)
+            parameters are left out and the rest sorted, so equivalent requests share a key
+            however their query strings are written.
+
+    Returns:
+        str: The key.
+    """
+    return f"{route}?{urlencode(sorted((name, value) for name, value in params.items() if value is not None))}"
+
+
+class CacheBackend(ABC):
+    """Storage of a `ResponseCache`."""
+
+    name = ""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the live entry stored under `key`, or None."""
+
+    @abstractmethod
+    def snapshot(self, tags: Iterable[str]) -> Hashable:
+        """Return a token recording the state of `tags`, taken before loading the data."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], snapshot: Hashable) -> bool:
+        """Store `entry` unless one of `tags` was invalidated since `snapshot`; return whether it was."""
+
+    @abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop the entries labelled with any of `tags`."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    def size(self) -> Optional[int]:
+        """Number of entries, or None when the backend cannot tell."""
+        return None
+
+
+class LocalBackend(CacheBackend):
+    """In-process LRU of responses, with a lifetime per entry."""
+
+    name = "local"
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def snapshot(self, tags: Iterable[str]) -> Hashable:
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], snapshot: Hashable) -> bool:
+        tags = frozenset(tags)
+        with self._lock:
+            if tuple(self._versions.get(tag, 0) for tag in sorted(tags)) != snapshot:
+                return False
+            self._entries.set(key, (tags, entry))
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+        self._entries.discard_where(lambda key, value: not tags.isdisjoint(value[0]))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class SharedStore(ABC):
+    """The key-value operations `SharedBackend` needs; a Redis client has the same signatures."""
+
+    @abstractmethod
+    def get(self, name: str) -> Optional[bytes]:
+        """Return the value stored under `name`, or None."""
+
+    @abstractmethod
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Return the values stored under `keys`, with None for missing ones."""
+
+    @abstractmethod
+    def set(self, name: str, value: bytes, ex: Optional[int] = None) -> Any:
+        """Store `value` under `name`, expiring after `ex` seconds when given."""
+
+    @abstractmethod
+    def incr(self, name: str) -> int:
+        """Increment the integer stored under `name`, starting from 0, and return it."""
+
+
+class MemoryStore(SharedStore):
+    """`SharedStore` kept in the process memory, dropping the oldest values beyond `maxsize`."""
+
+    def __init__(self, maxsize: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._values: Dict[str, Tuple[Optional[float], bytes]] = {}  # name -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> Optional[bytes]:
+        item = self._values.get(name)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= self._clock():
+            del self._values[name]
+            return None
+        return value
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(name)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._get(name) for name in keys]
+
+    def set(self, name: str, value: bytes, ex: Optional[int] = None) -> Any:
+        with self._lock:
+            self._values.pop(name, None)
+            self._values[name] = (self._clock() + ex if ex is not None else None, value)
+            while len(self._values) > self.maxsize:
+                del self._values[next(iter(self._values))]
+        return True
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._get(name) or 0) + 1
+            self._values[name] = (None, str(value).encode())
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class SharedBackend(CacheBackend):
+    """
+    Responses and tag versions in a `SharedStore`.
+
+    An entry records the versions its tags had when its data was loaded; serving it costs a
+    second round trip reading the current versions.
+    """
+
+    name = "shared"
+
+    def __init__(self, store: SharedStore, ttl: float, prefix: str = "response-cache:"):
+        self.store = store
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _tag_keys(self, tags: Iterable[str]) -> List[str]:
+        return [f"{self.prefix}tag:{tag}" for tag in tags]
+
+    def _versions(self, tags: List[str]) -> List[int]:
+        return [int(version or 0) for version in self.store.mget(self._tag_keys(tags))] if tags else []
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        data = self.store.get(f"{self.prefix}entry:{key}")
+        if data is None:
+            return None
+        meta, _, payload = data.partition(b"\n")
+        tags, versions = json.loads(meta)
+        if self._versions(tags) != versions:
+            return None
+        return CachedResponse.from_bytes(payload)
+
+    def snapshot(self, tags: Iterable[str]) -> Hashable:
+        return tuple(self._versions(list(tags)))
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], snapshot: Hashable) -> bool:
+        tags = list(tags)
+        if self._versions(tags) != list(snapshot):
+            return False
+        # Stored with the versions from before the data was loaded, so an invalidation racing
+        # this write still makes the entry stale at once
+        meta = json.dumps([tags, list(snapshot)]).encode()
+        self.store.set(f"{self.prefix}entry:{key}", meta + b"\n" + entry.to_bytes(), ex=max(int(self.ttl), 1))
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag_key in self._tag_keys(tags):
+            self.store.incr(tag_key)
+
+    def clear(self) -> None:
+        # Stale entries expire on their own; the store may be shared with other data
+        if isinstance(self.store, MemoryStore):
+            self.store.clear()
+
+
+class ResponseCache:
+    """
+    Response cache over a swappable backend, counting hits, misses and invalidations.
+
+    Tags are passed to the backend in sorted order, so `snapshot` and `set` see them alike.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def use(self, backend: Optional[CacheBackend]) -> None:
+        """Replace the backend, e.g. with a `SharedBackend` over the deployment's store; None disables caching."""
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the entry stored under `key`, counting a hit or a miss."""
+        if self.backend is None:
+            return None
+        entry = self.backend.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def snapshot(self, tags: Iterable[str]) -> Hashable:
+        """Record the state of `tags`; take it before loading the data of a response."""
+        return self.backend.snapshot(sorted(tags)) if self.backend is not None else None
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], snapshot: Hashable) -> None:
+        """Store a response labelled with `tags`, unless they were invalidated since `snapshot`."""
+        if self.backend is not None and self.backend.set(key, entry, sorted(tags), snapshot):
+            with self._lock:
+                self.stores += 1
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop the responses labelled with any of `tags` now."""
+        tags = set(tags)
+        if self.backend is not None and tags:
+            self.backend.invalidate(sorted(tags))
+            with self._lock:
+                self.invalidations += 1
+
+    def invalidate_after_commit(self, db, tags: Iterable[str]) -> None:
+        """
+        Drop the responses labelled with any of `tags` once the transaction of `db` commits.
+
+        Args:
+            db (Session or AsyncSession): The session of the write.
+            tags (Iterable[str]): Tags of the data the write changes.
+        """
+        session = getattr(db, "sync_session", db)
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+    def clear(self) -> None:
+        """Drop every entry; the counters are kept."""
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the backend and counters.
+
+        Returns:
+            dict: `backend`, `size`, `hits`, `misses`, `hit_rate`, `stores` and `invalidations`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.name if self.backend is not None else None,
+                "size": self.backend.size() if self.backend is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+            }
+
+
+def build_backend(name: str) -> Optional[CacheBackend]:
+    """
+    Create the backend named by `RESPONSE_CACHE_BACKEND`.
+
+    Args:
+        name (str): "local", "shared" (over a `MemoryStore` until `ResponseCache.use` installs
+            one over the deployment's store) or "none".
+
+    Returns:
+        Optional[CacheBackend]: The backend, or None to disable caching.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "local":
+        return LocalBackend(maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL)
+    if name == "shared":
+        return SharedBackend(MemoryStore(), ttl=settings.RESPONSE_CACHE_TTL)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown response cache backend: {name}")
+
+
+response_cache = ResponseCache(build_backend(settings.RESPONSE_CACHE_BACKEND))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session):
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tags(session):
+    session.info.pop("response_cache_tags", None)
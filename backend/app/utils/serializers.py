@@ -0,0 +1,226 @@
+"""
+Fast JSON output for read-heavy endpoints.
+
+An endpoint declaring `response_model=List[schemas.tool.Tool]` has FastAPI validate every
+row again through Pydantic `orm_mode`, convert the models back with `jsonable_encoder`
+and only then encode them. The rows come from the database and are valid already, so
+endpoints on the hot path opt out: they return a `FastJSONResponse` of dicts built by a
+`RowSerializer`, which reads the schema's fields straight from a tuple of column values,
+and keep `response_model` for the documentation only.
+
+List endpoints accept a sparse fieldset, `?fields=id,name,thumbnail_url`: `only` narrows a
+serializer to those fields of its schema, so the query selects fewer columns and the
+payload carries fewer keys. Only schema fields can be named, so columns the schema leaves
+out, such as `hashed_password`, can never be requested.
+
+`FastJSONResponse` encodes with orjson when it is installed, which also handles dates and
+datetimes natively, and falls back to `jsonable_encoder` and the standard library. It is
+the application's default response class.
+
+Serializers:
+- `tool_serializer`: `schemas.tool.Tool`.
+- `reservation_serializer`: `schemas.reservation.Reservation`, with its tool nested.
+- `user_serializer`: `schemas.user.User`.
+
+Functions:
+- `render_json`: Encodes content as JSON bytes.
+- `parse_fields`: Splits the value of a `fields` query parameter.
+"""
+
+import copy
+import json
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool, thumbnail_url
+from app.models.user import User
+from app.schemas.reservation import Reservation as ReservationSchema
+from app.schemas.tool import Tool as ToolSchema
+from app.schemas.user import User as UserSchema
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+
+def render_json(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON, with dates and datetimes in ISO 8601."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated `fields` parameter; None or a blank value means every field."""
+    if value is None:
+        return None
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    return fields or None
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` encoding with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def _row_getter(names: Sequence[str]) -> Callable[[Any], tuple]:
+    if not names:
+        # Narrowed to nested fields only
+        return lambda obj: ()
+    getter = attrgetter(*names)
+    return getter if len(names) > 1 else lambda obj: (getter(obj),)
+
+
+class RowSerializer:
+    """
+    Builds the output of a response schema from tuples of column values.
+
+    A row holds the values of `columns`: the schema's own columns followed by the columns
+    of each nested serializer; values past them are ignored. Fields computed from other
+    values are added afterwards. Nothing is validated; the rows are trusted to match the schema.
+    """
+
+    def __init__(self, schema: Type[BaseModel], columns: Dict[str, Any],
+                 computed: Optional[Dict[str, Tuple[Tuple[str, ...], Callable[[dict], Any]]]] = None,
+                 nested: Optional[Dict[str, "RowSerializer"]] = None):
+        """
+        Args:
+            schema (Type[BaseModel]): The response schema whose fields are produced.
+            columns (dict): ORM column per field read from the row.
+            computed (Optional[dict]): Per field computed from other values, the names of the
+                columns it needs and the function computing it from the values.
+            nested (Optional[dict]): Serializer per field holding a nested object.
+
+        Raises:
+            ValueError: If some field of the schema is not produced, or a produced one is not in it.
+        """
+        self.schema = schema
+        self._all_columns = columns
+        self.computed = computed or {}
+        self.nested = nested or {}
+        produced = [*columns, *self.computed, *self.nested]
+        if set(produced) != set(schema.__fields__) or len(produced) != len(set(produced)):
+            raise ValueError(f"Serializer fields {sorted(produced)} do not match {schema.__name__}")
+        self.fields = tuple(schema.__fields__)
+        self._output = None  # Fields kept in the output when narrowed to some of them
+        self._narrowed: Dict[Tuple[str, ...], "RowSerializer"] = {}
+        self._select(columns)
+
+    def _select(self, columns: Dict[str, Any]) -> None:
+        self.names = tuple(columns)
+        self.columns = tuple(columns.values()) + tuple(
+            column for serializer in self.nested.values() for column in serializer.columns
+        )
+        self._getter = _row_getter(self.names)
+
+    def only(self, fields: Optional[Iterable[str]]) -> "RowSerializer":
+        """
+        Return a serializer producing only some fields of the schema, from fewer columns.
+
+        Args:
+            fields (Optional[Iterable[str]]): Field names; None keeps every field. A nested
+                field is produced whole.
+
+        Returns:
+            RowSerializer: The narrowed serializer, shared by calls asking for the same fields.
+
+        Raises:
+            ValueError: If a name is not a field of the schema.
+        """
+        if fields is None:
+            return self
+        fields = set(fields)
+        unknown = sorted(fields - set(self.fields))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(self.fields)}")
+        key = tuple(name for name in self.fields if name in fields)
+        narrowed = self._narrowed.get(key)
+        if narrowed is None:
+            needed = {name for name in key if name in self._all_columns}
+            for name in key:
+                if name in self.computed:
+                    needed.update(self.computed[name][0])
+            narrowed = copy.copy(self)
+            narrowed.computed = {name: spec for name, spec in self.computed.items() if name in fields}
+            narrowed.nested = {name: serializer for name, serializer in self.nested.items() if name in fields}
+            narrowed._select({name: column for name, column in self._all_columns.items() if name in needed})
+            narrowed._output = key if needed - set(key) else None
+            narrowed.fields = key
+            self._narrowed[key] = narrowed
+        return narrowed
+
+    def from_row(self, row: Sequence) -> dict:
+        """Return the output of one row of `columns` values."""
+        values = dict(zip(self.names, row))
+        for name, (_, compute) in self.computed.items():
+            values[name] = compute(values)
+        offset = len(self.names)
+        for name, serializer in self.nested.items():
+            end = offset + len(serializer.columns)
+            values[name] = serializer.from_row(row[offset:end])
+            offset = end
+        if self._output is not None:
+            return {name: values[name] for name in self._output}
+        return values
+
+    def many(self, rows: Iterable[Sequence]) -> List[dict]:
+        """Return the outputs of rows of `columns` values."""
+        from_row = self.from_row
+        return [from_row(row) for row in rows]
+
+    def row_of(self, obj: Any) -> tuple:
+        """Return the row of `columns` values of a loaded ORM object."""
+        row = self._getter(obj)
+        for name, serializer in self.nested.items():
+            row += serializer.row_of(getattr(obj, name))
+        return row
+
+    def from_objects(self, objects: Iterable[Any]) -> List[dict]:
+        """Return the outputs of loaded ORM objects, whose nested objects must be loaded too."""
+        from_row, row_of = self.from_row, self.row_of
+        return [from_row(row_of(obj)) for obj in objects]
+
+
+tool_serializer = RowSerializer(
+    ToolSchema,
+    {
+        "name": Tool.name, "description": Tool.description, "category": Tool.category,
+        "condition": Tool.condition, "image_url": Tool.image_url, "id": Tool.id, "owner_id": Tool.owner_id,
+        "is_available": Tool.is_available, "created_at": Tool.created_at, "image_variants": Tool.image_variants,
+    },
+    computed={
+        "thumbnail_url": (
+            ("image_url", "image_variants"),
+            lambda values: thumbnail_url(values["image_url"], values["image_variants"]),
+        ),
+    },
+)
+
+reservation_serializer = RowSerializer(
+    ReservationSchema,
+    {
+        "tool_id": Reservation.tool_id, "reservation_date": Reservation.reservation_date, "id": Reservation.id,
+        "user_id": Reservation.user_id, "return_date": Reservation.return_date,
+        "is_active": Reservation.is_active, "is_checked_out": Reservation.is_checked_out,
+    },
+    nested={"tool": tool_serializer},
+)
+
+user_serializer = RowSerializer(
+    UserSchema,
+    {
+        "email": User.email, "id": User.id, "username": User.username, "is_active": User.is_active,
+        "role": User.role, "full_name": User.full_name, "bio": User.bio, "location": User.location,
+        "profile_picture": User.profile_picture,
+    },
+)
@@ -0,0 +1,213 @@
+"""
+Serving the `uploads/` directory with long-lived caching.
+
+`UploadFiles` replaces the plain `StaticFiles` mount. Content-addressed files (stored images
+and their variants, named after the SHA-256 of the original, see `FileService`) never change
+under their name, so they are sent with a strong ETag derived from that name and with
+`Cache-Control: immutable`; browsers keep them for a year without revalidating. Other files
+get a strong ETag from their size and modification time and `UPLOAD_CACHE_MAX_AGE`.
+
+Requests are answered with:
+- 304 when `If-None-Match` matches the ETag, or `If-Modified-Since` is not older than the file.
+- 206 and the requested bytes for a single `Range`, honouring `If-Range`; 416 when the range
+  starts past the end. Multiple ranges are answered with the whole file.
+- The `.br` or `.gz` sibling of a file with `Content-Encoding` when it exists and the client
+  accepts that encoding. Ranges are not applied to compressed files.
+
+Functions:
+- `parse_range`: Parses a single byte range against a file size.
+- `accepts_encoding`: Checks whether an `Accept-Encoding` header allows a content coding.
+- `etag_matches`: Checks an `If-None-Match` header against an ETag.
+"""
+
+import os
+import re
+import stat
+from email.utils import parsedate_to_datetime
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+
+# Files named after the SHA-256 of their content, or of the original they were derived from
+CONTENT_NAME = re.compile(r"^([0-9a-f]{64})\.")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Precompressed siblings looked for, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Formats compressed already, for which no precompressed sibling is looked for
+INCOMPRESSIBLE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised by `parse_range` when the range starts past the end of the file."""
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a `Range` header asking for a single byte range.
+
+    Args:
+        header (str): The header value, e.g. "bytes=0-1023", "bytes=1024-" or "bytes=-500".
+        size (int): Size of the file in bytes.
+
+    Returns:
+        Optional[Tuple[int, int]]: First and last byte (inclusive), or None when the header
+        is malformed or asks for several ranges, in which case the whole file is sent.
+
+    Raises:
+        RangeNotSatisfiable: If the range does not overlap the file.
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    if not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last `last` bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def accepts_encoding(header: str, coding: str) -> bool:
+    """Whether an `Accept-Encoding` header allows `coding`, explicitly or through `*`."""
+    allowed = None
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if name not in (coding, "*"):
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name == coding:
+            return quality > 0
+        allowed = quality > 0
+    return bool(allowed)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag`, comparing weakly as RFC 9110 requires."""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+class FileRangeResponse(FileResponse):
+    """A `FileResponse` sending the bytes `start` to `end` (inclusive) of the file with 206."""
+
+    def __init__(self, path, start: int, end: int, stat_result: os.stat_result, headers: dict,
+                 media_type: Optional[str], method: Optional[str]):
+        headers = {
+            **headers,
+            "content-range": f"bytes {start}-{end}/{stat_result.st_size}",
+            "content-length": str(end - start + 1),
+        }
+        super().__init__(path, status_code=206, headers=headers, media_type=media_type,
+                         stat_result=stat_result, method=method)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.end - self.start + 1
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining = remaining - len(chunk) if chunk else 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+
+
+class UploadFiles(StaticFiles):
+    """
+    `StaticFiles` with strong ETags, immutable caching of content-named files, byte ranges
+    and precompressed siblings.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        full_path = os.fspath(full_path)
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        media_type = guess_type(name)[0] or "application/octet-stream"
+
+        if CONTENT_NAME.match(name):
+            etag_base = name
+            cache_control = IMMUTABLE
+        else:
+            etag_base = f"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"
+            cache_control = f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE}"
+        headers = {"accept-ranges": "bytes", "cache-control": cache_control, "vary": "Accept-Encoding"}
+
+        path, encoding = full_path, None
+        accept_encoding = request_headers.get("accept-encoding", "")
+        for coding, suffix in PRECOMPRESSED if media_type not in INCOMPRESSIBLE_TYPES else ():
+            if accepts_encoding(accept_encoding, coding):
+                try:
+                    compressed = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                if stat.S_ISREG(compressed.st_mode):
+                    path, stat_result, encoding = full_path + suffix, compressed, coding
+                    headers["content-encoding"] = coding
+                    etag_base = f"{etag_base}-{coding}"
+                    break
+        etag = f'"{etag_base}"'
+        headers["etag"] = etag
+
+        if self.is_fresh(request_headers, etag, stat_result):
+            return NotModifiedResponse(Headers(headers))
+
+        method = scope["method"]
+        range_header = request_headers.get("range")
+        if range_header and encoding is None and status_code == 200 \
+                and request_headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(range_header, stat_result.st_size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={**headers, "content-range": f"bytes */{stat_result.st_size}"})
+            if byte_range:
+                return FileRangeResponse(path, *byte_range, stat_result, headers, media_type, method)
+
+        return FileResponse(path, status_code=status_code, headers=headers, media_type=media_type,
+                            stat_result=stat_result, method=method)
+
+    @staticmethod
+    def is_fresh(request_headers: Headers, etag: str, stat_result: os.stat_result) -> bool:
+        """Whether the client's copy is current, so 304 can be sent instead of the file."""
+        if "if-none-match" in request_headers:
+            return etag_matches(request_headers["if-none-match"], etag)
+        if "if-modified-since" in request_headers:
+            try:
+                since = parsedate_to_datetime(request_headers["if-modified-since"]).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(stat_result.st_mtime) <= since
+        return False
@@ -0,0 +1,83 @@
+"""
+Limits on the size of upload request bodies.
+
+`FileService.save_upload` checks `MAX_UPLOAD_SIZE` while copying a file, but by then
+Starlette has already parsed the multipart body and spooled the whole file to disk.
+`UploadSizeLimitMiddleware` enforces the limit before and during parsing instead, on every
+`multipart/form-data` request:
+- a `Content-Length` above the limit is answered with 413 without reading the body;
+- a body without `Content-Length`, or longer than announced, is counted as it is received,
+  and 413 is sent as soon as it goes past the limit. The application then sees the client
+  disconnect, and whatever response it tries to send is dropped.
+
+The limit is `MAX_UPLOAD_SIZE` plus `UPLOAD_FORM_OVERHEAD` bytes for the multipart
+boundaries, part headers and the other form fields.
+
+Functions:
+- `upload_request_limit`: Returns the largest multipart request body accepted.
+"""
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+def upload_request_limit() -> int:
+    """Return the largest `multipart/form-data` request body accepted, in bytes."""
+    return settings.MAX_UPLOAD_SIZE + settings.UPLOAD_FORM_OVERHEAD
+
+
+def _too_large(limit: int) -> JSONResponse:
+    return JSONResponse(
+        {"detail": f"Request body is larger than the limit of {limit} bytes"},
+        status_code=413,
+        headers={"Connection": "close"},
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware rejecting multipart request bodies larger than `upload_request_limit()`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").lower().startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = upload_request_limit()
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await _too_large(limit)(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def receive_limited() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    await _too_large(limit)(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def send_unless_rejected(message: Message) -> None:
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, receive_limited, send_unless_rejected)
@@ -0,0 +1,67 @@
+"""
+Adding to numeric columns of a row that may not exist yet.
+
+Running totals such as `library_counters` and `reservation_rollups` are updated by many
+concurrent writers, so each change is a single `INSERT ... ON CONFLICT DO UPDATE` adding
+a delta to the stored values. Databases without that statement get an UPDATE followed by
+an INSERT when no row matched.
+
+Functions:
+- `add_to_row`: Adds deltas to a row in the session's transaction, creating it if missing.
+- `async_add_to_row`: The same on an `AsyncSession`.
+"""
+
+from typing import Dict
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _upsert(dialect_name: str, model, keys: Dict, deltas: Dict):
+    columns = model.__table__.c
+    return UPSERT_INSERTS[dialect_name](model).values(**keys, **deltas).on_conflict_do_update(
+        index_elements=[columns[name] for name in keys],
+        set_={name: columns[name] + delta for name, delta in deltas.items()},
+    )
+
+
+def _increment(model, keys: Dict, deltas: Dict):
+    columns = model.__table__.c
+    return update(model).where(*[columns[name] == value for name, value in keys.items()]).values(
+        {name: columns[name] + delta for name, delta in deltas.items()}
+    )
+
+
+def add_to_row(db: Session, model, keys: Dict, deltas: Dict) -> None:
+    """
+    Add `deltas` to the row of `model` identified by `keys`, without committing.
+
+    Args:
+        db (Session): The session whose transaction the change joins.
+        model: Mapped class whose primary key is made of the `keys` columns.
+        keys (dict): Primary key values of the row.
+        deltas (dict): Amount to add per numeric column; a new row starts from these.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in UPSERT_INSERTS:
+        db.execute(_upsert(dialect_name, model, keys, deltas))
+    elif not db.execute(_increment(model, keys, deltas)).rowcount:
+        db.add(model(**keys, **deltas))
+        db.flush()
+
+
+async def async_add_to_row(db: AsyncSession, model, keys: Dict, deltas: Dict) -> None:
+    """
+    Async counterpart of `add_to_row`.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in UPSERT_INSERTS:
+        await db.execute(_upsert(dialect_name, model, keys, deltas))
+    elif not (await db.execute(_increment(model, keys, deltas))).rowcount:
+        db.add(model(**keys, **deltas))
+        await db.flush()
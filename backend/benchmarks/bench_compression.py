@@ -0,0 +1,87 @@
+"""
+Benchmark of response compression: bytes saved against CPU time.
+
+Each round compresses one rendered page of `--rows` tools, the body `read_tools` sends, with
+gzip at several levels and, when the optional brotli package is installed, brotli at several
+qualities. For each setting it reports the compressed size, the share of bytes saved, the
+time to compress one page and the throughput. The last line is the cost of a repeated hit on
+a cacheable response, whose compressed bytes `Compressor` reuses: the response cache sends
+the same bytes object on every hit, so its hash is computed once.
+
+The tools are built in memory, so only compression is measured. Run from the backend directory:
+
+    python -m benchmarks.bench_compression --rows 10 100 1000 --rounds 50
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission  # noqa: F401 - mapped before the first Tool is built
+from app.utils import compression
+from app.utils.compression import Compressor, gzip_compress
+from app.utils.serializers import render_json, tool_serializer
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def build_page(count: int) -> bytes:
+    start = datetime(2024, 1, 1)
+    variants = {
+        variant: {"webp": f"http://localhost:8000/uploads/{variant}.webp", "jpeg": f"http://localhost:8000/uploads/{variant}.jpg"}
+        for variant in ("thumb", "card", "full")
+    }
+    categories = ("Hand Tools", "Power Tools", "Garden", "Saws")
+    tools = [
+        Tool(id=i, name=f"Tool {i}", description=f"A well kept tool, lent {i % 17} times", category=categories[i % 4],
+             condition="Good", owner_id=i % 50, is_available=bool(i % 3), created_at=start + timedelta(minutes=7 * i),
+             image_url=f"http://localhost:8000/uploads/{i:064x}.jpg", image_variants=variants if i % 2 else None)
+        for i in range(count)
+    ]
+    return render_json(tool_serializer.from_objects(tools))
+
+
+def measure(function, body: bytes, rounds: int) -> float:
+    function(body)  # Warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function(body)
+    return (time.perf_counter() - started) / rounds
+
+
+def settings_to_compare():
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda body, level=level: gzip_compress(body, level)
+    if compression.brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda body, quality=quality: compression.brotli.compress(body, quality=quality)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000], help="Tools per page")
+    parser.add_argument("--rounds", type=int, default=50, help="Pages compressed per setting")
+    args = parser.parse_args()
+
+    if compression.brotli is None:
+        print("brotli is not installed; only gzip is measured")
+    print(f"{'rows':>6} {'setting':<10} {'bytes':>10} {'saved':>7} {'per page':>11} {'throughput':>12}")
+    for count in args.rows:
+        body = build_page(count)
+        print(f"{count:>6} {'identity':<10} {len(body):>10}")
+        for name, function in settings_to_compare():
+            size = len(function(body))
+            elapsed = measure(function, body, args.rounds)
+            print(f"{count:>6} {name:<10} {size:>10} {1 - size / len(body):>7.1%} {elapsed * 1e6:>8.0f} us "
+                  f"{len(body) / elapsed / 2 ** 20:>7.0f} MB/s")
+
+        cached = Compressor(0, 6, 4, cache_size=16, cache_ttl=60)
+        elapsed = measure(lambda data: cached.compress(data, "gzip", cacheable=True), body, args.rounds)
+        print(f"{count:>6} {'cached':<10} {'':>10} {'':>7} {elapsed * 1e6:>8.0f} us "
+              f"{len(body) / elapsed / 2 ** 20:>7.0f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
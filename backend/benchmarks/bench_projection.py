@@ -0,0 +1,104 @@
+"""
+Benchmark of listing tools as `Tool` objects against column-projected rows.
+
+A throwaway SQLite database is filled with `--rows` tools, and the whole catalog is read in
+one page through `ToolService.get_tools`, then serialized, in two ways:
+- entities: `Tool` objects, each with its instance state and identity-map entry, then
+  `tool_serializer.from_objects`;
+- projected: plain rows of `tool_serializer.columns`, then `tool_serializer.many`.
+
+Latency is the best of `--repeat` runs, each in a fresh session. Memory is the peak
+allocated by Python while loading and serializing, measured with `tracemalloc` in a
+separate run, since tracing slows the code down.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_projection --rows 10000 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench-projection-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from app.database import Base, SessionLocal, create_tables, engine  # noqa: E402
+from app.models.tool import Tool  # noqa: E402
+from app.models.tool_submission import ToolSubmission  # noqa: E402,F401 - mapped before querying tools
+from app.services.tool_service import ToolService  # noqa: E402
+from app.utils.serializers import tool_serializer  # noqa: E402
+
+
+def fill(count: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    create_tables()
+    start = datetime(2024, 1, 1)
+    variants = {"thumb": {"webp": "http://localhost:8000/uploads/t.webp", "jpeg": "http://localhost:8000/uploads/t.jpg"}}
+    with engine.begin() as connection:
+        connection.execute(Tool.__table__.insert(), [
+            {
+                "name": f"Tool {i}", "description": "A well kept tool " * 4, "category": "Hand Tools",
+                "condition": "Good", "owner_id": 1, "is_available": True,
+                "created_at": start + timedelta(seconds=i), "image_url": "http://localhost:8000/uploads/o.jpg",
+                "image_variants": variants if i % 2 else None,
+            }
+            for i in range(count)
+        ])
+
+
+def load_entities(count: int) -> list:
+    with SessionLocal() as db:
+        return tool_serializer.from_objects(ToolService.get_tools(db, limit=count).items)
+
+
+def load_projected(count: int) -> list:
+    with SessionLocal() as db:
+        return tool_serializer.many(ToolService.get_tools(db, limit=count, columns=tool_serializer.columns).items)
+
+
+def best_time(function, count: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(count)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_memory(function, count: int) -> int:
+    tracemalloc.start()
+    try:
+        function(count)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="Catalog sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'path':<10} {'latency':>10} {'per row':>10} {'peak memory':>12}")
+    for count in args.rows:
+        fill(count)
+        assert load_entities(count) == load_projected(count)
+        results = {}
+        for name, function in (("entities", load_entities), ("projected", load_projected)):
+            elapsed = best_time(function, count, args.repeat)
+            peak = peak_memory(function, count)
+            results[name] = (elapsed, peak)
+            print(f"{count:>8} {name:<10} {elapsed * 1e3:>7.1f} ms {elapsed / count * 1e6:>7.2f} us "
+                  f"{peak / 2 ** 20:>9.1f} MB")
+        (entity_time, entity_peak), (row_time, row_peak) = results["entities"], results["projected"]
+        print(f"{count:>8} {'saving':<10} {entity_time / row_time:>8.1f}x {'':>10} "
+              f"{1 - row_peak / entity_peak:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
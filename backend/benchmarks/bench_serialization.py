@@ -0,0 +1,86 @@
+"""
+Benchmark of encoding a page of tools: the Pydantic response model path against the row serializers.
+
+Each round encodes `--rows` tools, as `read_tools` does for one page, in three ways:
+- pydantic: what FastAPI does for `response_model=List[Tool]`: `Tool.from_orm` per row,
+  `jsonable_encoder`, then the standard library `json`;
+- objects: `tool_serializer.from_objects` on the same ORM objects, encoded by `render_json`;
+- tuples: `tool_serializer.many` on tuples of column values, as a projected query returns them.
+
+The tools are built in memory, so only serialization is measured. Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --rows 100 --rounds 200
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission  # noqa: F401 - mapped before the first Tool is built
+from app.schemas.tool import Tool as ToolSchema
+from app.utils.serializers import orjson, render_json, tool_serializer
+
+
+def build_tools(count: int):
+    start = datetime(2024, 1, 1)
+    variants = {
+        variant: {"webp": f"http://localhost:8000/uploads/{variant}.webp", "jpeg": f"http://localhost:8000/uploads/{variant}.jpg"}
+        for variant in ("thumb", "card", "full")
+    }
+    return [
+        Tool(id=i, name=f"Tool {i}", description="A well kept tool " * 4, category="Hand Tools",
+             condition="Good", owner_id=1, is_available=True, created_at=start + timedelta(minutes=i),
+             image_url="http://localhost:8000/uploads/original.jpg", image_variants=variants if i % 2 else None)
+        for i in range(count)
+    ]
+
+
+def pydantic_path(tools) -> bytes:
+    content = jsonable_encoder([ToolSchema.from_orm(tool) for tool in tools])
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def objects_path(tools) -> bytes:
+    return render_json(tool_serializer.from_objects(tools))
+
+
+def tuples_path(rows) -> bytes:
+    return render_json(tool_serializer.many(rows))
+
+
+def measure(function, argument, rounds: int) -> float:
+    function(argument)  # Warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function(argument)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Tools per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages encoded per path")
+    args = parser.parse_args()
+
+    tools = build_tools(args.rows)
+    rows = [tool_serializer.row_of(tool) for tool in tools]
+    assert json.loads(pydantic_path(tools)) == json.loads(objects_path(tools)) == json.loads(tuples_path(rows))
+
+    print(f"{args.rows} rows x {args.rounds} rounds, encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'path':<10} {'per page':>12} {'per row':>12} {'speed-up':>10}")
+    baseline = None
+    for name, function, argument in (
+        ("pydantic", pydantic_path, tools), ("objects", objects_path, tools), ("tuples", tuples_path, rows),
+    ):
+        elapsed = measure(function, argument, args.rounds)
+        per_page = elapsed / args.rounds
+        baseline = baseline or per_page
+        print(f"{name:<10} {per_page * 1e3:>9.3f} ms {per_page / args.rows * 1e6:>9.2f} us {baseline / per_page:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of serving uploaded images: the plain `StaticFiles` mount against `UploadFiles`.
+
+A catalog page of `--images` content-named thumbnails is requested through the ASGI app,
+without a network, in three ways:
+- cold: every image downloaded in full;
+- revalidate: every image requested again with the validator of the first response, as a
+  browser does on reload when the response was not marked immutable;
+- reload: what a browser actually sends on reload; nothing for `Cache-Control: immutable`.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_upload_serving --images 48 --rounds 20
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from starlette.staticfiles import StaticFiles
+
+from app.utils.static_files import UploadFiles
+
+
+def build_app(mount_class, directory: Path) -> FastAPI:
+    app = FastAPI()
+    app.mount("/uploads", mount_class(directory=directory), name="uploads")
+    return app
+
+
+async def run_round(client: httpx.AsyncClient, urls, validators=None) -> int:
+    """Request every URL once; return the bytes received."""
+    received = 0
+    for url in urls:
+        headers = {"If-None-Match": validators[url]} if validators else {}
+        response = await client.get(url, headers=headers)
+        received += len(response.content)
+    return received
+
+
+async def measure(app: FastAPI, urls, rounds: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = {url: await client.get(url) for url in urls}
+        validators = {url: response.headers["etag"] for url, response in first.items()}
+        immutable = all("immutable" in r.headers.get("cache-control", "") for r in first.values())
+
+        results = {}
+        for scenario, scenario_validators in (("cold", None), ("revalidate", validators)):
+            started = time.perf_counter()
+            received = 0
+            for _ in range(rounds):
+                received += await run_round(client, urls, scenario_validators)
+            elapsed = time.perf_counter() - started
+            results[scenario] = {
+                "requests_per_second": rounds * len(urls) / elapsed,
+                "bytes_per_page": received // rounds,
+            }
+        results["reload"] = {"requests_per_page": 0 if immutable else len(urls)}
+        return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--images", type=int, default=48, help="images on a catalog page")
+    parser.add_argument("--size", type=int, default=24 * 1024, help="bytes per image")
+    parser.add_argument("--rounds", type=int, default=20, help="page loads per scenario")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        urls = []
+        for i in range(args.images):
+            content = os.urandom(args.size)
+            name = f"{hashlib.sha256(content).hexdigest()}.thumb.webp"
+            Path(directory, name).write_bytes(content)
+            urls.append(f"/uploads/{name}")
+
+        print(f"{args.images} images of {args.size} bytes, {args.rounds} page loads per scenario")
+        print(f"{'mount':<12} {'cold req/s':>11} {'reval req/s':>12} {'reval bytes':>12} {'reload reqs':>12}")
+        for label, mount_class in (("StaticFiles", StaticFiles), ("UploadFiles", UploadFiles)):
+            results = asyncio.run(measure(build_app(mount_class, Path(directory)), urls, args.rounds))
+            print(f"{label:<12} {results['cold']['requests_per_second']:>11.0f} "
+                  f"{results['revalidate']['requests_per_second']:>12.0f} "
+                  f"{results['revalidate']['bytes_per_page']:>12} "
+                  f"{results['reload']['requests_per_page']:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""
+Tests for the single-statement admin statistics and their write-invalidated cache.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.schemas.reservation import ReservationCreate
+from app.services.counter_service import CounterService
+from app.services.reservation_service import ReservationService
+from app.services.rollup_service import RollupService
+from app.services.stats_service import StatsService
+from app.utils.query_counter import count_queries, max_queries
+
+
+@pytest.fixture(scope="function")
+def library(db):
+    users = [User(username=name, email=f"{name}@example.com", hashed_password="x") for name in ("ann", "ben", "cy")]
+    db.add_all(users)
+    db.commit()
+    tools = [Tool(name=f"Tool {i}", owner_id=users[0].id, is_available=i < 4) for i in range(6)]
+    db.add_all(tools)
+    db.commit()
+    old = date.today() - timedelta(days=60)
+    db.add_all([
+        Reservation(tool_id=tools[4].id, user_id=users[1].id, reservation_date=date.today(), is_active=True),
+        Reservation(tool_id=tools[5].id, user_id=users[1].id, reservation_date=old, is_active=True),
+        Reservation(tool_id=tools[0].id, user_id=users[2].id, reservation_date=old, is_active=False),
+        ToolSubmission(name="Drill", user_id=users[2].id, status="pending"),
+        ToolSubmission(name="Saw", user_id=users[2].id, status="approved"),
+    ])
+    db.commit()
+    # The rows were inserted around the services, so count them into the counters and rollups
+    CounterService.reconcile(db)
+    RollupService.backfill(db)
+    return users, tools
+
+
+def test_statistics_are_computed_in_one_statement(db, library):
+    with max_queries(1):
+        stats = StatsService.compute_admin_statistics(db)
+
+    assert stats == {
+        "total_tools": 6,
+        "active_reservations": 2,
+        "total_users": 3,
+        "tool_stats": {"available": 4, "checked_out": 2, "in_review": 1},
+        "monthly_reservations": 1,
+        "active_users": [{"username": "ben", "reservations": 2}, {"username": "cy", "reservations": 1}],
+    }
+
+
+def test_statistics_of_empty_library(db):
+    stats = StatsService.compute_admin_statistics(db)
+    assert stats["total_tools"] == 0
+    assert stats["active_users"] == []
+
+
+def test_cached_statistics_are_dropped_by_writes(db, library):
+    users, tools = library
+    StatsService.get_admin_statistics(db)
+    with count_queries() as counter:
+        stats = StatsService.get_admin_statistics(db)
+    assert counter.count == 0
+    assert stats["tool_stats"]["available"] == 4
+
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=tools[1].id, reservation_date=date.today()), users[0].id)
+
+    stats = StatsService.get_admin_statistics(db)
+    assert stats["tool_stats"]["available"] == 3
+    assert stats["active_reservations"] == 3
+
+
+def test_stats_endpoint_requires_admin(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "viewer", "email": "viewer@example.com", "password": "password123"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "viewer", "password": "password123"}).json()["access_token"]
+    response = client.get("/api/v1/admin/stats", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
@@ -0,0 +1,92 @@
+"""
+Tests for the async service layer running on the async engine.
+"""
+
+import asyncio
+from datetime import date, datetime
+
+from app.database import AsyncSession, build_async_engine, get_async_database_url
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation_service import AsyncReservationService
+from app.services.tool_service import AsyncToolService, ToolService
+from app.services.user_service import AsyncUserService
+
+
+def run_with_async_session(coroutine_factory):
+    """Run `coroutine_factory(session)` on a fresh async engine for the test database."""
+    async def runner():
+        async_engine = build_async_engine(get_async_database_url())
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await coroutine_factory(session)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(runner())
+
+
+def test_async_database_url_uses_async_driver():
+    assert get_async_database_url("sqlite:///./sql_app.db") == "sqlite+aiosqlite:///./sql_app.db"
+    assert get_async_database_url("postgresql://user:pw@db/app").startswith("postgresql+asyncpg://")
+
+
+def test_async_services_read_and_write(db):
+    user = User(username="asyncuser", email="async@example.com", hashed_password="x", role="user")
+    db.add(user)
+    db.commit()
+    db.add(Tool(name="Ladder", description="Folding ladder", category="Access", owner_id=user.id))
+    db.commit()
+
+    async def scenario(session):
+        tools = (await AsyncToolService.get_tools(session)).items
+        found = (await AsyncToolService.search_tools(session, "fold")).items
+        reservation = await AsyncReservationService.create_reservation(
+            session, ReservationCreate(tool_id=tools[0].id, reservation_date=date.today()), user.id
+        )
+        reservations = await AsyncReservationService.get_user_reservations(session, user.id)
+        fetched_user = await AsyncUserService.get_user_by_username(session, "asyncuser")
+        batch = await AsyncUserService.get_many(session, [999, user.id])
+        return tools, found, reservation, reservations, fetched_user, batch
+
+    tools, found, reservation, reservations, fetched_user, batch = run_with_async_session(scenario)
+
+    assert [tool.name for tool in tools] == ["Ladder"]
+    assert [tool.name for tool in found] == ["Ladder"]
+    assert reservation.id is not None
+    assert reservations[0].tool.name == "Ladder"
+    assert fetched_user.id == user.id
+    assert [batch_user.id for batch_user in batch.items] == [user.id]
+    assert batch.missing == [999]
+
+
+def test_async_tool_lists_match_the_sync_service(db):
+    user = User(username="asyncuser", email="async@example.com", hashed_password="x", role="user")
+    db.add(user)
+    db.commit()
+    for i, name in enumerate(["Folding ladder", "Ladder hook", "Step ladder"]):
+        db.add(Tool(name=name, description="Ladder", category="Access", owner_id=user.id, created_at=datetime(2024, 1, 3 - i)))
+    db.commit()
+    first = ToolService.get_tools(db, limit=2)
+    ranked = ToolService.search_tools(db, "ladder", limit=2)
+
+    async def scenario(session):
+        return (
+            await AsyncToolService.get_tools(session, limit=2),
+            await AsyncToolService.get_tools(session, limit=2, cursor=first.next_cursor),
+            await AsyncToolService.search_tools(session, "ladder", limit=2),
+            await AsyncToolService.search_tools(session, "ladder", limit=2, cursor=ranked.next_cursor),
+            await AsyncToolService.get_tools_by_category(session, "Access", limit=2),
+        )
+
+    pages = run_with_async_session(scenario)
+    expected = [
+        first, ToolService.get_tools(db, limit=2, cursor=first.next_cursor),
+        ranked, ToolService.search_tools(db, "ladder", limit=2, cursor=ranked.next_cursor),
+        ToolService.get_tools_by_category(db, "Access", limit=2),
+    ]
+    for page, sync_page in zip(pages, expected):
+        assert [tool.id for tool in page.items] == [tool.id for tool in sync_page.items]
+        assert page.next_cursor == sync_page.next_cursor
+    # Oldest first, as the sync service orders them
+    assert [tool.name for tool in pages[0].items] == ["Step ladder", "Ladder hook"]
@@ -0,0 +1,72 @@
+"""
+Tests for resolving bearer tokens to the current user.
+"""
+
+from datetime import date
+
+from jose import jwt
+
+from app.config import settings
+from app.core.auth import create_access_token
+from app.models.tool import Tool
+
+
+def register_and_login(client, username):
+    client.post("/api/v1/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "password123",
+        "role": "user"
+    })
+    response = client.post("/api/v1/auth/login", json={"username": username, "password": "password123"})
+    return response.json()
+
+
+def test_login_token_carries_user_id(client, db):
+    login = register_and_login(client, "alice")
+    payload = jwt.decode(login["access_token"], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["uid"] == login["user_id"]
+    assert payload["sub"] == "alice"
+
+
+def test_users_sharing_a_role_act_as_themselves(client, db):
+    alice = register_and_login(client, "alice")
+    bob = register_and_login(client, "bob")
+    tool = Tool(name="Jigsaw", category="Power Tools", owner_id=alice["user_id"])
+    db.add(tool)
+    db.commit()
+
+    response = client.post(
+        "/api/v1/reservations/reserve",
+        headers={"Authorization": f"Bearer {bob['access_token']}"},
+        json={"tool_id": tool.id, "reservation_date": date.today().isoformat()}
+    )
+    assert response.status_code == 201
+    assert response.json()["user_id"] == bob["user_id"]
+
+    for login, expected in ((alice, 0), (bob, 1)):
+        response = client.get(
+            "/api/v1/reservations/",
+            headers={"Authorization": f"Bearer {login['access_token']}"}
+        )
+        assert len(response.json()) == expected
+
+
+def test_token_without_user_id_falls_back_to_username(client, db):
+    login = register_and_login(client, "carol")
+    legacy_token = create_access_token(data={"sub": "carol"}, role="user")
+    response = client.get(
+        f"/api/v1/users/profile/{login['user_id']}",
+        headers={"Authorization": f"Bearer {legacy_token}"}
+    )
+    assert response.status_code == 200
+
+
+def test_token_for_another_user_id_is_rejected(client, db):
+    alice = register_and_login(client, "alice")
+    forged = create_access_token(data={"sub": "mallory"}, role="user", user_id=alice["user_id"])
+    response = client.get(
+        "/api/v1/reservations/",
+        headers={"Authorization": f"Bearer {forged}"}
+    )
+    assert response.status_code == 401
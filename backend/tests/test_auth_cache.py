@@ -0,0 +1,90 @@
+"""
+Tests for the TTL+LRU cache and its use for resolving authenticated users.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.core.auth import auth_cache, create_access_token, get_current_user
+from app.database import engine
+from app.models.user import User
+from app.services.user_service import UserService
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    clock.now = 10
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    clock.now = 31
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 2)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.fixture(scope="function")
+def user(db):
+    user = User(username="cached", email="cached@example.com", hashed_password="x", role="user")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def count_user_queries(statements):
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+    return capture
+
+
+def test_repeated_token_is_resolved_from_cache(db, user):
+    token = create_access_token(data={"sub": user.username}, role=user.role)
+    statements = []
+    listener = count_user_queries(statements)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        first = get_current_user(token, db)
+        second = get_current_user(token, db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert first == second
+    assert first.id == user.id and first.role == "user"
+    assert len(statements) == 1
+    assert auth_cache.stats()["hits"] >= 1
+
+
+def test_role_change_invalidates_cached_user(db, user):
+    token = create_access_token(data={"sub": user.username}, role=user.role)
+    assert get_current_user(token, db).role == "user"
+
+    UserService.update_user_role(db, user.id, "admin")
+
+    assert auth_cache.get(token) is None
+    assert get_current_user(token, db).role == "admin"
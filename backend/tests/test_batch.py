@@ -0,0 +1,87 @@
+"""
+Tests for the multi-get of tools and users by ID.
+"""
+
+import pytest
+
+from app.config import settings
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.tool import Tool as ToolSchema
+from app.services.tool_service import ToolService
+from app.services.user_service import UserService
+from app.utils.pagination import parse_ids
+from app.utils.query_counter import count_queries
+from app.utils.serializers import user_serializer
+
+
+@pytest.fixture
+def admin_headers(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "admin", "email": "admin@example.com", "password": "password123", "role": "admin"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "admin", "password": "password123"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_parse_ids():
+    assert parse_ids("3, 1,3,2,", 10) == [3, 1, 2]
+    for value, message in (("1,a", "integers"), ("", "At least one"), ("1,2,3", "At most 2")):
+        with pytest.raises(ValueError, match=message):
+            parse_ids(value, 2)
+
+
+def test_get_many_keeps_the_requested_order_in_one_query(db):
+    owner = User(username="owner", email="owner@example.com", hashed_password="x", role="user")
+    db.add(owner)
+    db.flush()
+    tools = [Tool(name=name, owner_id=owner.id) for name in ("Drill", "Saw", "Level")]
+    db.add_all(tools)
+    db.commit()
+    ids = [tools[2].id, 999, tools[0].id, tools[2].id]
+
+    with count_queries() as queries:
+        batch = ToolService.get_many(db, ids)
+    assert queries.count == 1
+    assert [tool.name for tool in batch.items] == ["Level", "Drill"]
+    assert batch.missing == [999]
+
+    rows = ToolService.get_many(db, ids, columns=(Tool.name,)).items
+    assert [row.name for row in rows] == ["Level", "Drill"]
+
+    columns = user_serializer.only(["username"]).columns
+    assert UserService.get_many(db, [999, owner.id], columns=columns).items[0].username == "owner"
+    assert UserService.get_many(db, []) == ([], [])
+
+
+def test_batch_endpoints(client, db, admin_headers):
+    admin = db.query(User).filter(User.username == "admin").one()
+    tools = [Tool(name=name, owner_id=admin.id) for name in ("Drill", "Saw")]
+    db.add_all(tools)
+    db.commit()
+
+    response = client.get(f"/api/v1/tools/batch?ids={tools[1].id},{tools[0].id},0&fields=id,name")
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [{"id": tools[1].id, "name": "Saw"}, {"id": tools[0].id, "name": "Drill"}],
+        "missing": [0],
+    }
+    assert len(client.get(f"/api/v1/tools/batch?ids={tools[0].id}").json()["items"][0]) == len(ToolSchema.__fields__)
+
+    too_many = ",".join(str(i) for i in range(settings.BATCH_MAX_IDS + 1))
+    assert client.get(f"/api/v1/tools/batch?ids={too_many}").status_code == 400
+    assert client.get("/api/v1/tools/batch?ids=x").status_code == 400
+
+    users = client.get(f"/api/v1/users/admin/users/batch?ids=5,{admin.id}", headers=admin_headers).json()
+    assert [user["username"] for user in users["items"]] == ["admin"]
+    assert "hashed_password" not in users["items"][0]
+    assert users["missing"] == [5]
+
+    client.post("/api/v1/auth/register", json={
+        "username": "user", "email": "user@example.com", "password": "password123", "role": "user"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "user", "password": "password123"}).json()
+    response = client.get(
+        f"/api/v1/users/admin/users/batch?ids={admin.id}", headers={"Authorization": f"Bearer {token['access_token']}"}
+    )
+    assert response.status_code == 403
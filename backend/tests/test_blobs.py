@@ -0,0 +1,107 @@
+"""
+Tests for the reference counts and garbage collection of the content-addressed image store.
+"""
+
+import asyncio
+import io
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.cli import main
+from app.models.image_blob import ImageBlob
+from app.models.tool import Tool
+from app.schemas.tool import ToolUpdate
+from app.schemas.tool_submission import ToolSubmissionCreate
+from app.services.blob_service import BlobService
+from app.services.file_service import FileService
+from app.services.tool_service import ToolService
+from app.services.tool_submission_service import ToolSubmissionService
+from app.services.user_service import UserService
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 56
+
+
+def store(content: bytes) -> str:
+    file = UploadFile(io.BytesIO(content), filename="photo.png", headers=Headers({"content-type": "image/png"}))
+    return asyncio.run(FileService.save_upload(file))
+
+
+def ref_counts(db):
+    db.expire_all()
+    return dict(db.query(ImageBlob.name, ImageBlob.ref_count))
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def submitter(db):
+    return UserService.create_user(db, "maker", "maker@example.com", "password123")
+
+
+def submit(db, user_id, image_url):
+    submission = ToolSubmissionCreate(name="Drill", description="Cordless drill", category="Power Tools", condition="Good")
+    return ToolSubmissionService.create_submission(db, submission, user_id, image_url=image_url)
+
+
+def test_approved_submission_shares_its_blob_with_the_tool(db, upload_dir, submitter):
+    url = store(PNG)
+    name = FileService.blob_name(url)
+    submission = submit(db, submitter.id, url)
+    UserService.update_profile_image(db, submitter.id, store(PNG))
+    assert ref_counts(db) == {name: 2}
+
+    ToolSubmissionService.approve_submission(db, submission.id)
+    tool = db.query(Tool).filter(Tool.name == "Drill").one()
+    assert tool.image_url == url
+    assert ref_counts(db) == {name: 3}
+    assert len(list(FileService.iter_blob_files())) == 1
+
+
+def test_replaced_and_deleted_images_are_released(db, upload_dir, submitter):
+    first, second = store(PNG), store(PNG + b"\x01")
+    UserService.update_profile_image(db, submitter.id, first)
+    UserService.update_profile_image(db, submitter.id, first)
+    submission = submit(db, submitter.id, second)
+    ToolSubmissionService.approve_submission(db, submission.id)
+    tool = db.query(Tool).filter(Tool.name == "Drill").one()
+
+    ToolService.update_tool(db, tool.id, ToolUpdate(image_url=first))
+    assert ref_counts(db) == {FileService.blob_name(first): 2, FileService.blob_name(second): 1}
+    ToolService.delete_tool(db, tool.id)
+    UserService.update_profile_image(db, submitter.id, None)
+    assert ref_counts(db) == {FileService.blob_name(first): 0, FileService.blob_name(second): 1}
+    assert BlobService.count_references(db) == {FileService.blob_name(second): 1}
+
+
+def test_garbage_collection_removes_unreferenced_blobs(db, upload_dir, submitter):
+    kept, dropped, fresh = store(PNG), store(PNG + b"\x01"), store(PNG + b"\x02")
+    submit(db, submitter.id, kept)
+    UserService.update_profile_image(db, submitter.id, dropped)
+    UserService.update_profile_image(db, submitter.id, None)
+    # A reference written around the services leaves the stored count behind
+    db.add(Tool(name="Copy", owner_id=submitter.id, image_url=kept))
+    db.commit()
+
+    report = BlobService.collect_garbage(db, dry_run=True, grace=0)
+    assert (report.removed, report.repaired) == (2, 1)
+    assert len(list(FileService.iter_blob_files())) == 3
+
+    assert BlobService.collect_garbage(db, grace=3600).removed == 0
+    report = BlobService.collect_garbage(db, grace=0)
+    assert report.removed == 2 and report.freed_bytes == len(PNG) * 2 + 2
+    assert [path.name for path in FileService.iter_blob_files()] == [FileService.blob_name(kept)]
+    assert ref_counts(db) == {FileService.blob_name(kept): 2}
+    assert not FileService.blob_path(FileService.blob_name(fresh)).exists()
+
+
+def test_gc_command(db, upload_dir, capsys):
+    store(PNG)
+    assert main(["gc-blobs", "--dry-run", "--grace", "0"]) == 0
+    assert "1 unreferenced files would be removed" in capsys.readouterr().out
+    assert main(["gc-blobs", "--grace", "0"]) == 0
+    assert list(FileService.iter_blob_files()) == []
@@ -0,0 +1,87 @@
+"""
+Tests for the gzip/brotli compression of responses.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from app.schemas.tool import ToolCreate
+from app.services.tool_service import ToolService
+from app.services.user_service import UserService
+from app.utils import compression
+from app.utils.compression import Compressor, compressor
+
+
+@pytest.fixture
+def catalog(db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    for i in range(30):
+        ToolService.create_tool(db, ToolCreate(name=f"Tool {i}", description="A well kept tool", category="Saws"), owner.id)
+
+
+def test_negotiation_prefers_brotli_when_installed(monkeypatch):
+    with_brotli = Compressor(1024, 6, 4, 0, 60)
+    assert with_brotli.negotiate("gzip, deflate") == "gzip"
+    assert with_brotli.negotiate("gzip;q=0, identity") is None
+    assert with_brotli.negotiate("*") == with_brotli.codings[0]
+
+    monkeypatch.setattr(compression, "brotli", None)
+    without_brotli = Compressor(1024, 6, 4, 0, 60)
+    assert without_brotli.codings == ("gzip",)
+    assert without_brotli.negotiate("br") is None
+    assert without_brotli.negotiate("br, gzip") == "gzip"
+
+
+def test_catalog_is_compressed_once_per_body(client, catalog):
+    before = compressor.stats()
+    first = client.get("/api/v1/tools/", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/v1/tools/", headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert int(first.headers["content-length"]) < len(first.content)
+    assert len(first.json()) == 30
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+    stats = compressor.stats()
+    assert stats["responses"]["gzip"] - before["responses"]["gzip"] == 2
+    assert stats["cache"]["hits"] - before["cache"]["hits"] == 1
+    assert stats["bytes_out"] < stats["bytes_in"]
+
+
+def test_catalog_is_compressed_with_brotli(client, catalog):
+    brotli = pytest.importorskip("brotli")
+    assert "br" in compressor.codings
+    before = compressor.stats()["responses"]["br"]
+    with client.stream("GET", "/api/v1/tools/", headers={"Accept-Encoding": "gzip, br"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].startswith("W/")
+    assert int(response.headers["content-length"]) == len(raw)
+    assert len(json.loads(brotli.decompress(raw))) == 30
+    assert compressor.stats()["responses"]["br"] - before == 1
+
+
+def test_identity_small_and_conditional_responses_are_not_compressed(client, catalog):
+    identity = client.get("/api/v1/tools/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["vary"] == "Accept-Encoding"
+
+    small = client.get("/api/v1/tools/?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    etag = identity.headers["etag"]
+    unchanged = client.get("/api/v1/tools/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert "content-encoding" not in unchanged.headers
+
+
+def test_gzip_bodies_are_deterministic():
+    body = b'{"name":"Drill"}' * 100
+    assert compression.gzip_compress(body, 6) == compression.gzip_compress(body, 6)
+    assert gzip.decompress(compression.gzip_compress(body, 6)) == body
@@ -0,0 +1,104 @@
+"""
+Tests for the ETags of the tool catalog endpoints and the 304 responses they allow.
+"""
+
+from datetime import date
+
+from app.schemas.reservation import ReservationCreate
+from app.schemas.tool import ToolCreate, ToolUpdate
+from app.schemas.tool_submission import ToolSubmissionCreate
+from app.services.counter_service import CATALOG_VERSION, CounterService, DERIVED_COUNTERS
+from app.services.reservation_service import ReservationService
+from app.services.tool_service import ToolService
+from app.services.tool_submission_service import ToolSubmissionService
+from app.services.user_service import UserService
+from app.utils.query_counter import count_queries
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_catalog_lists_answer_304_until_a_write(client, db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill", category="Power Tools"), owner.id)
+
+    for url in ("/api/v1/tools/", "/api/v1/tools/category/Power%20Tools", "/api/v1/tools/search/?search_term=Drill"):
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"catalog-')
+        assert response.headers["cache-control"] == "no-cache"
+
+        with count_queries() as queries:
+            cached = revalidate(client, url, etag)
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        # Only the version is read; no tool is queried
+        assert not any("FROM tools" in statement for statement, _ in queries.statements)
+        # A strong validator for the same tag matches too
+        assert revalidate(client, url, etag.removeprefix("W/")).status_code == 304
+
+    etag = client.get("/api/v1/tools/").headers["etag"]
+    ToolService.update_tool(db, drill.id, ToolUpdate(description="Cordless"))
+    response = revalidate(client, "/api/v1/tools/", etag)
+    assert response.status_code == 200
+    assert response.json()[0]["description"] == "Cordless"
+    assert response.headers["etag"] != etag
+
+
+def test_every_catalog_write_bumps_the_version(db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    versions = [CounterService.get_value(db, CATALOG_VERSION)]
+
+    def bumped():
+        versions.append(CounterService.get_value(db, CATALOG_VERSION))
+        return versions[-1] > versions[-2]
+
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill"), owner.id)
+    assert bumped()
+    ToolService.create_sample_tools(db)
+    assert bumped()
+    ToolService.update_tool(db, drill.id, ToolUpdate(condition="Worn"))
+    assert bumped()
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=drill.id, reservation_date=date.today()), owner.id)
+    assert bumped()
+    ToolService.update_tool_availability(db, drill.id, True)
+    assert bumped()
+    submission = ToolSubmissionService.create_submission(
+        db, ToolSubmissionCreate(name="Ladder", description="Step ladder", category="Access", condition="Good"),
+        owner.id
+    )
+    assert not bumped()
+    ToolSubmissionService.approve_submission(db, submission.id)
+    assert bumped()
+    ToolService.delete_tool(db, drill.id)
+    assert bumped()
+
+    # The versions are not counts, so reconciling leaves them alone
+    assert CATALOG_VERSION not in DERIVED_COUNTERS
+    assert CounterService.reconcile(db, repair=False) == []
+
+
+def test_single_tool_etag_follows_that_tool(client, db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill"), owner.id)
+    saw = ToolService.create_tool(db, ToolCreate(name="Saw"), owner.id)
+
+    response = client.get(f"/api/v1/tools/{drill.id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Drill"
+    etag = response.headers["etag"]
+    assert revalidate(client, f"/api/v1/tools/{drill.id}", etag).status_code == 304
+
+    # Changes to other tools keep it valid
+    ToolService.update_tool(db, saw.id, ToolUpdate(condition="Worn"))
+    assert revalidate(client, f"/api/v1/tools/{drill.id}", etag).status_code == 304
+
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=drill.id, reservation_date=date.today()), owner.id)
+    response = revalidate(client, f"/api/v1/tools/{drill.id}", etag)
+    assert response.status_code == 200
+    assert response.json()["is_available"] is False
+
+    ToolService.delete_tool(db, drill.id)
+    assert revalidate(client, f"/api/v1/tools/{drill.id}", response.headers["etag"]).status_code == 404
@@ -0,0 +1,64 @@
+"""
+Tests for the `library_counters` running totals and their reconciliation.
+"""
+
+from datetime import date
+
+from app.cli import main
+from app.models.library_counter import LibraryCounter
+from app.models.tool import Tool
+from app.schemas.reservation import ReservationCreate
+from app.schemas.tool import ToolCreate
+from app.schemas.tool_submission import ToolSubmissionCreate
+from app.services.counter_service import (
+    RESERVATIONS_ACTIVE, TOOLS_AVAILABLE, TOOLS_TOTAL, USER_RESERVATIONS, CounterService, Drift
+)
+from app.services.reservation_service import ReservationService
+from app.services.tool_service import ToolService
+from app.services.tool_submission_service import ToolSubmissionService
+from app.services.user_service import UserService
+
+
+def test_service_writes_keep_counters_exact(db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    borrower = UserService.create_user(db, "borrower", "borrower@example.com", "password123")
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill"), owner.id)
+    saw = ToolService.create_tool(db, ToolCreate(name="Saw"), owner.id)
+    ToolService.create_sample_tools(db)
+
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=drill.id, reservation_date=date.today()), borrower.id)
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=saw.id, reservation_date=date.today()), borrower.id)
+    ReservationService.return_tool(db, saw.id, borrower.id)
+    ToolService.update_tool_availability(db, saw.id, True)
+    ToolService.update_tool_availability(db, saw.id, True)
+
+    first = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(name="Ladder", description="Step ladder", category="Access", condition="Good"), borrower.id)
+    second = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(name="Clamp", description="Bar clamp", category="Hand Tools", condition="Fair"), borrower.id)
+    ToolSubmissionService.approve_submission(db, first.id)
+    ToolSubmissionService.reject_submission(db, second.id)
+    ToolSubmissionService.reject_submission(db, second.id)
+    ToolService.delete_tool(db, drill.id)
+
+    assert CounterService.reconcile(db, repair=False) == []
+    values = CounterService.get_values(db, [TOOLS_TOTAL, TOOLS_AVAILABLE, RESERVATIONS_ACTIVE])
+    assert values == {TOOLS_TOTAL: 7, TOOLS_AVAILABLE: 7, RESERVATIONS_ACTIVE: 0}
+    stored = db.query(LibraryCounter.value).filter(
+        LibraryCounter.name == USER_RESERVATIONS, LibraryCounter.subject_id == borrower.id
+    ).scalar()
+    assert stored == 1
+
+
+def test_reconcile_reports_and_repairs_drift(db, capsys):
+    db.add_all([Tool(name="Hammer", owner_id=1), Tool(name="Level", owner_id=1, is_available=False)])
+    db.commit()
+
+    assert main(["reconcile-counters", "--dry-run"]) == 0
+    assert "tools_total: stored 0, actual 2 (+2)" in capsys.readouterr().out
+    assert CounterService.reconcile(db, repair=False) == [
+        Drift(TOOLS_AVAILABLE, 0, 0, 1), Drift(TOOLS_TOTAL, 0, 0, 2)
+    ]
+
+    assert main(["reconcile-counters"]) == 0
+    assert "2 counters repaired" in capsys.readouterr().out
+    db.expire_all()
+    assert CounterService.reconcile(db, repair=False) == []
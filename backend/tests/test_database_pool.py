@@ -0,0 +1,94 @@
+"""
+Tests for the connection pool selection and the pool usage metrics.
+"""
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import InstrumentedQueuePool, build_engine, get_engine_options, is_sqlite_memory, pool_metrics
+
+
+@pytest.mark.parametrize("url, memory", [
+    ("sqlite://", True),
+    ("sqlite:///:memory:", True),
+    ("sqlite:///file:shared?mode=memory&uri=true", True),
+    ("sqlite:///./sql_app.db", False),
+    ("postgresql://user:pw@db/app", False),
+])
+def test_is_sqlite_memory(url, memory):
+    assert is_sqlite_memory(url) is memory
+
+
+def test_auto_pool_selection(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_CLASS", "auto")
+
+    memory = get_engine_options("sqlite:///:memory:")
+    assert memory["poolclass"] is StaticPool
+    assert "pool_size" not in memory
+    assert memory["connect_args"] == {"check_same_thread": False}
+
+    sqlite_file = get_engine_options("sqlite:///./sql_app.db")
+    assert sqlite_file["poolclass"] is InstrumentedQueuePool
+    assert (sqlite_file["pool_size"], sqlite_file["max_overflow"], sqlite_file["pool_timeout"]) == (
+        settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT
+    )
+
+    server = get_engine_options("postgresql://user:pw@db/app")
+    assert server["poolclass"] is InstrumentedQueuePool
+    assert "connect_args" not in server
+
+
+def test_explicit_and_invalid_pool_classes(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_CLASS", "Static")
+    assert get_engine_options("postgresql://user:pw@db/app")["poolclass"] is StaticPool
+
+    monkeypatch.setattr(settings, "DB_POOL_CLASS", "bogus")
+    with pytest.raises(ValueError, match="Invalid DB_POOL_CLASS"):
+        get_engine_options("sqlite:///./sql_app.db")
+
+
+def test_checkout_and_wait_counters(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_POOL_CLASS", "queue")
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    before = pool_metrics.snapshot()
+    try:
+        first = engine.connect()
+        # The only connection is taken, so the next checkout waits and times out
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        during = pool_metrics.snapshot()
+        first.close()
+        with engine.connect():
+            pass
+    finally:
+        engine.dispose()
+    after = pool_metrics.snapshot()
+
+    assert during["connections_opened"] - before["connections_opened"] == 1
+    assert during["checked_out"] - before["checked_out"] == 1
+    assert during["timeouts"] - before["timeouts"] == 1
+    assert during["wait_time_max_ms"] >= 50
+    assert after["checkouts"] - before["checkouts"] == 2
+    assert after["checkins"] - before["checkins"] == 2
+    assert after["checked_out"] == before["checked_out"]
+
+
+def test_metrics_report_the_pool(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "admin", "email": "admin@example.com", "password": "password123", "role": "admin"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "admin", "password": "password123"}).json()
+    before = pool_metrics.snapshot()
+    pool = client.get(
+        "/api/v1/admin/metrics", headers={"Authorization": f"Bearer {token['access_token']}"}
+    ).json()["db_pool"]
+
+    assert pool["pool_class"] == "InstrumentedQueuePool"
+    assert "Pool size" in pool["status"]
+    assert pool["checkouts"] > before["checkouts"]
+    assert {"peak_checked_out", "timeouts", "wait_time_avg_ms", "wait_time_max_ms"} <= set(pool)
@@ -0,0 +1,177 @@
+"""
+Tests for the resized image variants generated from uploads.
+"""
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+from app.models.tool_submission import ToolSubmission
+from app.schemas.tool_submission import ToolSubmissionCreate
+from app.services.blob_service import BlobService
+from app.services.file_service import FileService
+from app.services import image_pipeline as pipeline_module
+from app.services.image_pipeline import VARIANTS, generate_variants, image_pipeline
+from app.services.tool_submission_service import ToolSubmissionService
+from app.services.user_service import UserService
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+def photo(width=2000, height=1000, fmt="JPEG") -> bytes:
+    """An image with EXIF data asking viewers to rotate it by 90 degrees."""
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    exif[EXIF_MAKE] = "Camera"
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, fmt, exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def pipeline_jobs(monkeypatch):
+    """Futures of the variant jobs started during the test."""
+    jobs = []
+    submit = image_pipeline.submit
+    monkeypatch.setattr(image_pipeline, "submit", lambda source: jobs.append(submit(source)) or jobs[-1])
+    return jobs
+
+
+def store(content: bytes, filename="photo.jpg", content_type="image/jpeg") -> str:
+    file = UploadFile(io.BytesIO(content), filename=filename, headers=Headers({"content-type": content_type}))
+    return asyncio.run(FileService.save_upload(file))
+
+
+def test_variants_are_resized_rotated_and_stripped(tmp_path):
+    source = tmp_path / "source.jpg"
+    source.write_bytes(photo())
+
+    written = generate_variants(source)
+    assert len(written) == len(VARIANTS) * 2
+    assert generate_variants(source) == []
+
+    for path in written:
+        with Image.open(path) as variant:
+            assert variant.format == ("WEBP" if path.suffix == ".webp" else "JPEG")
+            assert not variant.getexif()
+            variant_size = VARIANTS[path.name.split(".")[1]]
+            assert variant.size == (variant_size // 2, variant_size)
+
+
+def test_small_images_are_not_scaled_up(tmp_path):
+    source = tmp_path / "small.png"
+    buffer = io.BytesIO()
+    Image.new("RGBA", (100, 50), (0, 0, 0, 0)).save(buffer, "PNG")
+    source.write_bytes(buffer.getvalue())
+
+    for path in generate_variants(source):
+        with Image.open(path) as variant:
+            assert variant.size == (100, 50)
+
+
+def test_upload_starts_the_pipeline_and_listings_show_the_thumbnail(client, db, upload_dir, pipeline_jobs):
+    url = store(photo())
+    assert [job.result() for job in pipeline_jobs][0]
+    name = FileService.blob_name(url)
+    assert all(path.exists() for path in FileService.variant_paths(name))
+
+    user = UserService.create_user(db, "maker", "maker@example.com", "password123")
+    submission = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(
+        name="Drill", description="Cordless drill", category="Power Tools", condition="Good"
+    ), user.id, image_url=url)
+    assert submission.thumbnail_url.endswith(f"{name.split('.')[0]}.thumb.webp")
+    ToolSubmissionService.approve_submission(db, submission.id)
+
+    tool = client.get("/api/v1/tools/").json()[0]
+    assert tool["image_url"] == url
+    assert tool["thumbnail_url"] == submission.thumbnail_url
+    assert tool["image_variants"]["card"]["jpeg"].endswith(".card.jpg")
+
+
+def test_images_without_variants_fall_back_to_the_original(db, upload_dir):
+    user = UserService.create_user(db, "maker", "maker@example.com", "password123")
+    legacy = "http://localhost:8000/uploads/tool-images/0323434d.jpg"
+    submission = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(
+        name="Saw", description="Hand saw", category="Hand Tools", condition="Good"
+    ), user.id, image_url=legacy)
+    assert submission.image_variants is None
+    assert submission.thumbnail_url == legacy
+
+
+def test_variants_are_recorded_once_generated(client, db, upload_dir, monkeypatch):
+    sources = []
+    monkeypatch.setattr(image_pipeline, "submit", sources.append)
+    url = store(photo())
+    user = UserService.create_user(db, "maker", "maker@example.com", "password123")
+    submission = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(
+        name="Drill", description="Cordless drill", category="Power Tools", condition="Good"
+    ), user.id, image_url=url)
+    ToolSubmissionService.approve_submission(db, submission.id)
+    # Not generated yet: no links to missing files
+    assert client.get("/api/v1/tools/").json()[0]["thumbnail_url"] == url
+
+    assert image_pipeline._run(sources[0])
+    db.rollback()  # End the snapshot the session read before the job
+    assert db.get(ToolSubmission, submission.id).thumbnail_url.endswith(".thumb.webp")
+    tool = client.get("/api/v1/tools/").json()[0]
+    assert tool["thumbnail_url"].endswith(".thumb.webp")
+    assert tool["image_variants"]["card"]["jpeg"].endswith(".card.jpg")
+
+
+def test_variants_written_before_the_row_is_committed_are_recorded(db, upload_dir, monkeypatch):
+    sources = []
+    monkeypatch.setattr(image_pipeline, "submit", sources.append)
+    url = store(photo())
+    add_references = BlobService.add_references
+
+    def finish_job_first(session, changes):
+        # The job completes after `variant_urls` found nothing and before the commit
+        assert image_pipeline._run(sources[0])
+        add_references(session, changes)
+
+    monkeypatch.setattr(BlobService, "add_references", finish_job_first)
+    user = UserService.create_user(db, "maker", "maker@example.com", "password123")
+    submission = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(
+        name="Drill", description="Cordless drill", category="Power Tools", condition="Good"
+    ), user.id, image_url=url)
+    assert submission.thumbnail_url.endswith(".thumb.webp")
+
+
+def test_failed_generation_keeps_the_original(client, db, upload_dir, pipeline_jobs, monkeypatch):
+    def fail(source):
+        raise OSError("broken image")
+
+    monkeypatch.setattr(pipeline_module, "generate_variants", fail)
+    url = store(photo())
+    assert pipeline_jobs[0].result() == []
+
+    user = UserService.create_user(db, "maker", "maker@example.com", "password123")
+    submission = ToolSubmissionService.create_submission(db, ToolSubmissionCreate(
+        name="Drill", description="Cordless drill", category="Power Tools", condition="Good"
+    ), user.id, image_url=url)
+    assert submission.image_variants is None
+    assert submission.thumbnail_url == url
+    ToolSubmissionService.approve_submission(db, submission.id)
+
+    tool = client.get("/api/v1/tools/").json()[0]
+    assert tool["image_variants"] is None
+    assert tool["thumbnail_url"] == tool["image_url"] == url
+
+
+def test_garbage_collection_removes_variants(db, upload_dir, pipeline_jobs):
+    store(photo())
+    pipeline_jobs[0].result()
+
+    report = BlobService.collect_garbage(db, grace=0)
+    assert report.removed == 1
+    assert list(upload_dir.rglob("*.*")) == []
@@ -0,0 +1,103 @@
+"""
+Tests for offset and cursor pagination of the tool list endpoints.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.tool import Tool
+from app.services.search_index import ToolSearchIndex
+from app.services.tool_service import ToolService
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.utils.serializers import tool_serializer
+
+
+def add_tools(db, count, category="Hand Tools", name="Chisel"):
+    start = datetime(2024, 1, 1)
+    # Two tools share each timestamp so the id tie-breaker is exercised
+    db.add_all([
+        Tool(name=f"{name} {i}", category=category, owner_id=1, created_at=start + timedelta(minutes=i // 2))
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def collect_pages(client, url, **params):
+    names, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names.extend(tool["name"] for tool in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return names
+
+
+def test_cursor_pages_match_offset_order(client, db):
+    add_tools(db, 7)
+    offset_names = [tool["name"] for tool in client.get("/api/v1/tools/", params={"limit": 100}).json()]
+    assert offset_names == [f"Chisel {i}" for i in range(7)]
+    assert collect_pages(client, "/api/v1/tools/", limit=2) == offset_names
+
+
+def test_category_and_search_are_paginated(client, db):
+    add_tools(db, 5, category="Hand Tools", name="Chisel")
+    add_tools(db, 3, category="Power Tools", name="Router")
+
+    assert collect_pages(client, "/api/v1/tools/category/Power Tools", limit=2) == [
+        "Router 0", "Router 1", "Router 2"
+    ]
+    searched = collect_pages(client, "/api/v1/tools/search/", search_term="chis", limit=2)
+    assert sorted(searched) == [f"Chisel {i}" for i in range(5)]
+
+
+def test_invalid_cursor_is_rejected(client, db):
+    assert client.get("/api/v1/tools/", params={"cursor": "not-a-cursor"}).status_code == 400
+    wrong_kind = encode_cursor("rank", 1.0, 1)
+    assert client.get("/api/v1/tools/", params={"cursor": wrong_kind}).status_code == 400
+
+
+def test_created_at_is_required(db):
+    # A NULL sort key would drop the tool from cursor pages and break the next cursor
+    with pytest.raises(IntegrityError):
+        db.execute(Tool.__table__.insert().values(name="Chisel", owner_id=1, created_at=None))
+    db.rollback()
+    tool = Tool(name="Chisel", owner_id=1, created_at=None)
+    db.add(tool)
+    db.commit()
+    assert tool.created_at is not None
+
+
+@pytest.mark.parametrize("list_tools, full_text", [
+    (lambda db, **page: ToolService.get_tools(db, **page), True),
+    (lambda db, **page: ToolService.get_tools_by_category(db, "Hand Tools", **page), True),
+    (lambda db, **page: ToolService.search_tools(db, "chis", **page), True),
+    (lambda db, **page: ToolService.search_tools(db, "isel", **page), False),
+])
+def test_projected_pages_match_entity_pages(db, monkeypatch, list_tools, full_text):
+    add_tools(db, 5)
+    db.expunge_all()
+    if not full_text:
+        monkeypatch.setattr(ToolSearchIndex, "is_available", staticmethod(lambda db: False))
+
+    entity_pages, row_pages = [], []
+    for pages, columns in ((entity_pages, None), (row_pages, (Tool.name, Tool.is_available))):
+        cursor = None
+        while True:
+            page = list_tools(db, limit=2, cursor=cursor, columns=columns)
+            pages.append(page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+    assert sum(len(page.items) for page in row_pages) == 5
+    assert [page.next_cursor for page in row_pages] == [page.next_cursor for page in entity_pages]
+    assert [[row[0] for row in page.items] for page in row_pages] == [
+        [tool.name for tool in page.items] for page in entity_pages
+    ]
+    # Rows are plain tuples, never added to the identity map
+    db.expunge_all()
+    list_tools(db, limit=5, columns=tool_serializer.columns)
+    assert len(db.identity_map) == 0
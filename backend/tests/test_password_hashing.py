@@ -0,0 +1,66 @@
+"""
+Tests for the bounded bcrypt pool: back-pressure and rehashing on cost changes.
+"""
+
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from app.core import security
+from app.core.security import PasswordHasher, PasswordHasherBusy, pwd_context
+from app.models.user import User
+
+
+def test_saturated_pool_rejects_jobs():
+    hasher = PasswordHasher(pwd_context, workers=1, max_queue=1, retry_after=3)
+    release = threading.Event()
+    running = hasher._submit(release.wait)
+    queued = hasher._submit(release.wait)
+    try:
+        assert hasher.stats()["running"] == 1
+        assert hasher.stats()["queued"] == 1
+        with pytest.raises(PasswordHasherBusy) as error:
+            hasher.hash("secret")
+        assert error.value.status_code == 503
+        assert error.value.headers["Retry-After"] == "3"
+    finally:
+        release.set()
+        running.result()
+        queued.result()
+
+    assert hasher.verify("secret", hasher.hash("secret"))
+    stats = hasher.stats()
+    assert (stats["rejected"], stats["completed"], stats["queued"]) == (1, 4, 0)
+
+
+def test_busy_pool_answers_503_with_retry_after(client, db, monkeypatch):
+    client.post("/api/v1/auth/register", json={
+        "username": "stormy", "email": "stormy@example.com", "password": "password123"
+    })
+
+    def busy(*args):
+        raise PasswordHasherBusy(2)
+    monkeypatch.setattr(security.password_hasher, "verify_and_update", busy)
+
+    response = client.post("/api/v1/auth/token", data={"username": "stormy", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+@pytest.mark.parametrize("login", [
+    lambda client: client.post("/api/v1/auth/login", json={"username": "legacy", "password": "password123"}),
+    lambda client: client.post("/api/v1/auth/token", data={"username": "legacy", "password": "password123"}),
+])
+def test_login_rehashes_password_with_outdated_cost(client, db, login):
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5)
+    db.add(User(username="legacy", email="legacy@example.com", hashed_password=old_context.hash("password123")))
+    db.commit()
+
+    response = login(client)
+    assert response.status_code == 200
+
+    db.expire_all()
+    user = db.query(User).filter(User.username == "legacy").one()
+    assert user.hashed_password.startswith("$2b$04$")
+    assert not pwd_context.needs_update(user.hashed_password)
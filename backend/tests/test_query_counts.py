@@ -0,0 +1,97 @@
+"""
+Query-count guards for the reservation and submission listings.
+
+Each listing must issue a fixed number of statements however many rows it returns, so a
+relationship lazy-loaded per row (an N+1 pattern) fails these tests.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.utils.query_counter import TooManyQueries, count_queries, max_queries
+
+ROWS = 10
+
+
+def login(client, username, role):
+    client.post("/api/v1/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "password123",
+        "role": role
+    })
+    response = client.post("/api/v1/auth/login", json={"username": username, "password": "password123"})
+    return response.json()
+
+
+@pytest.fixture(scope="function")
+def borrower(client, db):
+    login_data = login(client, "borrower", "user")
+    tools = [Tool(name=f"Tool {i}", category="Hand Tools", owner_id=login_data["user_id"]) for i in range(ROWS)]
+    db.add_all(tools)
+    db.commit()
+    db.add_all([
+        Reservation(tool_id=tool.id, user_id=login_data["user_id"], reservation_date=date.today())
+        for tool in tools
+    ])
+    db.add_all([
+        ToolSubmission(name=f"Submission {i}", description="Spare", category="Hand Tools",
+                       condition="Good", user_id=login_data["user_id"], status="pending")
+        for i in range(ROWS)
+    ])
+    db.commit()
+    return {"Authorization": f"Bearer {login_data['access_token']}"}
+
+
+def test_max_queries_reports_extra_statements(db):
+    db.add(User(username="counted", email="counted@example.com", hashed_password="x"))
+    db.commit()
+    with pytest.raises(TooManyQueries, match="at most 1 queries, got 2"):
+        with max_queries(1):
+            db.query(User).all()
+            db.query(User).count()
+
+
+def test_reservation_listing_loads_tools_in_one_query(client, borrower):
+    # One statement resolves the token's user, one loads the reservations with their tools
+    with max_queries(2):
+        response = client.get("/api/v1/reservations/", headers=borrower)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+    assert all(reservation["tool"]["name"] for reservation in response.json())
+
+
+def test_reservation_response_nests_tool_without_lazy_load(client, borrower, db):
+    tool = Tool(name="Belt Sander", category="Power Tools", owner_id=1)
+    db.add(tool)
+    db.commit()
+    tool_id = tool.id
+    with count_queries() as counter:
+        response = client.post(
+            "/api/v1/reservations/reserve",
+            headers=borrower,
+            json={"tool_id": tool_id, "reservation_date": date.today().isoformat()}
+        )
+    assert response.status_code == 201
+    assert response.json()["tool"]["name"] == "Belt Sander"
+    # The tool comes with the reloaded reservation, not from a separate lazy load of the row
+    assert not [
+        statement for statement, _ in counter.statements
+        if "FROM tools" in statement and "tools.name" in statement
+    ]
+
+
+def test_pending_submissions_load_submitters_in_one_query(client, borrower):
+    admin = login(client, "librarian", "admin")
+    with max_queries(2):
+        response = client.get(
+            "/api/v1/tool-submissions/pending",
+            headers={"Authorization": f"Bearer {admin['access_token']}"}
+        )
+    assert response.status_code == 200
+    assert [submission["user_name"] for submission in response.json()] == ["borrower"] * ROWS
@@ -0,0 +1,110 @@
+"""
+EXPLAIN QUERY PLAN checks that the hot service queries are served by indexes.
+
+Each test runs a service method, captures the SQL it sends to the database, and asserts
+that SQLite reads every filtered table through an index rather than a full table scan.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+from app.models.tool_submission import ToolSubmission
+from app.models.user import User
+from app.services.reservation_service import ReservationService
+from app.services.tool_service import ToolService
+from app.services.tool_submission_service import ToolSubmissionService
+from app.utils.pagination import encode_cursor
+from app.utils.query_counter import count_queries
+
+# A plan step reading a whole table without an index, e.g. "SCAN reservations"
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@contextmanager
+def captured_statements():
+    """Collect the SELECT statements and parameters executed on the engine."""
+    with count_queries() as counter:
+        yield counter.statements
+    counter.statements[:] = [
+        (statement, parameters) for statement, parameters in counter.statements
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+
+
+def query_plan(db, statement, parameters):
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def assert_uses_indexes(db, statements):
+    assert statements, "the service method did not run any query"
+    for statement, parameters in statements:
+        plan = query_plan(db, statement, parameters)
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not scans, f"full table scan in {plan} for:\n{statement}"
+
+
+@pytest.fixture(scope="function")
+def catalog(db):
+    user = User(username="planner", email="planner@example.com", hashed_password="x", role="user")
+    db.add(user)
+    db.commit()
+    db.add_all([
+        Tool(name=f"Tool {i}", category="Hand Tools" if i % 2 else "Power Tools", owner_id=user.id,
+             is_available=bool(i % 3), created_at=datetime(2024, 1, 1, 0, i))
+        for i in range(30)
+    ])
+    db.commit()
+    db.add_all([
+        Reservation(tool_id=i + 1, user_id=user.id, reservation_date=date(2024, 1, 1), is_active=bool(i % 2))
+        for i in range(10)
+    ])
+    db.add_all([
+        ToolSubmission(name=f"Submission {i}", user_id=user.id, status="pending" if i % 2 else "approved")
+        for i in range(10)
+    ])
+    db.commit()
+    return user
+
+
+def test_tool_listing_uses_index(db, catalog):
+    with captured_statements() as statements:
+        ToolService.get_tools(db, limit=5)
+        ToolService.get_tools(db, limit=5, cursor=encode_cursor("created", datetime(2024, 1, 1, 0, 10), 11))
+    assert_uses_indexes(db, statements)
+
+
+def test_category_listing_uses_index(db, catalog):
+    with captured_statements() as statements:
+        ToolService.get_tools_by_category(db, "Hand Tools", limit=5)
+        ToolService.get_tools_by_category(
+            db, "Hand Tools", limit=5, cursor=encode_cursor("created", datetime(2024, 1, 1, 0, 10), 11)
+        )
+    assert_uses_indexes(db, statements)
+
+
+def test_active_reservation_lookups_use_index(db, catalog):
+    with captured_statements() as statements:
+        ReservationService.get_active_reservation(db, 2, catalog.id)
+        ReservationService.checkout_tool(db, 2, catalog.id)
+        ReservationService.return_tool(db, 2, catalog.id)
+    assert_uses_indexes(db, statements)
+
+
+def test_user_reservations_use_index(db, catalog):
+    with captured_statements() as statements:
+        ReservationService.get_user_reservations(db, catalog.id)
+    assert_uses_indexes(db, statements)
+
+
+def test_pending_submissions_use_partial_index(db, catalog):
+    with captured_statements() as statements:
+        ToolSubmissionService.get_pending_submissions(db)
+    assert_uses_indexes(db, statements)
+    plan = query_plan(db, *statements[0])
+    assert any("ix_tool_submissions_pending" in step for step in plan), plan
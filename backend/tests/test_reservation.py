@@ -0,0 +1,77 @@
+"""
+Tests for reserving tools, including concurrent reservations of the same tool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+
+PARALLEL_REQUESTS = 200
+
+
+@pytest.fixture(scope="function")
+def user_token(client, db):
+    """
+    Fixture to register and log in a user, returning the access token for authentication.
+    """
+    client.post("/api/v1/auth/register", json={
+        "username": "borrower",
+        "email": "borrower@example.com",
+        "password": "borrowerpassword",
+        "role": "user"
+    })
+    login_response = client.post("/api/v1/auth/login", json={
+        "username": "borrower",
+        "password": "borrowerpassword"
+    })
+    return login_response.json()["access_token"]
+
+
+@pytest.fixture(scope="function")
+def tool_id(db, user_token):
+    tool = Tool(name="Tile Cutter", description="Manual tile cutter", category="Hand Tools", owner_id=1)
+    db.add(tool)
+    db.commit()
+    return tool.id
+
+
+def reserve(client, token, tool_id):
+    return client.post(
+        "/api/v1/reservations/reserve",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"tool_id": tool_id, "reservation_date": date.today().isoformat()}
+    )
+
+
+def test_reserve_tool(client, user_token, tool_id, db):
+    response = reserve(client, user_token, tool_id)
+    assert response.status_code == 201
+    assert response.json()["tool"]["is_available"] is False
+
+    # A second reservation of the same tool is a conflict
+    response = reserve(client, user_token, tool_id)
+    assert response.status_code == 409
+
+
+def test_reserve_missing_tool(client, user_token, db):
+    response = reserve(client, user_token, 999)
+    assert response.status_code == 404
+
+
+def test_parallel_reservations_never_double_book(client, user_token, tool_id, db):
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        responses = list(executor.map(
+            lambda _: reserve(client, user_token, tool_id), range(PARALLEL_REQUESTS)
+        ))
+
+    status_codes = [response.status_code for response in responses]
+    assert status_codes.count(201) == 1
+    assert status_codes.count(409) == PARALLEL_REQUESTS - 1
+
+    db.expire_all()
+    assert db.query(Reservation).filter(Reservation.tool_id == tool_id).count() == 1
+    assert db.query(Tool).filter(Tool.id == tool_id).one().is_available is False
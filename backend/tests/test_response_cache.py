@@ -0,0 +1,133 @@
+"""
+Tests for the cache of rendered tool catalog responses and its invalidation by tag.
+"""
+
+import pytest
+
+from app.models.tool import Tool
+from app.schemas.tool import ToolCreate, ToolUpdate
+from app.services.tool_service import ToolService
+from app.services.user_service import UserService
+from app.utils.query_counter import count_queries
+from app.utils.response_cache import (
+    CachedResponse, LocalBackend, MemoryStore, ResponseCache, SharedBackend, cache_key, catalog_tags, response_cache
+)
+
+ENTRY = CachedResponse(b'[{"id":1}]', {"etag": 'W/"catalog-1"'})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["local", "shared"])
+def backend_cache(request):
+    clock = Clock()
+    if request.param == "local":
+        backend = LocalBackend(maxsize=2, ttl=60, clock=clock)
+    else:
+        backend = SharedBackend(MemoryStore(clock=clock), ttl=60)
+    return ResponseCache(backend), clock
+
+
+def tool_queries(queries):
+    return [statement for statement, _ in queries.statements if "FROM tools" in statement]
+
+
+def test_cache_key_normalizes_parameters():
+    assert cache_key("/tools/", {"limit": 10, "skip": 0, "cursor": None}) == "/tools/?limit=10&skip=0"
+    assert cache_key("/tools/", {"skip": 0, "limit": 10}) == cache_key("/tools/", {"limit": 10, "skip": 0})
+
+
+def test_backends_store_and_invalidate_by_tag(backend_cache):
+    cache, clock = backend_cache
+    tags = ["catalog", "tool:1"]
+    cache.set("a", ENTRY, tags, cache.snapshot(tags))
+    cache.set("b", ENTRY, ["category:Saws"], cache.snapshot(["category:Saws"]))
+    assert cache.get("a") == ENTRY
+
+    cache.invalidate(["tool:1"])
+    assert cache.get("a") is None
+    assert cache.get("b") == ENTRY
+
+    # Entries loaded before an invalidation of their tags are not stored
+    snapshot = cache.snapshot(["category:Saws"])
+    cache.invalidate(["category:Saws"])
+    cache.set("b", ENTRY, ["category:Saws"], snapshot)
+    assert cache.get("b") is None
+
+    cache.set("c", ENTRY, ["catalog"], cache.snapshot(["catalog"]))
+    clock.now += 61
+    assert cache.get("c") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["invalidations"]) == (2, 3, 3, 2)
+    assert stats["hit_rate"] == 0.4
+
+
+def test_local_backend_evicts_least_recently_used():
+    cache = ResponseCache(LocalBackend(maxsize=2, ttl=60))
+    for key in ("a", "b", "c"):
+        cache.set(key, ENTRY, ["catalog"], cache.snapshot(["catalog"]))
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 2
+
+
+def test_catalog_lists_are_served_from_the_cache_until_a_write(client, db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill", category="Power Tools"), owner.id)
+    ToolService.create_tool(db, ToolCreate(name="Saw", category="Saws"), owner.id)
+
+    first = client.get("/api/v1/tools/?skip=0&limit=10")
+    with count_queries() as queries:
+        # Reordered and unknown parameters share the entry
+        second = client.get("/api/v1/tools/?limit=10&_=123")
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    assert tool_queries(queries) == []
+
+    power_tools = client.get("/api/v1/tools/category/Power%20Tools").json()
+    saws = client.get("/api/v1/tools/category/Saws").json()
+    ToolService.update_tool(db, drill.id, ToolUpdate(description="Cordless"))
+
+    with count_queries() as queries:
+        assert client.get("/api/v1/tools/category/Saws").json() == saws
+    assert tool_queries(queries) == []
+    updated = client.get("/api/v1/tools/category/Power%20Tools").json()
+    assert updated != power_tools and updated[0]["description"] == "Cordless"
+    assert client.get("/api/v1/tools/?limit=10").json()[0]["description"] == "Cordless"
+    assert client.get(f"/api/v1/tools/{drill.id}").json()["description"] == "Cordless"
+
+
+def test_rolled_back_writes_invalidate_nothing(db):
+    response_cache.set("key", ENTRY, ["catalog"], response_cache.snapshot(["catalog"]))
+    db.add(Tool(name="Level", owner_id=1))
+    response_cache.invalidate_after_commit(db, catalog_tags(None, "Hand Tools"))
+    db.rollback()
+    assert response_cache.get("key") == ENTRY
+
+    response_cache.invalidate_after_commit(db, catalog_tags(None, "Hand Tools"))
+    db.commit()
+    assert response_cache.get("key") is None
+
+
+def test_metrics_report_the_hit_rate(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "admin", "email": "admin@example.com", "password": "password123", "role": "admin"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "admin", "password": "password123"}).json()
+    before = response_cache.stats()
+    client.get("/api/v1/tools/")
+    client.get("/api/v1/tools/")
+
+    metrics = client.get(
+        "/api/v1/admin/metrics", headers={"Authorization": f"Bearer {token['access_token']}"}
+    ).json()["response_cache"]
+    assert metrics["backend"] == "local"
+    assert metrics["hits"] - before["hits"] == 1
+    assert metrics["misses"] - before["misses"] == 1
@@ -0,0 +1,147 @@
+"""
+Tests for the daily reservation rollups and the trend endpoints built on them.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.cli import main
+from app.core.auth import create_access_token
+from app.models.reservation import Reservation
+from app.models.reservation_rollup import ReservationRollup
+from app.models.tool import Tool
+from app.schemas.reservation import ReservationCreate
+from app.schemas.tool import ToolCreate, ToolUpdate
+from app.services.reservation_service import ReservationService
+from app.services.rollup_service import ALL, CATEGORY, TOOL, RollupService
+from app.services.tool_service import ToolService
+from app.services.user_service import UserService
+
+
+def rollup_rows(db):
+    rows = db.query(ReservationRollup).filter(
+        (ReservationRollup.reservations != 0) | (ReservationRollup.returns != 0)
+    )
+    return sorted((row.dimension, row.key, row.day, row.reservations, row.returns) for row in rows)
+
+
+@pytest.fixture(scope="function")
+def history(db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    tools = [
+        Tool(name="Drill", category="Power Tools", owner_id=owner.id),
+        Tool(name="Sander", category="Power Tools", owner_id=owner.id),
+        Tool(name="Rake", category="Garden", owner_id=owner.id),
+    ]
+    db.add_all(tools)
+    db.commit()
+    db.add_all([
+        Reservation(tool_id=tools[0].id, user_id=owner.id, reservation_date=date(2024, 1, 1),
+                    return_date=date(2024, 1, 3), is_active=False),
+        Reservation(tool_id=tools[1].id, user_id=owner.id, reservation_date=date(2024, 1, 2), is_active=True),
+        Reservation(tool_id=tools[2].id, user_id=owner.id, reservation_date=date(2024, 1, 10), is_active=True),
+        Reservation(tool_id=tools[2].id, user_id=owner.id, reservation_date=date(2024, 2, 5), is_active=True),
+    ])
+    db.commit()
+    RollupService.backfill(db)
+    return owner, tools
+
+
+def test_service_writes_match_backfill(db):
+    owner = UserService.create_user(db, "owner", "owner@example.com", "password123")
+    borrower = UserService.create_user(db, "borrower", "borrower@example.com", "password123")
+    drill = ToolService.create_tool(db, ToolCreate(name="Drill", category="Power Tools"), owner.id)
+    rake = ToolService.create_tool(db, ToolCreate(name="Rake", category="Garden"), owner.id)
+    saw = ToolService.create_tool(db, ToolCreate(name="Saw", category="Hand Tools"), owner.id)
+
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=drill.id, reservation_date=date.today()), borrower.id)
+    ReservationService.return_tool(db, drill.id, borrower.id)
+    ReservationService.reserve_tool(db, ReservationCreate(tool_id=rake.id, reservation_date=date.today()), borrower.id)
+    cancelled = ReservationService.create_reservation(
+        db, ReservationCreate(tool_id=saw.id, reservation_date=date.today()), borrower.id
+    )
+    ReservationService.cancel_reservation(db, cancelled.id, borrower.id)
+    ReservationService.create_reservation(db, ReservationCreate(tool_id=saw.id, reservation_date=date.today()), borrower.id)
+    ToolService.delete_tool(db, saw.id)
+    ToolService.update_tool(db, drill.id, ToolUpdate(category="Cordless Tools"))
+
+    recorded = rollup_rows(db)
+    assert (ALL, "", date.today(), 2, 1) in recorded
+    assert (CATEGORY, "Garden", date.today(), 1, 0) in recorded
+    assert (CATEGORY, "Cordless Tools", date.today(), 1, 1) in recorded
+    assert not any(row[:2] == (CATEGORY, "Power Tools") for row in recorded)
+    RollupService.backfill(db)
+    assert rollup_rows(db) == recorded
+
+
+def test_series_buckets_and_zero_fills(db, history):
+    days = RollupService.series(db, date(2024, 1, 1), date(2024, 1, 4))
+    assert days == [
+        {"period": "2024-01-01", "reservations": 1, "returns": 0},
+        {"period": "2024-01-02", "reservations": 1, "returns": 0},
+        {"period": "2024-01-03", "reservations": 0, "returns": 1},
+        {"period": "2024-01-04", "reservations": 0, "returns": 0},
+    ]
+
+    weeks = RollupService.series(db, date(2024, 1, 1), date(2024, 1, 21), "week")
+    assert [(point["period"], point["reservations"]) for point in weeks] == [
+        ("2024-01-01", 2), ("2024-01-08", 1), ("2024-01-15", 0)
+    ]
+
+    months = RollupService.series(db, date(2024, 1, 1), date(2024, 3, 31), "month", CATEGORY, "Garden")
+    assert [point["reservations"] for point in months] == [1, 1, 0]
+
+
+def test_series_rejects_invalid_ranges(db):
+    with pytest.raises(ValueError):
+        RollupService.series(db, date(2024, 2, 1), date(2024, 1, 1))
+    with pytest.raises(ValueError):
+        RollupService.series(db, date(2024, 1, 1), date(2024, 1, 2), "hour")
+    with pytest.raises(ValueError):
+        RollupService.series(db, date(2000, 1, 1), date(2024, 1, 1))
+
+
+def test_breakdown_ranks_categories_and_tools(db, history):
+    _, tools = history
+    assert RollupService.breakdown(db, date(2024, 1, 1), date(2024, 1, 31)) == [
+        {"key": "Power Tools", "reservations": 2, "returns": 1},
+        {"key": "Garden", "reservations": 1, "returns": 0},
+    ]
+    assert RollupService.breakdown(db, date(2024, 1, 1), date(2024, 2, 29), TOOL, limit=1) == [
+        {"key": str(tools[2].id), "reservations": 2, "returns": 0}
+    ]
+
+
+def test_trend_endpoints_require_admin(client, db, history):
+    owner, tools = history
+    params = {"start": "2024-01-01", "end": "2024-01-31", "bucket": "week"}
+    token = create_access_token({"sub": owner.username}, owner.role, owner.id)
+    response = client.get("/api/v1/admin/trends/reservations", params=params,
+                          headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+    UserService.update_user_role(db, owner.id, "admin")
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': owner.username}, 'admin', owner.id)}"}
+    response = client.get("/api/v1/admin/trends/reservations", params=params, headers=headers)
+    assert response.status_code == 200
+    assert [point["reservations"] for point in response.json()["series"]] == [2, 1, 0, 0, 0]
+
+    response = client.get("/api/v1/admin/trends/reservations",
+                          params={**params, "category": "Garden", "tool_id": tools[2].id}, headers=headers)
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/admin/trends/reservations/breakdown",
+                          params={"by": "tool", "start": "2024-01-01", "end": "2024-12-31"}, headers=headers)
+    assert response.json()["items"][0] == {"key": str(tools[2].id), "reservations": 2, "returns": 0}
+
+
+def test_backfill_command_rebuilds_a_range(db, history, capsys):
+    db.query(ReservationRollup).delete()
+    db.commit()
+
+    assert main(["backfill-rollups", "--since", "2024-02-01"]) == 0
+    capsys.readouterr()
+    db.expire_all()
+    assert [row[2] for row in rollup_rows(db)] == [date(2024, 2, 5)] * 3
+    assert main(["backfill-rollups", "--since", "2024-02-01", "--until", "2024-01-01"]) == 1
@@ -0,0 +1,45 @@
+"""
+Tests for tool search through the full-text index.
+"""
+
+from app.models.tool import Tool
+from app.services.search_index import ToolSearchIndex
+from app.services.tool_service import ToolService
+
+
+def add_tools(db, *tools):
+    db.add_all([Tool(name=name, description=description, owner_id=1) for name, description in tools])
+    db.commit()
+
+
+def test_search_index_is_created(db):
+    assert ToolSearchIndex.is_available(db)
+
+
+def test_search_matches_word_prefixes_ranked_by_name(db):
+    add_tools(
+        db,
+        ("Hammer", "Pairs well with a drill"),
+        ("Power Drill", "Cordless drill"),
+        ("Sander", "Orbital sander"),
+    )
+    results = ToolService.search_tools(db, "dri").items
+    assert [tool.name for tool in results] == ["Power Drill", "Hammer"]
+    assert [tool.name for tool in ToolService.search_tools(db, "cordless dr").items] == ["Power Drill"]
+
+
+def test_search_index_follows_updates_and_deletes(db):
+    add_tools(db, ("Power Drill", "Cordless drill"))
+    tool = db.query(Tool).one()
+    tool.name = "Impact Driver"
+    db.commit()
+    assert [t.name for t in ToolService.search_tools(db, "impact").items] == ["Impact Driver"]
+
+    db.delete(tool)
+    db.commit()
+    assert ToolService.search_tools(db, "impact").items == []
+
+
+def test_build_match_query_quotes_words():
+    assert ToolSearchIndex.build_match_query('saw OR "drill') == '"saw"* "OR"* "drill"*'
+    assert ToolSearchIndex.build_match_query("--") is None
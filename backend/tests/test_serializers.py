@@ -0,0 +1,140 @@
+"""
+Tests for the row serializers, which must produce what the Pydantic response models do.
+"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.models.reservation import Reservation
+from app.models.tool import Tool
+from app.models.user import User
+from app.schemas.reservation import Reservation as ReservationSchema
+from app.schemas.tool import Tool as ToolSchema
+from app.schemas.user import User as UserSchema
+from app.utils.serializers import (
+    RowSerializer, render_json, reservation_serializer, tool_serializer, user_serializer
+)
+
+VARIANTS = {"thumb": {"webp": "http://localhost:8000/uploads/t.webp", "jpeg": "http://localhost:8000/uploads/t.jpg"}}
+
+
+def pydantic_output(schema, obj):
+    return json.loads(json.dumps(jsonable_encoder(schema.from_orm(obj))))
+
+
+@pytest.fixture
+def rows(db):
+    user = User(username="borrower", email="borrower@example.com", hashed_password="secret", role="user",
+                full_name="Bo Rower", location="Shed")
+    db.add(user)
+    db.flush()
+    tools = [
+        Tool(name="Drill", description="Cordless", category="Power Tools", owner_id=user.id,
+             created_at=datetime(2024, 5, 1, 12, 30, 15, 123456), image_url="http://localhost:8000/uploads/o.jpg",
+             image_variants=VARIANTS),
+        Tool(name="Saw", owner_id=user.id, is_available=False, created_at=datetime(2024, 5, 2)),
+    ]
+    db.add_all(tools)
+    db.flush()
+    db.add(Reservation(tool_id=tools[0].id, user_id=user.id, reservation_date=date(2024, 5, 3),
+                       return_date=date(2024, 5, 9), is_active=False))
+    db.commit()
+    return user
+
+
+def test_serializers_match_the_response_models(db, rows):
+    for serializer, schema, model in (
+        (tool_serializer, ToolSchema, Tool),
+        (reservation_serializer, ReservationSchema, Reservation),
+        (user_serializer, UserSchema, User),
+    ):
+        objects = db.query(model).all()
+        expected = [pydantic_output(schema, obj) for obj in objects]
+        assert json.loads(render_json(serializer.from_objects(objects))) == expected
+
+        # Rows of the serializer's columns give the same output as loaded objects
+        query = db.query(*serializer.columns)
+        if serializer is reservation_serializer:
+            query = query.join(Reservation.tool)
+        assert json.loads(render_json(serializer.many(query.all()))) == expected
+
+    assert "hashed_password" not in user_serializer.from_objects([rows])[0]
+
+
+def test_serializer_must_cover_the_schema():
+    with pytest.raises(ValueError, match="do not match"):
+        RowSerializer(UserSchema, {"id": User.id, "email": User.email})
+
+
+def test_endpoints_send_the_fast_output(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "borrower", "email": "borrower@example.com", "password": "password123", "role": "user"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "borrower", "password": "password123"}).json()
+    tool = Tool(name="Drill", owner_id=token["user_id"], created_at=datetime(2024, 5, 1, 8))
+    db.add(tool)
+    db.flush()
+    db.add(Reservation(tool_id=tool.id, user_id=token["user_id"], reservation_date=date(2024, 5, 3)))
+    db.commit()
+
+    response = client.get("/api/v1/reservations/", headers={"Authorization": f"Bearer {token['access_token']}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    reservation = response.json()[0]
+    assert reservation["reservation_date"] == "2024-05-03"
+    assert reservation["tool"]["created_at"] == "2024-05-01T08:00:00"
+    assert reservation["tool"]["thumbnail_url"] is None
+
+
+def test_only_narrows_the_columns_and_the_output(db, rows):
+    serializer = tool_serializer.only(["name", "thumbnail_url", "id"])
+    assert serializer is tool_serializer.only(["id", "thumbnail_url", "name"])
+    # The thumbnail is computed from columns that are selected but not sent
+    assert set(serializer.names) == {"name", "id", "image_url", "image_variants"}
+    output = serializer.many(db.query(*serializer.columns).order_by(Tool.id).all())
+    assert output == [
+        {"name": "Drill", "id": output[0]["id"], "thumbnail_url": "http://localhost:8000/uploads/t.webp"},
+        {"name": "Saw", "id": output[1]["id"], "thumbnail_url": None},
+    ]
+
+    nested = reservation_serializer.only(["id", "tool"])
+    assert nested.names == ("id",) and nested.columns[1:] == tool_serializer.columns
+    assert tool_serializer.only(None) is tool_serializer
+
+    with pytest.raises(ValueError, match="Unknown fields: hashed_password"):
+        user_serializer.only(["username", "hashed_password"])
+
+
+def test_list_endpoints_accept_a_sparse_fieldset(client, db):
+    client.post("/api/v1/auth/register", json={
+        "username": "admin", "email": "admin@example.com", "password": "password123", "role": "admin"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "admin", "password": "password123"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    tool = Tool(name="Drill", category="Power Tools", owner_id=token["user_id"], created_at=datetime(2024, 5, 1))
+    db.add(tool)
+    db.flush()
+    db.add(Reservation(tool_id=tool.id, user_id=token["user_id"], reservation_date=date(2024, 5, 3)))
+    db.commit()
+
+    assert client.get("/api/v1/tools/?fields=id,name").json() == [{"id": tool.id, "name": "Drill"}]
+    # The narrowed response is cached apart from the full one
+    assert len(client.get("/api/v1/tools/").json()[0]) == len(ToolSchema.__fields__)
+    assert client.get("/api/v1/tools/category/Power%20Tools?fields=name").json() == [{"name": "Drill"}]
+    assert client.get("/api/v1/tools/search/?search_term=Drill&fields=id").json() == [{"id": tool.id}]
+
+    reservations = client.get("/api/v1/reservations/?fields=reservation_date,tool", headers=headers).json()
+    assert reservations[0]["reservation_date"] == "2024-05-03"
+    assert reservations[0]["tool"]["name"] == "Drill"
+    only_tool = client.get("/api/v1/reservations/?fields=tool", headers=headers)
+    assert only_tool.status_code == 200
+    assert only_tool.json() == [{"tool": reservations[0]["tool"]}]
+    assert client.get("/api/v1/users/admin/users?fields=username", headers=headers).json() == [{"username": "admin"}]
+
+    for url in ("/api/v1/tools/?fields=id,owner", "/api/v1/users/admin/users?fields=hashed_password"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 400
+        assert "Unknown fields" in response.json()["detail"]
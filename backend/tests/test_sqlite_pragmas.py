@@ -0,0 +1,53 @@
+"""
+Tests for the SQLite PRAGMA profile applied to new connections.
+"""
+
+import logging
+
+from app.config import settings
+from app.database import build_engine, check_sqlite_pragmas, read_sqlite_pragmas
+
+
+def test_new_connections_get_the_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT", 1234)
+    engine = build_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    try:
+        pragmas = read_sqlite_pragmas(engine)
+    finally:
+        engine.dispose()
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 1234
+    assert pragmas["temp_store"] == 2  # MEMORY
+
+
+def test_disabled_profile_keeps_sqlite_defaults(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(settings, "SQLITE_PRAGMAS_ENABLED", False)
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT", 1234)
+    engine = build_engine(f"sqlite:///{tmp_path / 'defaults.db'}")
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.database"):
+            pragmas = check_sqlite_pragmas(engine)
+    finally:
+        engine.dispose()
+    assert pragmas["journal_mode"] == "DELETE"
+    assert pragmas["synchronous"] == 2  # FULL
+    assert pragmas["busy_timeout"] != 1234
+    # Differences from the profile are expected when it is off
+    assert caplog.records == []
+
+
+def test_mismatches_are_logged_by_the_startup_check_only(monkeypatch, tmp_path, caplog):
+    engine = build_engine(f"sqlite:///{tmp_path / 'mismatch.db'}")
+    read_sqlite_pragmas(engine)  # Opens the pooled connection with the current profile
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT", 4321)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.database"):
+            read_sqlite_pragmas(engine)
+            assert caplog.records == []
+            check_sqlite_pragmas(engine)
+    finally:
+        engine.dispose()
+    assert [record.getMessage() for record in caplog.records] == [
+        "SQLite PRAGMA busy_timeout is 5000 instead of 4321"
+    ]
@@ -0,0 +1,100 @@
+"""
+Tests for serving uploads with ETags, immutable caching, byte ranges and precompressed files.
+"""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.static_files import IMMUTABLE, RangeNotSatisfiable, UploadFiles, accepts_encoding, parse_range
+
+DIGEST = "ab" * 32
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / f"{DIGEST}.jpg").write_bytes(CONTENT)
+    (tmp_path / "legacy.jpg").write_bytes(CONTENT)
+    (tmp_path / f"{DIGEST}.bmp").write_bytes(CONTENT)
+    (tmp_path / f"{DIGEST}.bmp.gz").write_bytes(gzip.compress(CONTENT))
+    app = FastAPI()
+    app.mount("/uploads", UploadFiles(directory=tmp_path), name="uploads")
+    return TestClient(app)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=9-1", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_accepts_encoding():
+    assert accepts_encoding("gzip, deflate, br", "br")
+    assert not accepts_encoding("gzip;q=0, identity", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("br;q=1, *;q=0", "gzip")
+
+
+def test_content_named_files_are_immutable(files):
+    response = files.get(f"/uploads/{DIGEST}.jpg")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{DIGEST}.jpg"'
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["accept-ranges"] == "bytes"
+
+    for validator in (f'"{DIGEST}.jpg"', f'W/"{DIGEST}.jpg"', f'"other", "{DIGEST}.jpg"', "*"):
+        revalidated = files.get(f"/uploads/{DIGEST}.jpg", headers={"If-None-Match": validator})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == f'"{DIGEST}.jpg"'
+    assert files.get(f"/uploads/{DIGEST}.jpg", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_other_files_get_a_strong_validator(files):
+    response = files.get("/uploads/legacy.jpg")
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert "immutable" not in response.headers["cache-control"]
+    last_modified = response.headers["last-modified"]
+    assert files.get("/uploads/legacy.jpg", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_byte_ranges(files):
+    response = files.get(f"/uploads/{DIGEST}.jpg", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.headers["content-length"] == "10"
+
+    assert files.get(f"/uploads/{DIGEST}.jpg", headers={"Range": "bytes=-4"}).content == CONTENT[-4:]
+    unsatisfiable = files.get(f"/uploads/{DIGEST}.jpg", headers={"Range": "bytes=5000-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    stale = files.get(f"/uploads/{DIGEST}.jpg", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == CONTENT
+    head = files.head(f"/uploads/{DIGEST}.jpg", headers={"Range": "bytes=0-9"})
+    assert head.status_code == 206 and head.content == b""
+
+
+def test_precompressed_sibling_is_served_when_accepted(files):
+    compressed = files.get(f"/uploads/{DIGEST}.bmp", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"] == "image/bmp"
+    assert compressed.headers["etag"] == f'"{DIGEST}.bmp-gzip"'
+    assert compressed.content == CONTENT
+
+    plain = files.get(f"/uploads/{DIGEST}.bmp", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == f'"{DIGEST}.bmp"'
+    assert plain.headers["vary"] == "Accept-Encoding"
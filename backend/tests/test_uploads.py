@@ -0,0 +1,167 @@
+"""
+Tests for streaming image uploads to the upload directory.
+"""
+
+import asyncio
+import io
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.config import settings
+from app.services.file_service import FileService, UploadTooLarge, detect_image_format
+from app.utils.upload_limits import UploadSizeLimitMiddleware
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 56
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+
+
+class RecordingFile(io.BytesIO):
+    """A file remembering the largest read made from it."""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+def upload(content: bytes, filename: str = "photo.png", content_type: str = "image/png") -> UploadFile:
+    return UploadFile(RecordingFile(content), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileService, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16)
+    return tmp_path
+
+
+def test_detect_image_format():
+    assert detect_image_format(PNG[:12]) == "png"
+    assert detect_image_format(JPEG[:12]) == "jpeg"
+    assert detect_image_format(b"RIFF\x00\x00\x00\x00WEBP") == "webp"
+    assert detect_image_format(b"<svg xmlns=") is None
+
+
+def test_upload_is_streamed_in_chunks(upload_dir):
+    file = upload(PNG * 10)
+    url = asyncio.run(FileService.save_upload(file))
+
+    stored = FileService.blob_path(FileService.blob_name(url))
+    assert stored.read_bytes() == PNG * 10
+    assert file.file.largest_read == settings.UPLOAD_CHUNK_SIZE
+    assert list(FileService.iter_blob_files()) == [stored]
+
+
+def test_jfif_is_stored_as_jpg(upload_dir):
+    url = asyncio.run(FileService.save_upload(upload(JPEG, "scan.jfif", "image/jpeg")))
+    assert url.endswith(".jpg")
+
+
+def test_identical_uploads_share_one_blob(upload_dir):
+    first = asyncio.run(FileService.save_upload(upload(JPEG, "drill.jpeg", "image/jpeg")))
+    second = asyncio.run(FileService.save_upload(upload(JPEG, "copy.jfif", "image/jpeg")))
+
+    assert first == second
+    name = FileService.blob_name(first)
+    assert first.endswith(f"/blobs/{name[:2]}/{name[2:4]}/{name}")
+    assert len(list(FileService.iter_blob_files())) == 1
+
+
+@pytest.mark.parametrize("content, filename, content_type", [
+    (PNG, "notes.txt", "image/png"),
+    (PNG, "photo.png", "text/html"),
+    (b"<html></html>" * 4, "photo.png", "image/png"),
+    (JPEG, "photo.png", "image/png"),
+])
+def test_wrong_file_types_are_rejected(upload_dir, content, filename, content_type):
+    with pytest.raises(ValueError):
+        asyncio.run(FileService.save_upload(upload(content, filename, content_type)))
+    assert list(FileService.iter_blob_files()) == []
+
+
+def test_oversized_upload_leaves_no_file(upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 100)
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(FileService.save_upload(upload(PNG * 2)))
+    assert list(FileService.iter_blob_files()) == []
+
+
+def test_profile_image_endpoint_rejects_oversized_upload(client, db, upload_dir, monkeypatch):
+    client.post("/api/v1/auth/register", json={
+        "username": "uploader", "email": "uploader@example.com", "password": "password123"
+    })
+    token = client.post("/api/v1/auth/login", json={"username": "uploader", "password": "password123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 100)
+
+    response = client.put("/api/v1/users/profile-image", headers=headers,
+                          files={"image": ("me.png", PNG, "image/png")})
+    assert response.status_code == 200
+    response = client.put("/api/v1/users/profile-image", headers=headers,
+                          files={"image": ("me.png", PNG * 2, "image/png")})
+    assert response.status_code == 413
+    response = client.put("/api/v1/users/profile-image", headers=headers,
+                          files={"image": ("me.png", b"GIF89a" + b"\x00" * 10, "image/png")})
+    assert response.status_code == 400
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 100)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD", 1000)
+    body = b"--x\r\nContent-Disposition: form-data; name=\"image\"; filename=\"me.png\"\r\n\r\n" + PNG + b"\r\n--x--\r\n"
+    response = client.put("/api/v1/users/profile-image", content=body, headers={
+        "Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(10 * 1024 ** 3),
+    })
+    assert response.status_code == 413
+    assert "1100 bytes" in response.json()["detail"]
+    assert list(upload_dir.rglob("*")) == []
+
+
+def test_chunked_upload_is_rejected_once_past_the_limit(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 100)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD", 100)
+
+    def body():
+        yield b"--x\r\nContent-Disposition: form-data; name=\"image\"; filename=\"me.png\"\r\n\r\n" + PNG
+        for _ in range(20):
+            yield b"\x00" * 50
+        yield b"\r\n--x--\r\n"
+
+    # Sent without Content-Length, with chunked transfer encoding
+    response = client.put("/api/v1/users/profile-image", content=body(),
+                          headers={"Content-Type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
+    assert list(upload_dir.rglob("*")) == []
+
+
+def test_streamed_body_is_cut_off_at_the_limit(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 100)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD", 0)
+    chunks = [b"x" * 60] * 100
+    received, sent = [], []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message)
+            if message["type"] == "http.disconnect" or not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 400, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": chunks.pop(), "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "PUT", "path": "/", "headers": [(b"content-type", b"multipart/form-data; boundary=x")]}
+    asyncio.run(UploadSizeLimitMiddleware(app)(scope, receive, send))
+
+    assert [message["type"] for message in received] == ["http.request", "http.disconnect"]
+    assert len(chunks) == 98  # Nothing read past the chunk crossing the limit
+    assert sent[0]["status"] == 413
+    assert len(sent) == 2  # The application's own response is dropped
@@ -146,7 +146,7 @@ const AdminToolSubmissions = () => {
                     {submission.image_url ? (
                       <Box sx={{ width: '100%', mb: 2 }}>
                         <img 
-                          src={submission.image_url}
+                          src={submission.image_variants?.card?.webp || submission.image_url}
                           alt={submission.name}
                           style={{
                             width: '100%',
@@ -165,7 +165,7 @@ const BrowseTools = () => {
               >
                 {tool.image_url ? (
                   <img
-                    src={tool.image_url}
+                    src={tool.thumbnail_url || tool.image_url}
                     alt={tool.name}
                     style={{
                       position: 'absolute',